@@ -0,0 +1,176 @@
+# benchmarks/bench_google.py
+"""
+Google 迁移数据解析与二维码扫描基准
+
+使用 migration_generator.py 生成的合成数据测量：
+  - URI 解析吞吐量 (URI/秒、账户/秒)：decode_migration_uri 与 decrypt_google_auth_uris
+  - 二维码扫描吞吐量 (图片/秒)：scan_image 按 分辨率 x 噪声 x 格式 分组，
+    以及 extract_uris_from_path 的整体吞吐量，并统计各识别级别的命中数量
+
+扫描依赖 pyzbar 及系统的 zbar 库；缺失时跳过扫描部分，只输出解析结果。
+结果可保存为 JSON，便于每次扫描器优化前后对比。
+
+用法:
+    python benchmarks/bench_google.py [--accounts 1000] [--per-batch 10]
+                                      [--sizes 400,1200] [--noise 0,24] [--output google.json]
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from migration_generator import (  # noqa: E402
+    IMAGE_FORMATS,
+    build_accounts,
+    build_migration_uris,
+    write_qr_images,
+)
+from unsealer.google.decrypter import decode_migration_uri, decrypt_google_auth_uris  # noqa: E402
+
+
+def _median_seconds(func: Callable[[], Any], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def bench_parse(accounts: int, per_batch: int, repeat: int) -> Dict[str, Any]:
+    uris = build_migration_uris(build_accounts(accounts), per_batch)
+
+    def decode_each():
+        for uri in uris:
+            decode_migration_uri(uri)
+
+    result: Dict[str, Any] = {"uris": len(uris), "accounts": accounts, "per_batch": per_batch}
+    for name, func in (
+        ("decode_migration_uri", decode_each),
+        ("decrypt_google_auth_uris", lambda: decrypt_google_auth_uris(uris)),
+    ):
+        seconds = _median_seconds(func, repeat)
+        result[name] = {
+            "seconds": round(seconds, 6),
+            "uris_per_second": round(len(uris) / seconds, 1),
+            "accounts_per_second": round(accounts / seconds, 1),
+        }
+    return result
+
+
+def bench_scan(
+    workdir: Path,
+    uri_count: int,
+    per_batch: int,
+    sizes: List[int],
+    noise_levels: List[float],
+    workers: Optional[int],
+) -> Optional[Dict[str, Any]]:
+    try:
+        from unsealer.google.scanner import extract_uris_from_path, scan_image
+    except ImportError as e:
+        print(f"[跳过] 二维码扫描基准不可用: {e}", file=sys.stderr)
+        return None
+
+    uris = build_migration_uris(build_accounts(uri_count * per_batch), per_batch)
+    groups: Dict[str, Any] = {}
+    total_images = 0
+    for side in sizes:
+        for noise in noise_levels:
+            for fmt in IMAGE_FORMATS:
+                group_dir = workdir / f"{side}px_n{noise:g}_{fmt}"
+                paths = write_qr_images(uris, group_dir, [side], [noise], [fmt])
+                tiers: Counter = Counter()
+                decoded = 0
+                start = time.perf_counter()
+                for path in paths:
+                    _, found, tier = scan_image(str(path))
+                    tiers[tier or "none"] += 1
+                    decoded += bool(found)
+                seconds = time.perf_counter() - start
+                total_images += len(paths)
+                groups[group_dir.name] = {
+                    "images": len(paths),
+                    "decoded": decoded,
+                    "images_per_second": round(len(paths) / seconds, 2),
+                    "tiers": dict(tiers),
+                }
+
+    start = time.perf_counter()
+    found_uris = extract_uris_from_path(str(workdir), recursive=True, workers=workers)
+    seconds = time.perf_counter() - start
+    return {
+        "groups": groups,
+        "extract_uris_from_path": {
+            "images": total_images,
+            "workers": workers,
+            "unique_uris": len(found_uris),
+            "images_per_second": round(total_images / seconds, 2),
+        },
+    }
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def _float_list(value: str) -> List[float]:
+    return [float(v) for v in value.split(",") if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="测量 Google 迁移 URI 解析与二维码扫描的吞吐量。")
+    parser.add_argument("--accounts", type=int, default=1000, help="解析基准的账户总数。")
+    parser.add_argument("--per-batch", type=int, default=10, help="每个 URI 中的账户数。")
+    parser.add_argument("--repeat", type=int, default=5, help="解析基准的计时次数。")
+    parser.add_argument("--images", type=int, default=5, help="每组扫描基准的二维码数量 (0 表示跳过扫描)。")
+    parser.add_argument("--sizes", type=_int_list, default=[400, 1200], help="图片边长列表，以逗号分隔。")
+    parser.add_argument("--noise", type=_float_list, default=[0.0, 24.0], help="噪声标准差列表，以逗号分隔。")
+    parser.add_argument("--workers", type=int, help="extract_uris_from_path 的并行进程数 (默认为 CPU 核数)。")
+    parser.add_argument("--output", type=Path, help="将结果保存为 JSON 文件。")
+    args = parser.parse_args()
+
+    parse = bench_parse(args.accounts, args.per_batch, args.repeat)
+    print(f"== 解析 ({parse['uris']} 个 URI, {parse['accounts']} 个账户)")
+    for name in ("decode_migration_uri", "decrypt_google_auth_uris"):
+        stats = parse[name]
+        print(f"   {name:<26} {stats['uris_per_second']:12.1f} URI/s {stats['accounts_per_second']:12.1f} 账户/s")
+
+    scan = None
+    if args.images > 0:
+        with tempfile.TemporaryDirectory(prefix="unsealer-bench-") as tmp:
+            scan = bench_scan(Path(tmp), args.images, args.per_batch, args.sizes, args.noise, args.workers)
+        if scan:
+            print("== 扫描")
+            for name, stats in scan["groups"].items():
+                print(
+                    f"   {name:<20} {stats['images_per_second']:8.2f} 图片/s "
+                    f"识别 {stats['decoded']}/{stats['images']}  级别 {stats['tiers']}"
+                )
+            overall = scan["extract_uris_from_path"]
+            print(f"   {'extract_uris_from_path':<20} {overall['images_per_second']:8.2f} 图片/s")
+
+    if args.output:
+        report = {
+            "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parse": parse,
+            "scan": scan,
+        }
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
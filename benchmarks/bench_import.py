@@ -0,0 +1,119 @@
+# benchmarks/bench_import.py
+"""
+CLI 冷启动导入耗时基准
+
+每次测量都在全新的解释器进程中执行，扣除空解释器的启动时间后取中位数。
+超出预算或加载了不应加载的重量级模块时以非零状态码退出，可直接用于 CI。
+
+用法:
+    python benchmarks/bench_import.py [--repeat 15] [--output import.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+
+# 模块 -> (导入耗时预算 (毫秒), 导入后不应出现在 sys.modules 中的模块)
+TARGETS = {
+    "unsealer.__main__": (40.0, ["rich", "Crypto", "PIL", "pyzbar", "pyfiglet"]),
+    "unsealer.samsung.cli": (
+        250.0,
+        [
+            "PIL",
+            "pyzbar",
+            "pyfiglet",
+            "multiprocessing",
+            "concurrent.futures",
+            "unsealer.samsung.diff",
+            "unsealer.samsung.merge",
+            "unsealer.samsung.query",
+        ],
+    ),
+    "unsealer.google.cli": (200.0, ["PIL", "pyzbar", "pyfiglet", "Crypto"]),
+}
+
+_PROBE = (
+    "import sys, time, json; s = time.perf_counter(); import {module}; "
+    "e = time.perf_counter(); "
+    "print(json.dumps({{'ms': (e - s) * 1000, 'modules': sorted(sys.modules)}}))"
+)
+
+
+def _run_probe(module: str) -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_DIR), env.get("PYTHONPATH")]))
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module)],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=env,
+    ).stdout
+    result = json.loads(out)
+    result["process_ms"] = (time.perf_counter() - start) * 1000
+    return result
+
+
+def measure(module: str, repeat: int) -> dict:
+    samples = [_run_probe(module) for _ in range(repeat)]
+    loaded = set(samples[-1]["modules"])
+    budget_ms, forbidden = TARGETS[module]
+    import_ms = statistics.median(s["ms"] for s in samples)
+    return {
+        "module": module,
+        "import_ms_median": round(import_ms, 2),
+        "import_ms_min": round(min(s["ms"] for s in samples), 2),
+        "process_ms_median": round(statistics.median(s["process_ms"] for s in samples), 2),
+        "budget_ms": budget_ms,
+        "forbidden_loaded": sorted(
+            m for m in forbidden if m in loaded or any(x.startswith(m + ".") for x in loaded)
+        ),
+        "within_budget": import_ms <= budget_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="测量 unsealer CLI 的冷启动导入耗时。")
+    parser.add_argument("--repeat", type=int, default=15, help="每个模块的测量次数。")
+    parser.add_argument("--output", type=Path, help="将结果保存为 JSON 文件。")
+    parser.add_argument(
+        "--budget-scale",
+        type=float,
+        default=1.0,
+        help="按比例放宽或收紧全部预算 (较慢的机器可设为 2.0)。",
+    )
+    args = parser.parse_args()
+
+    results = []
+    failed = False
+    for module in TARGETS:
+        result = measure(module, args.repeat)
+        result["budget_ms"] *= args.budget_scale
+        result["within_budget"] = result["import_ms_median"] <= result["budget_ms"]
+        results.append(result)
+
+        status = "OK" if result["within_budget"] and not result["forbidden_loaded"] else "FAIL"
+        failed |= status == "FAIL"
+        print(
+            f"[{status}] {module:<24} median {result['import_ms_median']:8.2f} ms "
+            f"(min {result['import_ms_min']:.2f}, budget {result['budget_ms']:.0f})"
+        )
+        if result["forbidden_loaded"]:
+            print(f"       不应加载的模块: {', '.join(result['forbidden_loaded'])}")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+# benchmarks/bench_samsung.py
+"""
+三星备份解密与导出基准
+
+针对不同规模的合成备份 (见 spass_generator.py)，分别测量各阶段耗时：
+PBKDF2 密钥派生、Base64 解码、AES 解密、解析 (普通 / 紧凑 / 延迟解码 / 仅计数)、
+端到端流式解密、预览 (解密 + 计数)，以及每种导出格式；
+并使用 tracemalloc 记录端到端解密与各导出格式的峰值内存，
+以及解析结果以 dict 与紧凑记录 (compact=True) 保存时各自常驻的内存。
+
+计时取多次运行的中位数；峰值内存单独测量一次 (tracemalloc 会拖慢执行)。
+结果保存为 JSON，可通过 --compare 与之前版本的结果对比，发现性能回退时以非零状态码退出。
+
+用法:
+    python benchmarks/bench_samsung.py [--sizes 100,1000,10000] [--output samsung.json]
+                                       [--compare baseline.json --tolerance 0.25]
+"""
+
+import argparse
+import base64
+import io
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from Crypto.Cipher import AES  # noqa: E402
+from Crypto.Util.Padding import unpad  # noqa: E402
+
+from spass_generator import build_plaintext, encrypt_spass  # noqa: E402
+from unsealer.samsung.decrypter import (  # noqa: E402
+    _derive_key,
+    _split_payload,
+    count_table_rows,
+    count_tables,
+    decrypt_and_parse_stream,
+    parse_decrypted_content,
+)
+from unsealer.samsung.exporters import EXPORT_FORMATS, save_tables  # noqa: E402
+
+PASSWORD = "benchmark"
+
+
+def _median_seconds(func: Callable[[], Any], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def _peak_mib(func: Callable[[], Any]) -> float:
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def _retained_mib(func: Callable[[], Any]) -> float:
+    """
+    func 返回值仍然存活时 tracemalloc 统计到的内存 (即解析结果本身的占用)
+    """
+    tracemalloc.start()
+    try:
+        result = func()
+        current, _ = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        tracemalloc.stop()
+    return current / 1024 / 1024
+
+
+def bench_size(rows: int, repeat: int, workdir: Path) -> Dict[str, Any]:
+    plaintext = build_plaintext(
+        {"logins": rows, "identities": max(1, rows // 5), "addresses": max(1, rows // 5), "notes": max(1, rows // 5)}
+    )
+    file_bytes = encrypt_spass(plaintext, PASSWORD)
+    binary = base64.b64decode(file_bytes)
+    salt, iv, ciphertext = _split_payload(binary)
+    key = _derive_key(PASSWORD, salt)
+    tables = parse_decrypted_content(plaintext)
+
+    def decrypt_aes():
+        unpad(AES.new(key, AES.MODE_CBC, iv).decrypt(ciphertext), AES.block_size)
+
+    def end_to_end():
+        decrypt_and_parse_stream(io.BytesIO(file_bytes), PASSWORD)
+
+    def preview():
+        count_tables(io.BytesIO(file_bytes), PASSWORD)
+
+    stages = {
+        "kdf": lambda: _derive_key(PASSWORD, salt),
+        "base64": lambda: base64.b64decode(file_bytes),
+        "aes": decrypt_aes,
+        "parse": lambda: parse_decrypted_content(plaintext),
+        "parse_compact": lambda: parse_decrypted_content(plaintext, compact=True),
+        "parse_lazy": lambda: parse_decrypted_content(plaintext, lazy=True),
+        "count": lambda: count_table_rows(plaintext),
+        "preview": preview,
+        "end_to_end": end_to_end,
+    }
+
+    def exporter(fmt: str) -> Callable[[], Any]:
+        def run():
+            target = workdir / f"export_{rows}.{fmt}"
+            if target.is_dir():
+                shutil.rmtree(target)
+            elif target.exists():
+                target.unlink()
+            save_tables(tables, target, fmt)
+        return run
+
+    for fmt in EXPORT_FORMATS:
+        stages[f"export_{fmt}"] = exporter(fmt)
+
+    timings = {name: round(_median_seconds(func, repeat), 6) for name, func in stages.items()}
+    memory = {
+        name: round(_peak_mib(stages[name]), 3)
+        for name in ["end_to_end", *(f"export_{fmt}" for fmt in EXPORT_FORMATS)]
+    }
+    retained = {
+        "dict": round(_retained_mib(lambda: parse_decrypted_content(plaintext)), 3),
+        "compact": round(_retained_mib(lambda: parse_decrypted_content(plaintext, compact=True)), 3),
+    }
+    return {
+        "rows": rows,
+        "entries": sum(len(entries) for entries in tables.values()),
+        "file_bytes": len(file_bytes),
+        "seconds": timings,
+        "peak_mib": memory,
+        "retained_mib": retained,
+    }
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: Path, tolerance: float) -> List[str]:
+    """
+    与基线结果逐项对比，返回超出容差的回退描述
+    """
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    by_rows = {r["rows"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        base = by_rows.get(result["rows"])
+        if not base:
+            continue
+        for metric in ("seconds", "peak_mib", "retained_mib"):
+            for stage, value in result[metric].items():
+                old = base.get(metric, {}).get(stage)
+                if old and value > old * (1 + tolerance):
+                    regressions.append(
+                        f"{result['rows']} 行 {stage} ({metric}): {old} -> {value} (+{(value / old - 1) * 100:.0f}%)"
+                    )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="测量 .spass 解密、解析与导出各阶段的耗时和峰值内存。")
+    parser.add_argument(
+        "--sizes",
+        default="100,1000,10000",
+        help="logins 数据表的行数列表，以逗号分隔 (其余数据表为其 1/5)。",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="每个阶段的计时次数。")
+    parser.add_argument("--output", type=Path, help="将结果保存为 JSON 文件。")
+    parser.add_argument("--compare", type=Path, help="与之前保存的 JSON 结果对比。")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="对比时允许的相对退化比例。")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="unsealer-bench-") as tmp:
+        for rows in (int(size) for size in args.sizes.split(",")):
+            result = bench_size(rows, args.repeat, Path(tmp))
+            results.append(result)
+            print(f"== {rows} 行 ({result['entries']} 条目, {result['file_bytes'] / 1024 / 1024:.2f} MiB)")
+            for stage, seconds in result["seconds"].items():
+                peak = result["peak_mib"].get(stage)
+                peak_text = f"  峰值 {peak:8.2f} MiB" if peak is not None else ""
+                print(f"   {stage:<16} {seconds * 1000:10.2f} ms{peak_text}")
+            retained = result["retained_mib"]
+            saved = 1 - retained["compact"] / retained["dict"] if retained["dict"] else 0.0
+            print(
+                f"   解析结果常驻内存: dict {retained['dict']:.2f} MiB, "
+                f"compact {retained['compact']:.2f} MiB (节省 {saved * 100:.0f}%)"
+            )
+
+    report = {
+        "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for line in regressions:
+            print(f"[回退] {line}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+# benchmarks/migration_generator.py
+"""
+合成 Google Authenticator 迁移数据生成器
+
+手工编码 MigrationPayload protobuf (与 google/decrypter.py 解析的字段一致)：
+    1: repeated OtpParameters (1: secret, 2: name, 3: issuer, 4: algorithm, 5: digits, 6: type)
+    2: version, 3: batch_size, 4: batch_index, 5: batch_id
+账户轮流覆盖全部算法与位数，并按每页账户数拆分为多个批次，
+生成 otpauth-migration:// URI 列表；可选地使用 qrcode 渲染为不同分辨率、
+不同噪声强度的 PNG / JPEG 二维码图片。
+
+用法:
+    python benchmarks/migration_generator.py out_dir --accounts 200 [--per-batch 10]
+                                             [--images] [--sizes 400,1200] [--noise 0,24]
+"""
+
+import argparse
+import base64
+import random
+import string
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+from urllib.parse import quote
+
+MIGRATION_PREFIX = "otpauth-migration://offline?data="
+
+# OtpParameters 枚举值
+ALGORITHMS = (1, 2, 3, 4)  # SHA1, SHA256, SHA512, MD5
+DIGITS = (1, 2)  # 6 位, 8 位
+OTP_TYPE_TOTP = 2
+
+IMAGE_FORMATS = ("png", "jpg")
+_ISSUERS = ["Example", "GitHub", "Mail", "Bank", "Cloud", ""]
+
+
+# --- Protobuf 编码 ---
+
+def _varint(value: int) -> bytes:
+    if value < 0:
+        # int32 负数按 64 位补码编码 (10 字节)
+        value += 1 << 64
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _field_varint(tag: int, value: int) -> bytes:
+    return _varint(tag << 3) + _varint(value)
+
+
+def _field_bytes(tag: int, value: bytes) -> bytes:
+    return _varint((tag << 3) | 2) + _varint(len(value)) + value
+
+
+def encode_otp_parameters(account: Dict) -> bytes:
+    """
+    将账户字典编码为 OtpParameters 消息
+    """
+    return b"".join([
+        _field_bytes(1, account["secret"]),
+        _field_bytes(2, account["name"].encode("utf-8")),
+        _field_bytes(3, account["issuer"].encode("utf-8")),
+        _field_varint(4, account["algorithm"]),
+        _field_varint(5, account["digits"]),
+        _field_varint(6, OTP_TYPE_TOTP),
+    ])
+
+
+def encode_migration_payload(
+    accounts: Iterable[Dict], batch_size: int = 1, batch_index: int = 0, batch_id: int = 0
+) -> bytes:
+    """
+    编码一页 MigrationPayload
+    """
+    parts = [_field_bytes(1, encode_otp_parameters(acc)) for acc in accounts]
+    parts += [
+        _field_varint(2, 1),
+        _field_varint(3, batch_size),
+        _field_varint(4, batch_index),
+        _field_varint(5, batch_id),
+    ]
+    return b"".join(parts)
+
+
+def payload_to_uri(payload: bytes) -> str:
+    return MIGRATION_PREFIX + quote(base64.b64encode(payload).decode("ascii"), safe="")
+
+
+# --- 合成数据 ---
+
+def build_accounts(count: int, seed: int = 0) -> List[Dict]:
+    """
+    生成账户列表：轮流覆盖全部算法与位数，部分账户的 issuer 只出现在 name 前缀中
+    """
+    rng = random.Random(seed)
+    accounts = []
+    for i in range(count):
+        issuer = rng.choice(_ISSUERS)
+        user = "".join(rng.choices(string.ascii_lowercase, k=8))
+        name = f"{user}{i}@example.com"
+        if not issuer:
+            name = f"Legacy{i % 7}:{name}"
+        accounts.append({
+            "secret": bytes(rng.getrandbits(8) for _ in range(rng.choice((10, 20, 32)))),
+            "name": name,
+            "issuer": issuer,
+            "algorithm": ALGORITHMS[i % len(ALGORITHMS)],
+            "digits": DIGITS[(i // len(ALGORITHMS)) % len(DIGITS)],
+        })
+    return accounts
+
+
+def build_migration_uris(accounts: Sequence[Dict], per_batch: int = 10, seed: int = 0) -> List[str]:
+    """
+    按每页账户数拆分为一个批次中的多页迁移 URI (与 Authenticator 导出多张二维码一致)
+    """
+    rng = random.Random(seed)
+    batch_id = rng.randint(-(1 << 31), (1 << 31) - 1)
+    pages = [accounts[i:i + per_batch] for i in range(0, len(accounts), per_batch)] or [[]]
+    return [
+        payload_to_uri(encode_migration_payload(page, len(pages), index, batch_id))
+        for index, page in enumerate(pages)
+    ]
+
+
+# --- 二维码图片 ---
+
+def render_qr(uri: str, side: int, noise: float = 0.0):
+    """
+    渲染二维码并缩放到指定边长；noise > 0 时叠加该标准差的高斯噪声
+    """
+    import qrcode
+    from PIL import Image, ImageChops
+
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M, border=4)
+    qr.add_data(uri)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white").get_image().convert("L")
+    img = img.resize((side, side), Image.NEAREST)
+    if noise > 0:
+        img = ImageChops.add(img, Image.effect_noise(img.size, noise), scale=1.0, offset=-128)
+    return img
+
+
+def write_qr_images(
+    uris: Sequence[str],
+    output_dir: Path,
+    sizes: Sequence[int] = (600,),
+    noise_levels: Sequence[float] = (0.0,),
+    formats: Sequence[str] = IMAGE_FORMATS,
+    jpeg_quality: int = 85,
+) -> List[Path]:
+    """
+    为每个 URI 按 分辨率 x 噪声 x 格式 的组合生成图片，返回图片路径列表
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for index, uri in enumerate(uris):
+        for side in sizes:
+            for noise in noise_levels:
+                img = render_qr(uri, side, noise)
+                for fmt in formats:
+                    path = output_dir / f"qr_{index:03d}_{side}px_n{noise:g}.{fmt}"
+                    if fmt == "jpg":
+                        img.save(path, quality=jpeg_quality)
+                    else:
+                        img.save(path)
+                    paths.append(path)
+    return paths
+
+
+def generate_corpus(
+    output_dir: Path,
+    accounts: int,
+    per_batch: int = 10,
+    seed: int = 0,
+    images: bool = False,
+    sizes: Sequence[int] = (600,),
+    noise_levels: Sequence[float] = (0.0,),
+    formats: Sequence[str] = IMAGE_FORMATS,
+) -> Dict[str, int]:
+    """
+    生成 uris.txt (每行一个 URI) 以及可选的二维码图片，返回数量统计
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    uris = build_migration_uris(build_accounts(accounts, seed), per_batch, seed)
+    (output_dir / "uris.txt").write_text("\n".join(uris) + "\n", encoding="utf-8")
+    image_count = 0
+    if images:
+        image_count = len(write_qr_images(uris, output_dir / "images", sizes, noise_levels, formats))
+    return {"accounts": accounts, "uris": len(uris), "images": image_count}
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def _float_list(value: str) -> List[float]:
+    return [float(v) for v in value.split(",") if v]
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="生成用于测试与基准的合成 Google Authenticator 迁移数据。")
+    parser.add_argument("output_dir", type=Path, help="输出目录 (写入 uris.txt 与 images/)。")
+    parser.add_argument("--accounts", type=int, default=100, help="账户总数 (默认为: 100)。")
+    parser.add_argument("--per-batch", type=int, default=10, help="每个二维码中的账户数 (默认为: 10)。")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子。")
+    parser.add_argument("--images", action="store_true", help="同时生成二维码图片 (需要 qrcode 与 pillow)。")
+    parser.add_argument("--sizes", type=_int_list, default=[600], help="图片边长列表 (像素)，以逗号分隔。")
+    parser.add_argument("--noise", type=_float_list, default=[0.0], help="高斯噪声标准差列表，以逗号分隔。")
+    parser.add_argument(
+        "--formats", type=lambda v: v.split(","), default=list(IMAGE_FORMATS), help="图片格式 (png,jpg)。"
+    )
+    args = parser.parse_args(argv)
+
+    stats = generate_corpus(
+        args.output_dir, args.accounts, args.per_batch, args.seed,
+        args.images, args.sizes, args.noise, args.formats,
+    )
+    print(f"已生成 {args.output_dir}: {stats}")
+
+
+if __name__ == "__main__":
+    main()
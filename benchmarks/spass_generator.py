@@ -0,0 +1,233 @@
+# benchmarks/spass_generator.py
+"""
+合成三星密码本 (.spass) 备份生成器
+
+按 decrypt_and_parse 读取的格式构造测试数据：
+    base64( salt(20) + IV(16) + AES-256-CBC(PKCS#7 填充的明文) )
+密钥由 PBKDF2-HMAC-SHA256 (70000 次迭代) 派生。明文由 "next_table" 分隔的
+";" 分隔数据表组成，字段为 Base64 编码，空值使用 "&&&NULL&&&" 标记。
+
+生成的数据包含 schema.json 中的全部数据表、JSON 格式的 OTP / 身份证字段、
+"&&&" 分隔的多值 Base64 列表，以及若干未知数据表。
+
+用法:
+    python benchmarks/spass_generator.py out.spass --rows 1000 [--password pw]
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import string
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from Crypto.Cipher import AES
+from Crypto.Util.Padding import pad
+
+SALT_SIZE = 20
+IV_SIZE = 16
+PBKDF2_ITERATIONS = 70000
+TABLE_SEPARATOR = "next_table"
+EMPTY_FIELD = base64.b64encode(b"&&&NULL&&&").decode("ascii")
+
+# 各数据表的列 (与真实备份一样包含解析器不关心的列)
+TABLE_COLUMNS = {
+    "logins": [
+        "_id", "origin_url", "action_url", "username_element", "username_value",
+        "password_element", "password_value", "title", "credential_memo", "otp",
+        "date_created", "times_used",
+    ],
+    "identities": [
+        "_id", "name", "id_card_detail", "telephone_number_list", "email_address_list",
+        "driver_license_detail", "date_created",
+    ],
+    "addresses": [
+        "_id", "full_name", "company_name", "full_address", "street_address", "city",
+        "state", "zipcode", "country_code", "phone_number", "email", "date_created",
+    ],
+    "notes": ["_id", "note_title", "note_detail", "date_created"],
+}
+
+DEFAULT_ROWS = {"logins": 100, "identities": 20, "addresses": 20, "notes": 20}
+
+_DOMAINS = ["example.com", "mail.example.org", "shop.example.net", "bank.example.co.uk"]
+_APPS = ["com.example.app", "org.sample.client", "net.demo.wallet"]
+
+
+def _b64(text: str) -> str:
+    return base64.b64encode(text.encode("utf-8")).decode("ascii")
+
+
+def _word(rng: random.Random, length: int = 8) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=length))
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(_word(rng, rng.randint(3, 10)) for _ in range(words))
+
+
+def _multi_b64(values: List[str]) -> str:
+    # 多值字段：每个值为 "Base64#标签"，以 "&&&" 连接，整体再做一次 Base64
+    return _b64("&&&".join(f"{_b64(value)}#{i}" for i, value in enumerate(values)))
+
+
+def _login_row(rng: random.Random, i: int) -> Dict[str, str]:
+    if rng.random() < 0.3:
+        origin = f"android://{_word(rng, 40)}@{rng.choice(_APPS)}{i}/"
+    else:
+        origin = f"https://{rng.choice(_DOMAINS)}/login?id={i}"
+    otp = EMPTY_FIELD
+    if rng.random() < 0.2:
+        otp = _b64(json.dumps({"name": f"user{i}@{rng.choice(_DOMAINS)}", "secret": _word(rng, 32).upper()}))
+    return {
+        "_id": str(i),
+        "origin_url": _b64(origin),
+        "action_url": _b64(origin),
+        "username_element": EMPTY_FIELD,
+        "username_value": _b64(f"user{i}@{rng.choice(_DOMAINS)}"),
+        "password_element": EMPTY_FIELD,
+        "password_value": _b64(_word(rng, rng.randint(8, 24))),
+        "title": _b64(f"{_word(rng).title()} {i}"),
+        "credential_memo": _b64(_text(rng, rng.randint(2, 12))) if rng.random() < 0.3 else EMPTY_FIELD,
+        "otp": otp,
+        "date_created": str(1_600_000_000_000 + i),
+        "times_used": str(rng.randint(0, 100)),
+    }
+
+
+def _identity_row(rng: random.Random, i: int) -> Dict[str, str]:
+    id_card = {
+        "mBirthDay": f"19{rng.randint(50, 99)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}",
+        "mIDCardNumber": "".join(rng.choices(string.digits, k=18)),
+        "mUsername": _word(rng).title(),
+    }
+    phones = ["+1" + "".join(rng.choices(string.digits, k=10)) for _ in range(rng.randint(1, 3))]
+    emails = [f"{_word(rng)}@{rng.choice(_DOMAINS)}" for _ in range(rng.randint(1, 2))]
+    return {
+        "_id": str(i),
+        "name": _b64(f"{_word(rng).title()} {_word(rng).title()}"),
+        "id_card_detail": _b64(json.dumps(id_card)),
+        "telephone_number_list": _multi_b64(phones),
+        "email_address_list": _multi_b64(emails),
+        "driver_license_detail": EMPTY_FIELD,
+        "date_created": str(1_600_000_000_000 + i),
+    }
+
+
+def _address_row(rng: random.Random, i: int) -> Dict[str, str]:
+    street = f"{rng.randint(1, 999)} {_word(rng).title()} St"
+    city = _word(rng).title()
+    return {
+        "_id": str(i),
+        "full_name": _b64(f"{_word(rng).title()} {_word(rng).title()}"),
+        "company_name": _b64(_word(rng).title()) if rng.random() < 0.5 else EMPTY_FIELD,
+        "full_address": _b64(f"{street}, {city}"),
+        "street_address": _b64(street),
+        "city": _b64(city),
+        "state": _b64(_word(rng, 2).upper()),
+        "zipcode": _b64("".join(rng.choices(string.digits, k=5))),
+        "country_code": _b64("US"),
+        "phone_number": _b64("+1" + "".join(rng.choices(string.digits, k=10))),
+        "email": _b64(f"{_word(rng)}@{rng.choice(_DOMAINS)}"),
+        "date_created": str(1_600_000_000_000 + i),
+    }
+
+
+def _note_row(rng: random.Random, i: int) -> Dict[str, str]:
+    lines = [_text(rng, rng.randint(3, 15)) for _ in range(rng.randint(1, 8))]
+    return {
+        "_id": str(i),
+        "note_title": _b64(f"Note {i}: {_word(rng)}"),
+        "note_detail": _b64("\n".join(lines)),
+        "date_created": str(1_600_000_000_000 + i),
+    }
+
+
+_ROW_BUILDERS = {
+    "logins": _login_row,
+    "identities": _identity_row,
+    "addresses": _address_row,
+    "notes": _note_row,
+}
+
+
+def _render_table(columns: List[str], rows: List[Dict[str, str]]) -> str:
+    lines = [";".join(columns)]
+    lines.extend(";".join(row.get(column, EMPTY_FIELD) for column in columns) for row in rows)
+    return "\n".join(lines)
+
+
+def build_plaintext(
+    rows: Optional[Dict[str, int]] = None, unknown_tables: int = 1, seed: int = 0
+) -> str:
+    """
+    构造解密后的明文：版本数据块、各 schema 数据表以及未知数据表
+    """
+    rng = random.Random(seed)
+    rows = DEFAULT_ROWS if rows is None else rows
+    blocks = ["24\n" + str(rng.randint(1, 9))]
+    for table, count in rows.items():
+        build = _ROW_BUILDERS[table]
+        blocks.append(_render_table(TABLE_COLUMNS[table], [build(rng, i) for i in range(count)]))
+
+    for n in range(unknown_tables):
+        columns = [f"extra_{n}_{_word(rng, 5)}" for _ in range(rng.randint(3, 6))]
+        count = max(1, max(rows.values(), default=10) // 10)
+        unknown_rows = [{c: _b64(_text(rng, 2)) for c in columns} for _ in range(count)]
+        blocks.append(_render_table(columns, unknown_rows))
+    return f"\n{TABLE_SEPARATOR}\n".join(blocks)
+
+
+def encrypt_spass(
+    plaintext: str,
+    password: str,
+    iterations: int = PBKDF2_ITERATIONS,
+    salt: Optional[bytes] = None,
+    iv: Optional[bytes] = None,
+) -> bytes:
+    """
+    按 .spass 格式加密明文，返回 Base64 编码后的文件内容
+    """
+    salt = salt or os.urandom(SALT_SIZE)
+    iv = iv or os.urandom(IV_SIZE)
+    key = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations, dklen=32)
+    ciphertext = AES.new(key, AES.MODE_CBC, iv).encrypt(pad(plaintext.encode("utf-8"), AES.block_size))
+    return base64.b64encode(salt + iv + ciphertext)
+
+
+def generate_spass(
+    output: Path,
+    password: str,
+    rows: Optional[Dict[str, int]] = None,
+    unknown_tables: int = 1,
+    seed: int = 0,
+) -> int:
+    """
+    生成合成备份文件，返回文件大小 (字节)
+    """
+    data = encrypt_spass(build_plaintext(rows, unknown_tables, seed), password)
+    Path(output).write_bytes(data)
+    return len(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成用于测试与基准的合成 .spass 备份。")
+    parser.add_argument("output", type=Path, help="输出的 .spass 文件路径。")
+    parser.add_argument("--password", default="benchmark", help="加密密码 (默认为: benchmark)。")
+    parser.add_argument("--rows", type=int, help="每个数据表的行数 (覆盖下面的单表设置)。")
+    for table, count in DEFAULT_ROWS.items():
+        parser.add_argument(f"--{table}", type=int, default=count, help=f"{table} 数据表的行数 (默认为: {count})。")
+    parser.add_argument("--unknown-tables", type=int, default=1, help="未知数据表的数量。")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子，相同种子生成相同的明文。")
+    args = parser.parse_args()
+
+    rows = {table: args.rows if args.rows is not None else getattr(args, table) for table in DEFAULT_ROWS}
+    size = generate_spass(args.output, args.password, rows, args.unknown_tables, args.seed)
+    print(f"已生成 {args.output} ({size / 1024 / 1024:.2f} MiB, 行数: {rows})")
+
+
+if __name__ == "__main__":
+    main()
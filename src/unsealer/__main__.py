@@ -2,18 +2,28 @@
 
 import sys
 import argparse
+import importlib
+
+# Subcommand modules are imported on demand, so that `unsealer samsung`
+# never pays for the PIL / pyzbar imports of the google module.
+SUBCOMMAND_MODULES = {
+    "samsung": "unsealer.samsung.cli",
+    "google": "unsealer.google.cli",
+}
+
+
+def _load_subcommand(command: str):
+    try:
+        return importlib.import_module(SUBCOMMAND_MODULES[command])
+    except ImportError as e:
+        print(
+            f"Fatal Error: Could not import a required submodule.\n"
+            f"Please ensure your project structure is correct.\nDetails: {e}",
+            file=sys.stderr
+        )
+        sys.exit(1)
+
 
-try:
-    from unsealer.samsung import cli as samsung_cli
-    from unsealer.google import cli as google_cli
-except ImportError as e:
-    print(
-        f"Fatal Error: Could not import a required submodule.\n"
-        f"Please ensure your project structure is correct.\nDetails: {e}",
-        file=sys.stderr
-    )
-    sys.exit(1)
-    
 def main():
     # 1. Create the parser
     parser = argparse.ArgumentParser(
@@ -48,10 +58,8 @@ def main():
 
     args = parser.parse_args(sys.argv[1:2])
 
-    if args.command == "samsung":
-        samsung_cli.main()
-    elif args.command == "google":
-        google_cli.main()
+    if args.command in SUBCOMMAND_MODULES:
+        _load_subcommand(args.command).main()
     else:
         parser.print_help()
 
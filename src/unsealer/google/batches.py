@@ -0,0 +1,141 @@
+from typing import Dict, List, Any, Callable, Set, Tuple, TextIO, Iterator, Optional
+
+from .decrypter import decode_migration_uri
+
+MIGRATION_PREFIX = "otpauth-migration://"
+
+# 最多保留的错误详情条数 (错误总数始终完整统计)
+MAX_ERROR_DETAILS = 20
+
+AccountKey = Tuple[str, str, str]
+
+
+def account_identity(account: Dict[str, Any]) -> AccountKey:
+    """
+    账户的稳定身份键：(发行者, 账户名, 密钥)
+    """
+    return account["issuer"], account["name"], account["totp_secret"]
+
+
+def iter_uri_lines(stream: TextIO) -> Iterator[Tuple[int, str]]:
+    """
+    逐行读取文本流中的迁移 URI，产出 (行号, URI)；空行与 # 注释行被忽略
+    """
+    for line_no, line in enumerate(stream, 1):
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line_no, line
+
+
+class _BatchState:
+    __slots__ = ("batch_size", "pages")
+
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+        # 页序号 -> URI 的哈希，用于区分 "同一页重复出现" 与 "页序号冲突"
+        self.pages: Dict[int, int] = {}
+
+
+class BatchAssembler:
+    """
+    按 batch_id 重组分页导出的迁移 URI，并在一次遍历中合并账户
+
+    只为每个批次保存已见页序号及其 URI 哈希，不保留 URI 或载荷本身，
+    因此内存占用只与批次页数和去重后的账户数量相关，与输入行数无关。
+    """
+
+    def __init__(self, on_account: Optional[Callable[[Dict[str, Any]], None]] = None):
+        # 每发现一个新账户时调用 (例如逐行输出 NDJSON)
+        self.on_account = on_account
+        self._batches: Dict[int, _BatchState] = {}
+        self._accounts: Dict[AccountKey, Dict[str, Any]] = {}
+        self.uri_count = 0
+        self.repeated = 0
+        self.error_count = 0
+        self.errors: List[str] = []
+        self.conflicts: Dict[int, Set[int]] = {}
+
+    def add(self, uri: str, source: Optional[str] = None) -> int:
+        """
+        处理一个 URI，返回新增的账户数；无法解析的 URI 只记录错误，不中断处理
+        """
+        self.uri_count += 1
+        if not uri.startswith(MIGRATION_PREFIX):
+            self._record_error(source, "不是 otpauth-migration:// URI")
+            return 0
+        try:
+            batch, accounts = decode_migration_uri(uri)
+        except ValueError as e:
+            self._record_error(source, str(e))
+            return 0
+
+        state = self._batches.get(batch.batch_id)
+        if state is None:
+            state = self._batches[batch.batch_id] = _BatchState(max(batch.batch_size, 1))
+        else:
+            state.batch_size = max(state.batch_size, batch.batch_size)
+
+        uri_hash = hash(uri)
+        known = state.pages.get(batch.batch_index)
+        if known is None:
+            state.pages[batch.batch_index] = uri_hash
+        elif known == uri_hash:
+            # 同一张二维码被重复提供，账户已合并过
+            self.repeated += 1
+            return 0
+        else:
+            self.conflicts.setdefault(batch.batch_id, set()).add(batch.batch_index)
+
+        added = 0
+        for account in accounts:
+            key = account_identity(account)
+            if key not in self._accounts:
+                self._accounts[key] = account
+                added += 1
+                if self.on_account is not None:
+                    self.on_account(account)
+        return added
+
+    def _record_error(self, source: Optional[str], message: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_ERROR_DETAILS:
+            self.errors.append(f"{source}: {message}" if source else message)
+
+    # --- 结果 ---
+
+    def missing(self) -> Dict[int, List[int]]:
+        """
+        返回不完整的批次：{batch_id: 缺失的页序号列表}
+        """
+        result = {}
+        for batch_id, state in self._batches.items():
+            absent = [i for i in range(state.batch_size) if i not in state.pages]
+            if absent:
+                result[batch_id] = absent
+        return result
+
+    def duplicates(self) -> Dict[int, List[int]]:
+        """
+        返回页序号冲突的批次：{batch_id: 内容不一致的页序号列表}
+        """
+        return {batch_id: sorted(indexes) for batch_id, indexes in self.conflicts.items()}
+
+    def batch_size(self, batch_id: int) -> int:
+        return self._batches[batch_id].batch_size
+
+    @property
+    def batch_count(self) -> int:
+        return len(self._batches)
+
+    @property
+    def is_complete(self) -> bool:
+        return not self.missing() and not self.conflicts
+
+    def accounts(self) -> List[Dict[str, Any]]:
+        """
+        按发行者排序的去重账户列表
+        """
+        return sorted(self._accounts.values(), key=lambda x: x["issuer"].lower())
+
+    def __len__(self) -> int:
+        return len(self._accounts)
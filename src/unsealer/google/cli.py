@@ -2,18 +2,121 @@
 
 import sys
 import argparse
+import functools
 from pathlib import Path
 from datetime import datetime
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 from rich.prompt import Prompt
-from .decrypter import decrypt_google_auth_uri
-from .scanner import extract_uris_from_path
+from typing import Dict, Iterator, Optional
+from ..ndjson_export import STDOUT_PATH, open_ndjson
+from ..profiling import profile_session
+from ..utils import CACHE_ENV, cache_enabled_by_default
+from .batches import BatchAssembler, iter_uri_lines
+from .scan_cache import ScanIndex
 
 # 初始化控制台
 console = Console(stderr=True)
 
+# SQLite / NDJSON 导出中使用的表名
+ACCOUNTS_TABLE = "google_accounts"
+
+def _scan_path(
+    path_str: str,
+    recursive: bool = False,
+    workers: Optional[int] = None,
+    index: Optional[ScanIndex] = None,
+    stats: Optional[Dict[str, int]] = None,
+) -> Iterator[str]:
+    """
+    扫描图片中的二维码，逐个产出发现的 URI；PIL 与 pyzbar (依赖 libzbar) 导入较慢，仅在需要时加载
+    """
+    try:
+        from .scanner import iter_uris_from_path
+    except ImportError as e:
+        console.print(
+            f"[bold red]✗ 无法加载二维码扫描组件:[/bold red] {e}\n"
+            "[dim]请确认已安装 pillow 与 pyzbar (Linux 还需要 libzbar0 系统库)。[/dim]"
+        )
+        sys.exit(1)
+    return iter_uris_from_path(path_str, recursive, workers, index, stats)
+
+def _cache_command(argv):
+    """
+    扫描索引管理子命令: unsealer google cache {clear,info} [路径]
+    """
+    parser = argparse.ArgumentParser(
+        prog="unsealer google cache", description="管理二维码扫描结果的本地索引。"
+    )
+    parser.add_argument("action", choices=["clear", "info"], help="clear: 使索引失效；info: 查看索引状态。")
+    parser.add_argument("path", nargs="?", type=Path, help="只清除该目录 (或图片) 的索引条目。")
+    args = parser.parse_args(argv)
+
+    index = ScanIndex()
+    if args.action == "clear":
+        removed = index.invalidate(args.path)
+        index.save()
+        console.print(f"[bold green]✓[/] 已清除 {removed} 条扫描索引 ({index.index_path})。")
+    else:
+        console.print(
+            f"索引文件: [bold magenta]{index.index_path}[/]\n"
+            f"条目数: {len(index)} / 上限 {index.max_entries}"
+        )
+
+def _read_uri_file(uri_file: str, assembler: BatchAssembler, status):
+    """
+    从文件 (或 "-" 表示的标准输入) 逐行读取 URI 并流式合并
+    """
+    if uri_file == "-":
+        stream, source = sys.stdin, "stdin"
+    else:
+        try:
+            stream = open(uri_file, "r", encoding="utf-8")
+        except OSError as e:
+            console.print(f"[bold red]✗ 无法读取 URI 文件:[/bold red] {e}")
+            sys.exit(1)
+        source = Path(uri_file).name
+
+    try:
+        for line_no, uri in iter_uri_lines(stream):
+            assembler.add(uri, f"{source}:{line_no}")
+            if assembler.uri_count % 1000 == 0:
+                status.update(
+                    f"[bold green]正在读取 URI... 已处理 {assembler.uri_count} 行，{len(assembler)} 个账户"
+                )
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+def _report_batches(assembler: BatchAssembler) -> bool:
+    """
+    汇报批次完整性；存在缺页或页序号冲突时返回 False
+    """
+    if assembler.repeated:
+        console.print(f"[dim]已跳过 {assembler.repeated} 个重复的二维码/URI。[/dim]")
+    if assembler.error_count:
+        console.print(f"[yellow]⚠ {assembler.error_count} 个 URI 无法解析:[/yellow]")
+        for message in assembler.errors:
+            console.print(f"  [dim]- {message}[/dim]")
+        if assembler.error_count > len(assembler.errors):
+            console.print(f"  [dim]... 其余 {assembler.error_count - len(assembler.errors)} 条已省略[/dim]")
+
+    missing = assembler.missing()
+    duplicates = assembler.duplicates()
+    for batch_id, indexes in missing.items():
+        pages = ", ".join(str(i + 1) for i in indexes)
+        console.print(
+            f"[bold red]✗ 批次 {batch_id} 不完整:[/bold red] 缺少第 {pages} 页 "
+            f"(共 {assembler.batch_size(batch_id)} 页)，对应二维码中的账户未被导出。"
+        )
+    for batch_id, indexes in duplicates.items():
+        pages = ", ".join(str(i + 1) for i in indexes)
+        console.print(
+            f"[bold red]✗ 批次 {batch_id} 页序号冲突:[/bold red] 第 {pages} 页出现了内容不同的多个二维码。"
+        )
+    return not missing and not duplicates
+
 def _save_report(accounts, output_path: Path):
     """
     将结果保存为 Markdown 格式
@@ -36,32 +139,43 @@ def _save_report(accounts, output_path: Path):
     except Exception as e:
         console.print(f"[bold red]✗ 无法保存文件:[/bold red] {e}")
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="Google Authenticator 迁移数据提取工具 (免 Protobuf 编译版)"
-    )
-    
-    parser.add_argument("inputs", nargs="*", help="URI 字符串、二维码图片路径或目录")
-    parser.add_argument("-o", "--output", type=Path, help="导出 Markdown 报告的文件路径")
-    
-    # 接收来自 __main__.py 的参数分发
-    args = parser.parse_args(sys.argv[2:])
+def _save_sqlite(accounts, output_path: Path):
+    """
+    将结果写入 SQLite 数据库的 google_accounts 表 (可与三星导出使用同一个数据库)
+    """
+    from ..sqlite_export import export_tables
 
-    final_uris = set()
+    try:
+        export_tables(output_path, [(ACCOUNTS_TABLE, accounts)])
+        console.print(f"\n[bold green]✓[/] 已写入数据库: [bold magenta]{output_path}[/] (表 {ACCOUNTS_TABLE})")
+    except Exception as e:
+        console.print(f"[bold red]✗ 无法写入数据库:[/bold red] {e}")
 
+def _collect_uris(
+    args: argparse.Namespace,
+    assembler: BatchAssembler,
+    index: Optional[ScanIndex],
+    scan_stats: Dict[str, int],
+):
+    """
+    收集命令行、URI 文件与交互输入中的全部迁移 URI，交给 assembler 合并
+    """
     # 1.处理命令行直接提供的输入
-    if args.inputs:
-        with console.status("[bold green]正在扫描输入源..."):
+    if args.inputs or args.uri_file:
+        with console.status("[bold green]正在扫描输入源...") as status:
             for item in args.inputs:
                 if item.startswith("otpauth-migration://"):
-                    final_uris.add(item)
+                    assembler.add(item, "命令行参数")
                 else:
-                    # 尝试作为文件路径扫描二维码
-                    uris_found = extract_uris_from_path(item)
-                    final_uris.update(uris_found)
+                    # 尝试作为文件路径扫描二维码，边扫描边汇报进度
+                    for uri in _scan_path(item, args.recursive, args.jobs, index, scan_stats):
+                        assembler.add(uri, item)
+                        status.update(f"[bold green]正在扫描输入源... 已发现 {assembler.uri_count} 个 URI")
+            if args.uri_file:
+                _read_uri_file(args.uri_file, assembler, status)
     
     # 2. 交互模式
-    if not final_uris:
+    if not assembler.uri_count and not args.uri_file:
         console.print(Panel(
             "未检测到输入数据。您可以：\n"
             "1. 直接粘贴 [bold cyan]otpauth-migration://[/] 开头的 URI\n"
@@ -72,39 +186,108 @@ def main():
         ))
         
         while True:
-            val = Prompt.ask("[bold yellow]输入 URI/路径 (留空结束)[/]").strip()
+            val = Prompt.ask("[bold yellow]输入 URI/路径 (留空结束)[/]", console=console).strip()
             if not val:
                 break
             if val.startswith("otpauth-migration://"):
-                final_uris.add(val)
+                assembler.add(val, "交互输入")
             else:
-                uris_found = extract_uris_from_path(val)
+                uris_found = set(_scan_path(val, args.recursive, args.jobs, index, scan_stats))
                 if uris_found:
-                    final_uris.update(uris_found)
+                    for uri in uris_found:
+                        assembler.add(uri, val)
                     console.print(f"[dim]已从路径中提取 {len(uris_found)} 个 URI[/dim]")
                 else:
                     console.print("[red]未在指定路径发现有效的二维码或 URI。[/red]")
 
-    if not final_uris:
+def main():
+    if sys.argv[2:3] == ["cache"]:
+        _cache_command(sys.argv[3:])
+        return
+
+    parser = argparse.ArgumentParser(
+        description="Google Authenticator 迁移数据提取工具 (免 Protobuf 编译版)"
+    )
+    
+    parser.add_argument("inputs", nargs="*", help="URI 字符串、二维码图片路径或目录")
+    parser.add_argument("-o", "--output", type=Path, help="导出文件的路径 (Markdown 报告或 SQLite 数据库)")
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=["md", "sqlite", "ndjson"],
+        default="md",
+        help="导出格式 (默认为: md)；ndjson 未指定 -o 时逐行写入标准输出",
+    )
+    parser.add_argument("-r", "--recursive", action="store_true", help="递归扫描目录下的全部子目录")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="并行解码图片的进程数 (默认为 CPU 核心数)")
+    cache_group = parser.add_mutually_exclusive_group()
+    cache_group.add_argument(
+        "--cache",
+        dest="use_cache",
+        action="store_true",
+        default=cache_enabled_by_default(),
+        help=f"启用扫描索引，跳过未变化且不含二维码的图片 (也可设置环境变量 {CACHE_ENV}=1)",
+    )
+    cache_group.add_argument("--no-cache", dest="use_cache", action="store_false", help="本次运行不读写扫描索引")
+    parser.add_argument(
+        "--uri-file",
+        metavar="PATH",
+        help="从文本文件逐行读取迁移 URI (\"-\" 表示标准输入)，按批次重组并报告缺页",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        metavar="REPORT.json",
+        help="记录扫描与解析各阶段的耗时、字节数与数量，并写入 JSON 报告",
+    )
+    parser.add_argument("--cprofile", type=Path, metavar="PATH", help="同时保存 cProfile 数据")
+
+    # 接收来自 __main__.py 的参数分发
+    args = parser.parse_args(sys.argv[2:])
+    with profile_session(args.profile, args.cprofile):
+        _run(args)
+    if args.profile:
+        console.print(f"[dim]分析报告已保存至 {args.profile}[/dim]")
+
+def _run(args: argparse.Namespace):
+    index = ScanIndex() if args.use_cache else None
+
+    scan_stats: Dict[str, int] = {}
+    if args.format == "ndjson":
+        # 账户在首次出现时立即输出，下游无需等待全部输入处理完毕
+        with open_ndjson(args.output or STDOUT_PATH) as writer:
+            assembler = BatchAssembler(on_account=functools.partial(writer.write, ACCOUNTS_TABLE))
+            _collect_uris(args, assembler, index, scan_stats)
+    else:
+        assembler = BatchAssembler()
+        _collect_uris(args, assembler, index, scan_stats)
+
+    if scan_stats:
+        summary = ", ".join(f"{tier} {count}" for tier, count in sorted(scan_stats.items()))
+        console.print(f"[dim]已扫描 {sum(scan_stats.values())} 张图片 (识别级别: {summary})[/dim]")
+
+    if not assembler.uri_count:
         console.print("[bold red]错误: 没有找到任何可处理的 Google 迁移数据。[/]")
         return
 
-    # 3. 解密与去重
-    all_accounts_map = {}
-    try:
-        with console.status("[bold green]正在解密多批次数据..."):
-            for uri in final_uris:
-                accounts = decrypt_google_auth_uri(uri)
-                for acc in accounts:
-                    # 使用 secret 作为 key 进行去重
-                    all_accounts_map[acc['totp_secret']] = acc
+    # 3. 批次完整性检查 (账户已在读取时按 发行者+账户名+密钥 合并)
+    complete = _report_batches(assembler)
+    if args.format == "ndjson":
+        console.print(f"[bold green]✓[/] 已输出 {len(assembler)} 个账户 (NDJSON)。")
+        if not complete:
+            console.print("[bold red]✗ 导出数据不完整，请补充缺失的二维码后重新运行。[/]")
+            sys.exit(1)
+        return
 
+    try:
         # 按服务商名称排序
-        final_accounts = sorted(all_accounts_map.values(), key=lambda x: x['issuer'].lower())
+        final_accounts = assembler.accounts()
 
         # 4. 展示结果表格
         if not final_accounts:
             console.print("[yellow]解析完成，但未发现有效的账户数据。[/yellow]")
+            if not complete:
+                sys.exit(1)
             return
 
         table = Table(
@@ -128,14 +311,20 @@ def main():
         console.print("\n", table)
 
         # 5. 执行导出逻辑
-        if args.output:
+        if args.output and args.format == "sqlite":
+            _save_sqlite(final_accounts, args.output)
+        elif args.output:
             _save_report(final_accounts, args.output)
         else:
-            console.print("\n[dim]提示: 使用 -o 参数可将结果导出为 Markdown 文件。[/dim]")
+            console.print("\n[dim]提示: 使用 -o 参数可将结果导出为 Markdown 文件 (或配合 -f sqlite 写入数据库)。[/dim]")
 
     except Exception as e:
         console.print(f"[bold red]致命解析错误: [/] {e}")
         console.print("[dim]这可能是由于 URI 格式损坏或协议版本不兼容导致的。[/dim]")
 
+    if not complete:
+        console.print("[bold red]✗ 导出数据不完整，请补充缺失的二维码后重新运行。[/]")
+        sys.exit(1)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
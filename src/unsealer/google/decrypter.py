@@ -1,98 +1,218 @@
 import base64
-from urllib.parse import urlparse, parse_qs
-from typing import List, Dict, Any
+import time
+from urllib.parse import unquote_plus
+from typing import List, Dict, Any, Iterable, Iterator, NamedTuple, Tuple, Union
+
+from .. import profiling
+
+# Protobuf wire types
+WIRE_VARINT = 0
+WIRE_FIXED64 = 1
+WIRE_LENGTH_DELIMITED = 2
+WIRE_FIXED32 = 5
+
+# OtpParameters.algorithm / digits 映射表
+ALGO_MAP = {0: "SHA1", 1: "SHA1", 2: "SHA256", 3: "SHA512", 4: "MD5"}
+
+FieldValue = Union[int, memoryview]
+
+
+class MigrationBatch(NamedTuple):
+    """
+    MigrationPayload 中的分页信息 (2: version, 3: batch_size, 4: batch_index, 5: batch_id)
+    """
+    version: int
+    batch_size: int
+    batch_index: int
+    batch_id: int
+
 
 def _parse_varint(data, pos):
     """
     解析 Protobuf 的 Varint 编码
     """
-    res = 0
-    shift = 0
+    b = data[pos]
+    if b < 0x80:
+        # 单字节 Varint (tag、算法、位数等) 是最常见的情况
+        return b, pos + 1
+    res = b & 0x7f
+    shift = 7
+    pos += 1
     while True:
         b = data[pos]
         res |= (b & 0x7f) << shift
         pos += 1
-        if not (b & 0x80):
+        if b < 0x80:
             return res, pos
         shift += 7
 
-def _parse_message(data):
+
+def _iter_fields(data: memoryview) -> Iterator[Tuple[int, int, FieldValue]]:
     """
-    简易 Protobuf 逻辑解析器：将二进制流解析为 Tag 字典
+    零拷贝 Protobuf 解析器：逐个产出 (tag, wire_type, value)
+
+    长度限定字段以 memoryview 切片的形式返回，不复制底层字节。
     """
     pos = 0
-    res = {}
-    while pos < len(data):
+    end = len(data)
+    while pos < end:
         tag_and_type, pos = _parse_varint(data, pos)
         tag = tag_and_type >> 3
         wire_type = tag_and_type & 0x07
-        
-        if wire_type == 0:  # Varint
+
+        if wire_type == WIRE_VARINT:
             val, pos = _parse_varint(data, pos)
-        elif wire_type == 2:  # Length-delimited (String/Bytes/Nested)
+        elif wire_type == WIRE_LENGTH_DELIMITED:  # String/Bytes/Nested
             l, pos = _parse_varint(data, pos)
-            val = data[pos:pos+l]
+            if pos + l > end:
+                raise ValueError(f"Truncated length-delimited field {tag}")
+            val = data[pos:pos + l]
             pos += l
+        elif wire_type == WIRE_FIXED64:
+            if pos + 8 > end:
+                raise ValueError(f"Truncated fixed64 field {tag}")
+            val = int.from_bytes(data[pos:pos + 8], "little")
+            pos += 8
+        elif wire_type == WIRE_FIXED32:
+            if pos + 4 > end:
+                raise ValueError(f"Truncated fixed32 field {tag}")
+            val = int.from_bytes(data[pos:pos + 4], "little")
+            pos += 4
         else:
             raise ValueError(f"Unsupported wire type: {wire_type}")
-        
-        if tag not in res:
-            res[tag] = []
-        res[tag].append(val)
-    return res
 
-def decrypt_google_auth_uri(uri: str) -> List[Dict[str, Any]]:
+        yield tag, wire_type, val
+
+
+def _decode_otp_parameters(data: memoryview) -> Dict[str, Any]:
     """
-    不需要 pb2 文件的 Google 迁移 URI 解析器
+    解析内层 OtpParameters 消息
+    1: secret, 2: name, 3: issuer, 4: algorithm, 5: digits, 6: type
     """
-    try:
-        parsed_uri = urlparse(uri)
-        query_params = parse_qs(parsed_uri.query)
-        encoded_data = query_params.get('data', [''])[0]
-        
-        # 1. Base64 解码
+    secret = name = issuer = algo_idx = digit_idx = None
+    # 与旧实现一致：重复出现的字段以第一次出现的值为准
+    for tag, _, val in _iter_fields(data):
+        if tag == 1 and secret is None:
+            secret = val
+        elif tag == 2 and name is None:
+            name = str(val, "utf-8")
+        elif tag == 3 and issuer is None:
+            issuer = str(val, "utf-8")
+        elif tag == 4 and algo_idx is None:
+            algo_idx = val
+        elif tag == 5 and digit_idx is None:
+            digit_idx = val
+
+    if name is None:
+        name = "Unknown"
+    if issuer is None:
+        issuer = ""
+
+    # 转换 Secret 为 Base32
+    b32_secret = base64.b32encode(secret if secret is not None else b'').decode('utf-8').rstrip('=')
+
+    # 处理 Issuer 逻辑
+    if not issuer and ":" in name:
+        issuer = name.split(":", 1)[0].strip()
+        name = name.split(":", 1)[1].strip()
+
+    return {
+        "issuer": issuer or "Unknown",
+        "name": name,
+        "totp_secret": b32_secret,
+        "algorithm": ALGO_MAP.get(1 if algo_idx is None else algo_idx, "SHA1"),
+        "digits": "8" if digit_idx == 2 else "6"
+    }
+
+
+def _extract_payload(uri: str) -> memoryview:
+    """
+    取出 URI 中的 data 参数并 Base64 解码 (与 parse_qs 的解码规则一致)
+    """
+    encoded_data = ""
+    query = uri.partition("?")[2].partition("#")[0]
+    for part in query.split("&"):
+        key, _, value = part.partition("=")
+        if value and unquote_plus(key) == "data":
+            encoded_data = unquote_plus(value)
+            break
+
+    with profiling.stage("uri_base64") as frame:
         missing_padding = len(encoded_data) % 4
         if missing_padding:
             encoded_data += '=' * (4 - missing_padding)
-        binary_payload = base64.b64decode(encoded_data)
-
-        # 2. 解析外层 MigrationPayload
-        # Tag 1: repeated OtpParameters otp_parameters
-        payload_dict = _parse_message(binary_payload)
-        otp_params_list = payload_dict.get(1, [])
-
-        # 3. 映射表
-        ALGO_MAP = {0: "SHA1", 1: "SHA1", 2: "SHA256", 3: "SHA512", 4: "MD5"}
-        
-        accounts = []
-        for raw_otp in otp_params_list:
-            # 解析内层 OtpParameters 消息
-            otp_dict = _parse_message(raw_otp)
-            
-            # 提取字段
-            # 1: secret, 2: name, 3: issuer, 4: algorithm, 5: digits, 6: type
-            secret = otp_dict.get(1, [b''])[0]
-            name = otp_dict.get(2, [b'Unknown'])[0].decode('utf-8')
-            issuer = otp_dict.get(3, [b''])[0].decode('utf-8')
-            algo_idx = otp_dict.get(4, [1])[0]
-            digit_idx = otp_dict.get(5, [1])[0]
-
-            # 转换 Secret 为 Base32
-            b32_secret = base64.b32encode(secret).decode('utf-8').rstrip('=')
-            
-            # 处理 Issuer 逻辑
-            if not issuer and ":" in name:
-                issuer = name.split(":", 1)[0].strip()
-                name = name.split(":", 1)[1].strip()
-
-            accounts.append({
-                "issuer": issuer or "Unknown",
-                "name": name,
-                "totp_secret": b32_secret,
-                "algorithm": ALGO_MAP.get(algo_idx, "SHA1"),
-                "digits": "8" if digit_idx == 2 else "6"
-            })
-
-        return accounts
+        frame.nbytes = len(encoded_data)
+        return memoryview(base64.b64decode(encoded_data))
+
+
+def iter_google_auth_accounts(uri: str) -> Iterator[Dict[str, Any]]:
+    """
+    惰性解析迁移 URI，逐个产出账户
+    """
+    profiler = profiling.active()
+    # Tag 1: repeated OtpParameters otp_parameters
+    for tag, wire_type, val in _iter_fields(_extract_payload(uri)):
+        if tag == 1 and wire_type == WIRE_LENGTH_DELIMITED:
+            if profiler is None:
+                yield _decode_otp_parameters(val)
+                continue
+            start = time.perf_counter()
+            account = _decode_otp_parameters(val)
+            profiler.add("protobuf", time.perf_counter() - start, nbytes=len(val), rows=1)
+            yield account
+
+
+def _to_int32(value: int) -> int:
+    # 负的 int32 以 10 字节的补码 Varint 编码
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def decode_migration_uri(uri: str) -> Tuple[MigrationBatch, List[Dict[str, Any]]]:
+    """
+    解析迁移 URI，同时返回分页信息与账户列表
+    """
+    accounts: List[Dict[str, Any]] = []
+    version = batch_size = batch_index = batch_id = 0
+    try:
+        with profiling.stage("protobuf") as frame:
+            payload = _extract_payload(uri)
+            frame.nbytes = len(payload)
+            for tag, wire_type, val in _iter_fields(payload):
+                if tag == 1 and wire_type == WIRE_LENGTH_DELIMITED:
+                    accounts.append(_decode_otp_parameters(val))
+                elif wire_type == WIRE_VARINT:
+                    if tag == 2:
+                        version = val
+                    elif tag == 3:
+                        batch_size = val
+                    elif tag == 4:
+                        batch_index = val
+                    elif tag == 5:
+                        batch_id = _to_int32(val)
+            frame.rows = len(accounts)
     except Exception as e:
-        raise ValueError(f"Manual parsing failed: {str(e)}")
\ No newline at end of file
+        raise ValueError(f"Manual parsing failed: {str(e)}")
+    return MigrationBatch(version, batch_size, batch_index, batch_id), accounts
+
+
+def decrypt_google_auth_uri(uri: str) -> List[Dict[str, Any]]:
+    """
+    不需要 pb2 文件的 Google 迁移 URI 解析器
+    """
+    try:
+        return list(iter_google_auth_accounts(uri))
+    except Exception as e:
+        raise ValueError(f"Manual parsing failed: {str(e)}")
+
+
+def decrypt_google_auth_uris(uris: Iterable[str]) -> List[Dict[str, Any]]:
+    """
+    批量解析多个迁移 URI，按输入顺序返回全部账户
+    """
+    accounts: List[Dict[str, Any]] = []
+    for index, uri in enumerate(uris, 1):
+        try:
+            accounts.extend(iter_google_auth_accounts(uri))
+        except Exception as e:
+            raise ValueError(f"Manual parsing failed for URI #{index}: {str(e)}")
+    return accounts
@@ -0,0 +1,135 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from ..utils import get_cache_dir
+
+DEFAULT_MAX_ENTRIES = 100_000
+# 识别流程变化时提升版本号，使旧的 "未发现二维码" 记录失效
+# (版本 3 起不再保存迁移 URI 与内容哈希)
+_INDEX_VERSION = 3
+
+
+class ScanIndex:
+    """
+    二维码扫描结果的磁盘索引
+
+    只记录"未发现迁移 URI"的图片，以 (路径, 大小, 修改时间) 判断图片是否变化，
+    使增量扫描可以跳过大量无关图片。含有迁移 URI 的图片不写入索引 (URI 中包含全部 TOTP 密钥)，
+    每次都重新解码；因此索引中不含任何敏感数据，查询时也无需在主进程中读取图片内容。
+    """
+
+    def __init__(self, index_path: Optional[Path] = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.index_path = (
+            Path(index_path) if index_path else get_cache_dir() / "google" / "scan_index.json"
+        )
+        self.max_entries = max_entries
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    # --- 持久化 ---
+
+    def _load(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        if data.get("version") != _INDEX_VERSION:
+            # 旧版本的索引以明文保存了迁移 URI，直接删除
+            self.index_path.unlink(missing_ok=True)
+            return
+        self._entries = data.get("entries", {})
+
+    def save(self):
+        """
+        将索引原子地写回磁盘 (超过容量上限时先淘汰最久未见的条目)
+        """
+        if not self._dirty:
+            return
+        self._evict()
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"version": _INDEX_VERSION, "entries": self._entries}, f)
+        os.replace(tmp_path, self.index_path)
+        self._dirty = False
+
+    def _evict(self):
+        overflow = len(self._entries) - self.max_entries
+        if overflow <= 0:
+            return
+        oldest = sorted(self._entries, key=lambda key: self._entries[key].get("seen", 0))
+        for key in oldest[:overflow]:
+            del self._entries[key]
+
+    # --- 查询与记录 ---
+
+    def lookup(self, image_path: Path) -> Optional[List[str]]:
+        """
+        图片未变化且已知不含迁移 URI 时返回空列表；需要重新解码时返回 None
+        """
+        try:
+            key = str(image_path.resolve())
+            st = image_path.stat()
+        except OSError:
+            return None
+
+        entry = self._entries.get(key)
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            entry["seen"] = time.time()
+            self._dirty = True
+            self.hits += 1
+            return []
+        self.misses += 1
+        return None
+
+    def record(self, image_path: Path, uris: List[str], tier: Optional[str] = None):
+        """
+        记录一张图片的解码结果：只保存不含迁移 URI 的图片，含有 URI 时移除旧记录
+        """
+        try:
+            key = str(image_path.resolve())
+            st = image_path.stat()
+        except OSError:
+            return
+        if uris:
+            if self._entries.pop(key, None) is not None:
+                self._dirty = True
+            return
+        self._entries[key] = {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "seen": time.time(),
+        }
+        self._dirty = True
+
+    # --- 失效 ---
+
+    def invalidate(self, path_prefix: Optional[Path] = None) -> int:
+        """
+        删除指定目录 (或全部) 的索引条目；返回删除的条目数
+        """
+        if path_prefix is None:
+            removed = len(self._entries)
+            self._entries.clear()
+        else:
+            prefix = str(Path(path_prefix).resolve())
+            keys = [
+                key for key in self._entries
+                if key == prefix or key.startswith(prefix.rstrip(os.sep) + os.sep)
+            ]
+            for key in keys:
+                del self._entries[key]
+            removed = len(keys)
+        self._dirty = True
+        return removed
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,35 +1,233 @@
 import os
+import time
+from collections import deque
 from pathlib import Path
-from PIL import Image
-from pyzbar.pyzbar import decode
-from typing import Set
+from PIL import Image, ImageOps
+from pyzbar.pyzbar import decode, ZBarSymbol
+from typing import Dict, Set, List, Tuple, Iterable, Iterator, Optional, Deque, TYPE_CHECKING
 
-def extract_uris_from_path(path_str: str) -> Set[str]:
+from .. import profiling
+
+if TYPE_CHECKING:
+    from .scan_cache import ScanIndex
+
+# 扫描支持的格式
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.bmp', '.webp'}
+MIGRATION_PREFIX = "otpauth-migration://"
+
+
+def iter_image_files(path: Path, recursive: bool = False) -> Iterator[Path]:
     """
-    扫描路径下的所有二维码图片，提取迁移 URI
+    列出路径下所有支持的图片文件；recursive 为 True 时遍历全部子目录
+    """
+    if path.is_file():
+        if path.suffix.lower() in IMAGE_EXTENSIONS:
+            yield path
+        return
+
+    if recursive:
+        for root, _, names in os.walk(path):
+            for name in names:
+                if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+                    yield Path(root) / name
+    else:
+        for f in path.iterdir():
+            if f.suffix.lower() in IMAGE_EXTENSIONS and f.is_file():
+                yield f
+
+
+# --- 分级识别流程 ---
+# 先在缩小后的灰度图上做一次廉价识别；只有失败时才逐级尝试
+# 全分辨率、二值化增强和放大，并记录最终成功的级别。
+
+SCAN_TIERS = ("downscaled", "full", "threshold", "upscaled")
+
+# 第一级识别时图片长边的上限 (像素)
+FAST_PASS_MAX_SIDE = 1280
+# 长边小于该值的图片在最后一级放大后再识别
+UPSCALE_BELOW_SIDE = 800
+_QR_ONLY = [ZBarSymbol.QRCODE]
+
+
+def _decode_migration_uris(gray: Image.Image) -> List[str]:
+    uris = []
+    for obj in decode(gray, symbols=_QR_ONLY):
+        content = obj.data.decode('utf-8')
+        if content.startswith(MIGRATION_PREFIX):
+            uris.append(content)
+    return uris
+
+
+def _load_downscaled(image_path: str) -> Tuple[Image.Image, Optional[Image.Image]]:
+    """
+    以灰度读取缩小后的图片；JPEG 使用 draft 模式在解码阶段直接缩小
+    返回 (缩小后的图片, 全分辨率灰度图)；draft 已在解码阶段缩小时全分辨率图片为 None
+    """
+    with Image.open(image_path) as img:
+        full_size = img.size
+        img.draft('L', (FAST_PASS_MAX_SIDE, FAST_PASS_MAX_SIDE))
+        gray = img.convert('L')
+    full = gray if gray.size == full_size else None
+    if max(gray.size) > FAST_PASS_MAX_SIDE:
+        # 保留已解码的全分辨率图片供后续级别使用，缩小的是副本
+        gray = gray.copy()
+        gray.thumbnail((FAST_PASS_MAX_SIDE, FAST_PASS_MAX_SIDE))
+    return gray, full
+
+
+def _iter_enhanced(
+    image_path: str, gray: Optional[Image.Image], skip_full: bool
+) -> Iterator[Tuple[str, Image.Image]]:
+    """
+    按代价从低到高产出后续各级的候选图片
+
+    gray 为第一级已解码的全分辨率灰度图；只有 JPEG 在解码阶段被缩小时 (gray 为 None) 才重新读取文件。
+    """
+    if gray is None:
+        with Image.open(image_path) as img:
+            gray = img.convert('L')
+    if not skip_full:
+        yield "full", gray
+    # 拉伸对比度后按固定阈值二值化，用于低对比度的二维码
+    yield "threshold", ImageOps.autocontrast(gray).point(lambda p: 255 if p > 127 else 0)
+    if max(gray.size) < UPSCALE_BELOW_SIDE:
+        yield "upscaled", gray.resize((gray.width * 2, gray.height * 2), Image.BICUBIC)
+
+
+def scan_image(image_path: str) -> Tuple[str, List[str], Optional[str]]:
+    """
+    解码单张图片中的二维码，返回 (图片路径, 迁移 URI 列表, 成功的识别级别)
+    """
+    try:
+        gray, full = _load_downscaled(image_path)
+        downscaled = gray is not full
+        uris = _decode_migration_uris(gray)
+        if uris:
+            return image_path, uris, "downscaled" if downscaled else "full"
+
+        for tier, candidate in _iter_enhanced(image_path, full, skip_full=not downscaled):
+            uris = _decode_migration_uris(candidate)
+            if uris:
+                return image_path, uris, tier
+    except Exception:
+        pass
+    return image_path, [], None
+
+
+def iter_scan_results(
+    files: Iterable[Path], workers: Optional[int] = None
+) -> Iterator[Tuple[str, List[str], Optional[str]]]:
+    """
+    使用进程池并行解码图片，按完成顺序逐个产出 (图片路径, URI 列表, 识别级别)
+
+    同时在途的任务数量有上限，因此即使目录中有数千张图片，内存占用也保持平稳。
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for f in files:
+            yield scan_image(str(f))
+        return
+
+    # 进程池依赖 multiprocessing，导入开销较大，仅在真正并行时加载
+    from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+    max_in_flight = workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for f in files:
+            pending.add(executor.submit(scan_image, str(f)))
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def iter_uris_from_path(
+    path_str: str,
+    recursive: bool = False,
+    workers: Optional[int] = None,
+    index: Optional["ScanIndex"] = None,
+    stats: Optional[Dict[str, int]] = None,
+) -> Iterator[str]:
+    """
+    扫描路径下的二维码图片，在发现迁移 URI 时立即产出 (已去重)
+
+    提供 index 时，已知不含迁移 URI 且未变化的图片直接跳过，其余图片 (包括含有 URI 的图片) 都会解码。
+    提供 stats 时，按识别级别 (SCAN_TIERS / "none" / "cached") 累计图片数量。
+    启用分析器时以识别级别作为数据表，记录每张图片的等待耗时、文件大小与 URI 数量。
     """
-    found_uris = set()
     path = Path(path_str)
-    
     if not path.exists():
-        return found_uris
-
-    # 扫描支持的格式
-    exts = {'.png', '.jpg', '.jpeg', '.bmp', '.webp'}
-    files = [path] if path.is_file() else list(path.iterdir())
-    
-    for f in files:
-        if f.suffix.lower() not in exts:
-            continue
-        try:
-            with Image.open(f) as img:
-                # 提高黑白对比度
-                decoded = decode(img.convert('L'))
-                for obj in decoded:
-                    content = obj.data.decode('utf-8')
-                    if content.startswith("otpauth-migration://"):
-                        found_uris.add(content)
-        except Exception:
-            continue
-            
-    return found_uris
\ No newline at end of file
+        return
+
+    if path.is_file():
+        # 单张图片无需启动进程池
+        workers = 1
+
+    cached_results: Deque[List[str]] = deque()
+    profiler = profiling.active()
+
+    def files_to_decode() -> Iterator[Path]:
+        for f in iter_image_files(path, recursive):
+            cached = index.lookup(f) if index is not None else None
+            if cached is None:
+                yield f
+            else:
+                if stats is not None:
+                    stats["cached"] = stats.get("cached", 0) + 1
+                if profiler is not None:
+                    profiler.add("scan", table="cached", rows=len(cached))
+                cached_results.append(cached)
+
+    seen: Set[str] = set()
+
+    def new_uris(uris: List[str]) -> Iterator[str]:
+        for uri in uris:
+            if uri not in seen:
+                seen.add(uri)
+                yield uri
+
+    try:
+        results = iter_scan_results(files_to_decode(), workers)
+        while True:
+            start = time.perf_counter()
+            result = next(results, None)
+            if result is None:
+                break
+            image_path, uris, tier = result
+            if profiler is not None:
+                profiler.add(
+                    "scan",
+                    time.perf_counter() - start,
+                    tier or "none",
+                    os.path.getsize(image_path),
+                    len(uris),
+                )
+            if stats is not None:
+                stats[tier or "none"] = stats.get(tier or "none", 0) + 1
+            if index is not None:
+                index.record(Path(image_path), uris, tier)
+            while cached_results:
+                yield from new_uris(cached_results.popleft())
+            yield from new_uris(uris)
+        while cached_results:
+            yield from new_uris(cached_results.popleft())
+    finally:
+        if index is not None:
+            index.save()
+
+
+def extract_uris_from_path(
+    path_str: str,
+    recursive: bool = False,
+    workers: Optional[int] = None,
+    index: Optional["ScanIndex"] = None,
+) -> Set[str]:
+    """
+    扫描路径下的所有二维码图片，提取迁移 URI
+    """
+    return set(iter_uris_from_path(path_str, recursive, workers, index))
@@ -0,0 +1,52 @@
+# src/unsealer/ndjson_export.py
+
+import contextlib
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Any, Iterator, Optional, TextIO, Union
+
+# 以 "-" 作为输出路径时写入标准输出
+STDOUT_PATH = Path("-")
+
+
+def is_stdout(path: Optional[Union[str, Path]]) -> bool:
+    return path is not None and str(path) == "-"
+
+
+class NdjsonWriter:
+    """
+    每行输出一个 {"table": 表名, "entry": 条目} JSON 对象 (键按字典序排列)
+
+    条目可以是任意 Mapping (例如紧凑记录)，序列化时按 dict 处理。
+
+    写入标准输出时每行后立即 flush，下游的 jq 或导入脚本可以边解析边处理。
+    """
+
+    def __init__(self, stream: TextIO, flush: bool = True):
+        self.stream = stream
+        self.flush = flush
+        self.count = 0
+
+    def write(self, table: str, entry: Dict[str, Any]):
+        self.stream.write(
+            json.dumps(
+                {"table": table, "entry": entry}, ensure_ascii=False, sort_keys=True, default=dict
+            )
+        )
+        self.stream.write("\n")
+        if self.flush:
+            self.stream.flush()
+        self.count += 1
+
+
+@contextlib.contextmanager
+def open_ndjson(path: Union[str, Path]) -> Iterator[NdjsonWriter]:
+    """
+    打开 NDJSON 输出目标："-" 为标准输出 (逐行 flush)，其他路径为普通文件
+    """
+    if is_stdout(path):
+        yield NdjsonWriter(sys.stdout, flush=True)
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        yield NdjsonWriter(f, flush=False)
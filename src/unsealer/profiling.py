@@ -0,0 +1,250 @@
+# src/unsealer/profiling.py
+
+import contextlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+# 进度回调接收 Profiler.report() 的结果
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+# (阶段, 数据表) -> [自身耗时, 次数, 字节数, 行数]
+ProfileState = Dict[Tuple[str, Optional[str]], List[Union[float, int]]]
+
+# 当前进程中启用的分析器；未启用时各埋点只做一次 None 判断
+_active: Optional["Profiler"] = None
+
+
+class StageFrame:
+    """
+    一次阶段计时；在 with 块内可设置 rows / nbytes，退出时一并记录
+    """
+
+    __slots__ = ("stage", "table", "start", "child", "rows", "nbytes")
+
+    def __init__(self, stage: str, table: Optional[str] = None):
+        self.stage = stage
+        self.table = table
+        self.start = time.perf_counter()
+        self.child = 0.0
+        self.rows = 0
+        self.nbytes = 0
+
+
+class Profiler:
+    """
+    按阶段 (以及数据表) 累计耗时、字节数与行数
+
+    阶段可以嵌套：记录的耗时为扣除内部阶段后的自身耗时，因此各阶段耗时之和不超过总耗时。
+    流式导出时解密与解析发生在导出阶段内部，导出阶段只保留真正用于写入的时间。
+
+    作为上下文管理器使用时在当前进程中启用，库函数中的埋点会自动记录到该实例：
+
+        with Profiler(on_progress=print) as profiler:
+            decrypt_and_parse_stream(f, password)
+        profiler.write_report("report.json")
+
+    on_progress 按 progress_interval (秒) 节流，在处理过程中周期性地收到 report() 的结果。
+    """
+
+    def __init__(self, on_progress: Optional[ProgressCallback] = None, progress_interval: float = 1.0):
+        self.on_progress = on_progress
+        self.progress_interval = progress_interval
+        self.counters: Dict[str, int] = {}
+        self._stats: ProfileState = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._previous: Optional[Profiler] = None
+        self._started = time.perf_counter()
+        self._last_progress = self._started
+
+    # --- 启用与停用 ---
+
+    def __enter__(self) -> "Profiler":
+        global _active
+        self._previous, _active = _active, self
+        return self
+
+    def __exit__(self, *exc_info):
+        global _active
+        _active, self._previous = self._previous, None
+
+    # --- 记录 ---
+
+    def _stack(self) -> List[StageFrame]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def enter(self, stage: str, table: Optional[str] = None) -> StageFrame:
+        frame = StageFrame(stage, table)
+        self._stack().append(frame)
+        return frame
+
+    def exit(self, frame: StageFrame):
+        stack = self._stack()
+        stack.pop()
+        elapsed = time.perf_counter() - frame.start
+        if stack:
+            stack[-1].child += elapsed
+        self._record(frame.stage, frame.table, elapsed - frame.child, frame.nbytes, frame.rows)
+
+    def add(
+        self,
+        stage: str,
+        seconds: float = 0.0,
+        table: Optional[str] = None,
+        nbytes: int = 0,
+        rows: int = 0,
+    ):
+        """
+        记录一段已单独计时的工作；耗时会从当前所在的外层阶段中扣除
+        """
+        stack = self._stack()
+        if stack:
+            stack[-1].child += seconds
+        self._record(stage, table, seconds, nbytes, rows)
+
+    def count(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def _record(self, stage: str, table: Optional[str], seconds: float, nbytes: int, rows: int):
+        with self._lock:
+            stat = self._stats.get((stage, table))
+            if stat is None:
+                stat = self._stats[(stage, table)] = [0.0, 0, 0, 0]
+            stat[0] += seconds
+            stat[1] += 1
+            stat[2] += nbytes
+            stat[3] += rows
+
+        if self.on_progress is not None:
+            now = time.perf_counter()
+            if now - self._last_progress >= self.progress_interval:
+                self._last_progress = now
+                self.on_progress(self.report())
+
+    # --- 跨进程汇总 ---
+
+    def state(self) -> Dict[str, Any]:
+        """
+        返回可序列化 (pickle) 的原始统计，用于从工作进程传回主进程
+        """
+        with self._lock:
+            return {
+                "stats": {key: list(stat) for key, stat in self._stats.items()},
+                "counters": dict(self.counters),
+            }
+
+    def merge(self, state: Dict[str, Any]):
+        with self._lock:
+            for key, (seconds, calls, nbytes, rows) in state["stats"].items():
+                stat = self._stats.setdefault(key, [0.0, 0, 0, 0])
+                stat[0] += seconds
+                stat[1] += calls
+                stat[2] += nbytes
+                stat[3] += rows
+            for name, value in state["counters"].items():
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    # --- 报告 ---
+
+    def report(self) -> Dict[str, Any]:
+        """
+        汇总为 {总耗时, 各阶段统计, 各数据表的分阶段统计, 计数器}
+        """
+        stages: Dict[str, List[Union[float, int]]] = {}
+        tables: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        with self._lock:
+            items = [(key, list(stat)) for key, stat in self._stats.items()]
+            counters = dict(self.counters)
+        for (stage, table), stat in items:
+            total = stages.setdefault(stage, [0.0, 0, 0, 0])
+            for i, value in enumerate(stat):
+                total[i] += value
+            if table is not None:
+                tables.setdefault(table, {})[stage] = _format_stat(stat)
+        return {
+            "elapsed": round(time.perf_counter() - self._started, 6),
+            "stages": {stage: _format_stat(stat) for stage, stat in sorted(stages.items())},
+            "tables": {table: tables[table] for table in sorted(tables)},
+            "counters": counters,
+        }
+
+    def write_report(self, path: Union[str, Path]):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+
+
+def _format_stat(stat: List[Union[float, int]]) -> Dict[str, Any]:
+    seconds, calls, nbytes, rows = stat
+    result: Dict[str, Any] = {"seconds": round(seconds, 6), "calls": calls}
+    if nbytes:
+        result["bytes"] = nbytes
+        if seconds > 0:
+            result["mib_per_second"] = round(nbytes / seconds / (1 << 20), 2)
+    if rows:
+        result["rows"] = rows
+        if seconds > 0:
+            result["rows_per_second"] = round(rows / seconds, 1)
+    return result
+
+
+# --- 埋点辅助函数 ---
+
+
+def active() -> Optional[Profiler]:
+    return _active
+
+
+@contextlib.contextmanager
+def stage(name: str, table: Optional[str] = None) -> Iterator[StageFrame]:
+    """
+    为代码块计时；未启用分析器时仅产出一个不会被记录的 StageFrame
+    """
+    profiler = _active
+    if profiler is None:
+        yield StageFrame(name, table)
+        return
+    frame = profiler.enter(name, table)
+    try:
+        yield frame
+    finally:
+        profiler.exit(frame)
+
+
+@contextlib.contextmanager
+def profile_session(
+    report_path: Optional[Union[str, Path]] = None,
+    cprofile_path: Optional[Union[str, Path]] = None,
+    on_progress: Optional[ProgressCallback] = None,
+) -> Iterator[Optional[Profiler]]:
+    """
+    CLI 使用的分析会话：结束时 (包括异常退出) 写入 JSON 报告与可选的 cProfile 数据
+
+    两个路径都未提供时不启用任何分析，产出 None。
+    """
+    if report_path is None and cprofile_path is None:
+        yield None
+        return
+
+    cprofiler = None
+    if cprofile_path is not None:
+        import cProfile
+
+        cprofiler = cProfile.Profile()
+        cprofiler.enable()
+    profiler = Profiler(on_progress)
+    try:
+        with profiler:
+            yield profiler
+    finally:
+        if cprofiler is not None:
+            cprofiler.disable()
+            cprofiler.dump_stats(str(cprofile_path))
+        if report_path is not None:
+            profiler.write_report(report_path)
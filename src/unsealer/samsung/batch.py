@@ -0,0 +1,237 @@
+# src/unsealer/samsung/batch.py
+
+import os
+import glob
+import contextlib
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Iterator, Optional
+
+from .. import profiling
+from .cache import VaultCache, decrypt_with_cache
+from .decrypter import count_tables
+from .exporters import save_tables_multi, default_output_path, describe_output_conflict
+
+SPASS_SUFFIX = ".spass"
+
+
+# --- 输入与密码解析 ---
+
+
+def collect_input_files(inputs: Iterable[str]) -> List[Path]:
+    """
+    将命令行输入 (文件、通配符、目录) 展开为去重后的文件列表
+    """
+    files: List[Path] = []
+    seen = set()
+    for item in inputs:
+        if glob.has_magic(item):
+            candidates = sorted(Path(p) for p in glob.glob(item, recursive=True))
+        elif Path(item).is_dir():
+            candidates = sorted(Path(item).glob(f"*{SPASS_SUFFIX}"))
+        else:
+            # 不存在的路径同样保留，由批处理结果报告具体错误
+            candidates = [Path(item)]
+
+        for candidate in candidates:
+            if candidate.is_dir():
+                continue
+            key = candidate.resolve()
+            if key not in seen:
+                seen.add(key)
+                files.append(candidate)
+    return files
+
+
+def load_password_map(map_file: Path) -> Dict[str, str]:
+    """
+    读取 JSON 格式的密码映射表: {"文件名或路径": "密码", ...}
+    """
+    try:
+        with open(map_file, "r", encoding="utf-8") as f:
+            mapping = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(f"无法读取密码映射文件 '{map_file}'。错误：{e}")
+    if not isinstance(mapping, dict) or not all(
+        isinstance(v, str) for v in mapping.values()
+    ):
+        raise ValueError(f"密码映射文件 '{map_file}' 必须是 文件名 -> 密码 的 JSON 对象。")
+    return mapping
+
+
+def lookup_password(
+    input_file: Path, password_map: Dict[str, str], shared_password: Optional[str]
+) -> Optional[str]:
+    """
+    按 完整路径 -> 文件名 -> 文件主名 的顺序查找密码，未命中时使用共享密码
+    """
+    for key in (str(input_file), input_file.name, input_file.stem):
+        if key in password_map:
+            return password_map[key]
+    return shared_password
+
+
+def plan_outputs(
+    files: List[Path], fmt: str, output_dir: Optional[Path] = None
+) -> List[Path]:
+    """
+    为每个输入文件分配输出路径，同名文件自动追加序号以避免互相覆盖
+    """
+    outputs: List[Path] = []
+    used = set()
+    for input_file in files:
+        output = default_output_path(input_file, fmt, output_dir)
+        index = 1
+        while output.resolve() in used:
+            index += 1
+            renamed = input_file.with_name(f"{input_file.stem}_{index}{input_file.suffix}")
+            output = default_output_path(renamed, fmt, output_dir)
+        used.add(output.resolve())
+        outputs.append(output)
+    return outputs
+
+
+def plan_targets(
+    files: List[Path], formats: List[str], output_dirs: Dict[str, Optional[Path]]
+) -> List[Dict[str, Path]]:
+    """
+    为每个输入文件分配各导出格式的输出路径: [{格式: 输出路径}, ...]
+    """
+    per_format = {fmt: plan_outputs(files, fmt, output_dirs.get(fmt)) for fmt in formats}
+    return [{fmt: per_format[fmt][i] for fmt in formats} for i in range(len(files))]
+
+
+# --- 并行处理 ---
+
+
+def _process_one(
+    input_file: str,
+    password: Optional[str],
+    targets: Dict[str, str],
+    banner: str,
+    force: bool,
+    use_cache: bool = False,
+    profile: bool = False,
+    compact: bool = False,
+) -> Dict[str, Any]:
+    """
+    在工作进程中完成单个文件的 密钥派生 -> 解密 -> 解析 -> 导出 (一次解密，导出全部格式)
+
+    profile 为 True 时，结果中的 "profile" 为该文件的分析统计 (Profiler.state())。
+    """
+    result: Dict[str, Any] = {
+        "input": input_file,
+        "output": ", ".join(targets.values()) or None,
+        "outputs": targets,
+        "ok": False,
+        "tables": {},
+        "error": None,
+        "cache_hit": False,
+    }
+    start = time.perf_counter()
+    profiler = profiling.Profiler() if profile else None
+    try:
+        with profiler or contextlib.nullcontext():
+            _decrypt_and_export(
+                input_file, password, targets, banner, force, use_cache, compact, result
+            )
+        result["ok"] = True
+    except Exception as e:
+        # 单个文件的失败只记录在结果中，不影响同批次的其他文件
+        result["error"] = str(e) or type(e).__name__
+    result["elapsed"] = round(time.perf_counter() - start, 3)
+    if profiler is not None:
+        result["profile"] = profiler.state()
+    return result
+
+
+def _decrypt_and_export(
+    input_file: str,
+    password: Optional[str],
+    targets: Dict[str, str],
+    banner: str,
+    force: bool,
+    use_cache: bool,
+    compact: bool,
+    result: Dict[str, Any],
+):
+    if password is None:
+        raise ValueError("未提供该文件的密码。")
+    for fmt, output in targets.items():
+        conflict = describe_output_conflict(Path(output), fmt, force)
+        if conflict:
+            raise ValueError(conflict if force else f"{conflict} 请使用 '-y' 或 '--force' 标志进行覆盖。")
+
+    if not targets and not use_cache:
+        # 预览：只统计条目数，不解码字段
+        with open(input_file, "rb") as f:
+            result["tables"] = count_tables(f, password)
+        return
+
+    cache = VaultCache() if use_cache else None
+    all_tables, result["cache_hit"] = decrypt_with_cache(input_file, password, cache, compact)
+    if targets:
+        save_tables_multi(
+            all_tables, {fmt: Path(output) for fmt, output in targets.items()}, banner
+        )
+
+    result["tables"] = {name: len(entries) for name, entries in all_tables.items()}
+
+
+def run_batch(
+    files: List[Path],
+    passwords: List[Optional[str]],
+    targets: List[Dict[str, Path]],
+    banner: str = "",
+    force: bool = False,
+    max_workers: Optional[int] = None,
+    use_cache: bool = False,
+    profile: bool = False,
+    compact: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """
+    使用进程池并行处理多个备份文件，按完成顺序逐个产出结果
+
+    PBKDF2 与解析都是 CPU 密集型任务，因此默认按 CPU 核心数开启工作进程。
+    targets 为每个文件的 {格式: 输出路径}，为空时只解密不导出 (预览)。
+    profile 为 True 时各工作进程分别分析，统计随结果的 "profile" 字段传回。
+    """
+    jobs = [
+        (str(f), pw, {fmt: str(out) for fmt, out in file_targets.items()}, banner, force, use_cache, profile, compact)
+        for f, pw, file_targets in zip(files, passwords, targets)
+    ]
+    if not jobs:
+        return
+
+    workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+    if workers == 1:
+        for job in jobs:
+            yield _process_one(*job)
+        return
+
+    # 进程池依赖 multiprocessing，导入开销较大，仅在真正并行时加载
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_process_one, *job) for job in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def write_summary(results: List[Dict[str, Any]], summary_path: Path, force: bool = False):
+    """
+    将批处理结果写入 JSON 摘要文件；与导出文件一样，已存在的摘要只有在 force 时才会被覆盖
+    """
+    conflict = describe_output_conflict(summary_path, "json", force)
+    if conflict:
+        raise ValueError(conflict if force else f"{conflict} 请使用 '-y' 或 '--force' 标志进行覆盖。")
+    summary = {
+        "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "total": len(results),
+        "succeeded": sum(1 for r in results if r["ok"]),
+        "failed": sum(1 for r in results if not r["ok"]),
+        "files": sorted(results, key=lambda r: r["input"]),
+    }
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,230 @@
+# src/unsealer/samsung/cache.py
+
+import hashlib
+import marshal
+import os
+import secrets
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple, Union
+
+from Crypto.Cipher import AES
+
+from .. import profiling
+from ..utils import get_cache_dir
+from .decrypter import compact_tables, decrypt_and_parse_stream
+from .records import to_plain
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# 缓存条目格式: MAGIC | 格式版本 | marshal 版本 | nonce(12) | tag(16) | AES-GCM 密文
+_MAGIC = b"USVC"
+_FORMAT_VERSION = 2
+_NONCE_SIZE = 12
+_TAG_SIZE = 16
+_HEADER_SIZE = len(_MAGIC) + 2 + _NONCE_SIZE + _TAG_SIZE
+_ENTRY_SUFFIX = ".vault"
+_SESSION_KEY_FILE = "session.key"
+
+# 条目密钥的 scrypt 参数 (约 16 MiB 内存、数十毫秒)：远低于 70000 次 PBKDF2 与完整解析的开销，
+# 但缓存目录 (含会话密钥) 泄露时，针对主密码的离线猜测仍需逐次付出内存困难的派生代价
+_SCRYPT_N = 1 << 14
+_SCRYPT_R = 8
+_SCRYPT_P = 1
+
+
+def file_digest(path: Union[str, Path], chunk_size: int = 1 << 20) -> str:
+    """
+    计算备份文件内容的 SHA-256 摘要，作为缓存键
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class VaultCache:
+    """
+    按文件内容摘要索引的已解析数据缓存
+
+    条目使用 AES-GCM 加密，密钥由主密码经 scrypt 派生 (以本地随机会话密钥与摘要为盐)，
+    耗时远低于 70000 次 PBKDF2 加完整解析，且密码错误时校验标签直接失败 (视为未命中)。
+    会话密钥与条目保存在同一目录，因此不能单独依赖它保护主密码；scrypt 的代价使
+    针对缓存条目的离线猜测不比直接攻击备份文件更容易。仅在用户显式启用时使用。
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir) if cache_dir else get_cache_dir() / "samsung"
+        self.max_bytes = max_bytes
+        # 同一实例中 get 未命中后紧接着 put，派生结果按 (摘要, 密码) 复用
+        self._entry_keys: Dict[Tuple[str, str], bytes] = {}
+
+    # --- 密钥管理 ---
+
+    def _session_key(self) -> bytes:
+        key_path = self.cache_dir / _SESSION_KEY_FILE
+        try:
+            return key_path.read_bytes()
+        except FileNotFoundError:
+            pass
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        key = secrets.token_bytes(32)
+        try:
+            fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            # 其他进程 (例如批量模式的工作进程) 已抢先创建
+            return key_path.read_bytes()
+        with os.fdopen(fd, "wb") as f:
+            f.write(key)
+        return key
+
+    def _entry_key(self, digest: str, password: str) -> bytes:
+        key = self._entry_keys.get((digest, password))
+        if key is None:
+            key = hashlib.scrypt(
+                password.encode("utf-8"),
+                salt=self._session_key() + digest.encode("ascii"),
+                n=_SCRYPT_N,
+                r=_SCRYPT_R,
+                p=_SCRYPT_P,
+                dklen=32,
+            )
+            self._entry_keys[(digest, password)] = key
+        return key
+
+    def _entry_path(self, digest: str) -> Path:
+        return self.cache_dir / f"{digest}{_ENTRY_SUFFIX}"
+
+    # --- 读写 ---
+
+    def get(self, digest: str, password: str) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """
+        读取缓存条目；不存在、已损坏或密码不匹配时返回 None
+        """
+        path = self._entry_path(digest)
+        try:
+            blob = path.read_bytes()
+        except OSError:
+            return None
+
+        if (
+            len(blob) < _HEADER_SIZE
+            or not blob.startswith(_MAGIC)
+            or blob[len(_MAGIC)] != _FORMAT_VERSION
+            or blob[len(_MAGIC) + 1] != marshal.version
+        ):
+            return None
+
+        offset = len(_MAGIC) + 2
+        nonce = blob[offset : offset + _NONCE_SIZE]
+        tag = blob[offset + _NONCE_SIZE : _HEADER_SIZE]
+        cipher = AES.new(self._entry_key(digest, password), AES.MODE_GCM, nonce=nonce)
+        cipher.update(digest.encode("ascii"))
+        try:
+            payload = cipher.decrypt_and_verify(blob[_HEADER_SIZE:], tag)
+            tables = marshal.loads(payload)
+        except (ValueError, EOFError, TypeError):
+            return None
+
+        try:
+            # 更新访问时间，作为 LRU 淘汰的依据
+            os.utime(path)
+        except OSError:
+            pass
+        return tables
+
+    def put(self, digest: str, password: str, tables: Dict[str, List[Dict[str, Any]]]):
+        """
+        写入缓存条目 (原子替换)，随后按容量上限淘汰最久未使用的条目
+        """
+        payload = marshal.dumps(tables)
+        nonce = secrets.token_bytes(_NONCE_SIZE)
+        cipher = AES.new(self._entry_key(digest, password), AES.MODE_GCM, nonce=nonce)
+        cipher.update(digest.encode("ascii"))
+        ciphertext, tag = cipher.encrypt_and_digest(payload)
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._entry_path(digest)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        header = _MAGIC + bytes([_FORMAT_VERSION, marshal.version]) + nonce + tag
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(ciphertext)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    # --- 容量管理 ---
+
+    def _entries(self) -> List[Tuple[Path, os.stat_result]]:
+        entries = []
+        if not self.cache_dir.is_dir():
+            return entries
+        for path in self.cache_dir.glob(f"*{_ENTRY_SUFFIX}"):
+            try:
+                entries.append((path, path.stat()))
+            except FileNotFoundError:
+                continue
+        return entries
+
+    def evict(self) -> int:
+        """
+        按最近访问时间淘汰条目，直到总大小不超过上限；返回删除的条目数
+        """
+        entries = sorted(self._entries(), key=lambda item: item[1].st_mtime)
+        total = sum(st.st_size for _, st in entries)
+        removed = 0
+        for path, st in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= st.st_size
+            removed += 1
+        return removed
+
+    def stats(self) -> Tuple[int, int]:
+        entries = self._entries()
+        return len(entries), sum(st.st_size for _, st in entries)
+
+    def clear(self) -> int:
+        """
+        删除全部缓存条目与会话密钥；返回删除的条目数
+        """
+        entries = self._entries()
+        for path, _ in entries:
+            path.unlink(missing_ok=True)
+        for path in self.cache_dir.glob(f"*{_ENTRY_SUFFIX}.*.tmp"):
+            path.unlink(missing_ok=True)
+        (self.cache_dir / _SESSION_KEY_FILE).unlink(missing_ok=True)
+        self._entry_keys.clear()
+        return len(entries)
+
+
+def decrypt_with_cache(
+    input_file: Union[str, Path],
+    password: str,
+    cache: Optional[VaultCache] = None,
+    compact: bool = False,
+) -> Tuple[Dict[str, List[Dict[str, Any]]], bool]:
+    """
+    优先从缓存读取解析结果，未命中时完整解密并写入缓存；返回 (数据, 是否命中)
+
+    compact 为 True 时返回 CompactRecord 条目；缓存中始终保存普通 dict (marshal 只支持内置类型)。
+    """
+    if cache:
+        with profiling.stage("cache_lookup"):
+            digest = file_digest(input_file)
+            cached = cache.get(digest, password)
+        if cached is not None:
+            return (compact_tables(cached) if compact else cached), True
+
+    with open(input_file, "rb") as f:
+        all_tables = decrypt_and_parse_stream(f, password, compact=compact)
+    if cache:
+        with profiling.stage("cache_store"):
+            cache.put(digest, password, to_plain(all_tables) if compact else all_tables)
+    return all_tables, False
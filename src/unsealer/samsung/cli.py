@@ -1,10 +1,12 @@
 # src/unsealer/samsung/cli.py
 
 import argparse
+import contextlib
+import functools
+import glob
+import json
 import sys
-import csv
-import os
-import re
+import time
 import traceback
 from pathlib import Path
 from datetime import datetime
@@ -12,249 +14,62 @@ from rich.console import Console
 from rich.panel import Panel
 from rich.prompt import Prompt
 from rich.text import Text
-import pyfiglet
-from .decrypter import decrypt_and_parse
-from typing import Dict, List, Any
+from .cache import VaultCache, decrypt_with_cache
+from .decrypter import count_tables, decrypt_and_parse_stream, stream_tables
+from ..ndjson_export import STDOUT_PATH, NdjsonWriter, is_stdout
+from ..profiling import Profiler, profile_session
+from ..utils import CACHE_ENV, cache_enabled_by_default
+from .exporters import (
+    EXPORT_FORMATS,
+    save_tables,
+    save_tables_multi,
+    default_output_path,
+    describe_output_conflict,
+)
+from .batch import (
+    collect_input_files,
+    load_password_map,
+    lookup_password,
+    plan_targets,
+    run_batch,
+    write_summary,
+)
+from typing import Dict, List, Any, Iterable, Iterator, Mapping, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .query import VaultIndex
 
 # --- Initialize the rich console --- # 
 console = Console(stderr=True)
 
-def _format_logins_txt(data: List[Dict]) -> str:
-    content = [
-        f"====================\n [登录凭证] Logins ({len(data)} 条)\n===================="
-    ]
-    for i, entry in enumerate(data, 1):
-        content.append(f"\n--- [ {i}. {entry.get('title', '未知条目')} ] ---")
-        content.append(f"{'用户名:':<10} {entry.get('username_value', 'N/A')}")
-        content.append(f"{'密码:':<10} {entry.get('password_value', 'N/A')}")
-        if url := entry.get("origin_url"):
-            content.append(f"{'网址/应用:':<10} {url}")
-        if memo := entry.get("credential_memo"):
-            content.append(f"{'备注:':<10} {memo}")
-        if isinstance(otp := entry.get("otp"), dict) and otp.get("secret"):
-            content.append(f"\n  [!!] 两步验证 (2FA) 密钥:")
-            content.append(f"    {'密钥:':<8} {otp.get('secret')}")
-            content.append(f"    {'账户:':<8} {otp.get('name', 'N/A')}")
-    return "\n".join(content)
-
-
-def _format_identities_txt(data: List[Dict]) -> str:
-    content = [
-        f"\n\n=======================\n [身份信息] Identities ({len(data)} 条)\n======================="
-    ]
-    for i, entry in enumerate(data, 1):
-        content.append(f"\n--- [ {i}. {entry.get('name', '未知身份')} ] ---")
-        if isinstance(id_card := entry.get("id_card_detail"), dict):
-            content.append(f"{'身份证号:':<10} {id_card.get('mIDCardNumber', 'N/A')}")
-            content.append(f"{'姓名:':<10} {id_card.get('mUsername', 'N/A')}")
-            content.append(f"{'出生日期:':<10} {id_card.get('mBirthDay', 'N/A')}")
-        if phones := entry.get("telephone_number_list"):
-            content.append(f"{'电话:':<10} {', '.join(phones)}")
-        if emails := entry.get("email_address_list"):
-            content.append(f"{'邮箱:':<10} {', '.join(emails)}")
-    return "\n".join(content)
-
-
-def _format_addresses_txt(data: List[Dict]) -> str:
-    content = [
-        f"\n\n=====================\n [地址信息] Addresses ({len(data)} 条)\n====================="
-    ]
-    for i, entry in enumerate(data, 1):
-        name = entry.get("full_name", f"地址 {i}")
-        if name == "添加地址/名称":
-            name = f"地址 {i} (模板)"
-        content.append(f"\n--- [ {i}. {name} ] ---")
-        addr_parts = [
-            entry.get(k)
-            for k in ["street_address", "city", "state", "zipcode", "country_code"]
-        ]
-        full_address = ", ".join(filter(None, addr_parts))
-        if full_address:
-            content.append(f"{'地址:':<10} {full_address}")
-        if phone := entry.get("phone_number"):
-            content.append(f"{'电话:':<10} {phone}")
-        if email := entry.get("email"):
-            content.append(f"{'邮箱:':<10} {email}")
-    return "\n".join(content)
-
-
-def _format_notes_txt(data: List[Dict]) -> str:
-    content = [
-        f"\n\n======================\n [安全备忘录] Notes ({len(data)} 条)\n======================"
-    ]
-    for i, entry in enumerate(data, 1):
-        content.append(
-            f"\n--- [ {i}. {entry.get('note_title', '无标题备忘录')} ] ---\n"
-        )
-        content.append(f"{entry.get('note_detail', '')}")
-    return "\n".join(content)
-
-
-# --- Markdown Custom Formatter --- # 
-def _format_logins_md(data: List[Dict]) -> str:
-    content = [f"## [登录凭证] Logins - 共 {len(data)} 条\n"]
-    for i, entry in enumerate(data, 1):
-        content.append(f"### {i}. {entry.get('title', '未知条目')}")
-        content.append(f"- **用户名**: `{entry.get('username_value', 'N/A')}`")
-        content.append(f"- **密码**: `{entry.get('password_value', 'N/A')}`")
-        if url := entry.get("origin_url"):
-            content.append(f"- **网址/应用**: `{url}`")
-        if memo := entry.get("credential_memo"):
-            content.append(f"- **备注**: {memo}")
-        if isinstance(otp := entry.get("otp"), dict) and otp.get("secret"):
-            content.append("- **[!] 两步验证 (2FA) 密钥**: ")
-            content.append(f"  - **密钥 (Secret)**: `{otp.get('secret')}`")
-            content.append(f"  - **账户**: `{otp.get('name', 'N/A')}`")
-        content.append("\n---\n")
-    return "\n".join(content)
-
-
-def _format_identities_md(data: List[Dict]) -> str:
-    content = [f"## [身份信息] Identities - 共 {len(data)} 条\n"]
-    for i, entry in enumerate(data, 1):
-        content.append(f"### {i}. {entry.get('name', '未知身份')}")
-        if isinstance(id_card := entry.get("id_card_detail"), dict):
-            content.append(f"- **身份证号**: `{id_card.get('mIDCardNumber', 'N/A')}`")
-            content.append(f"- **姓名**: `{id_card.get('mUsername', 'N/A')}`")
-            content.append(f"- **出生日期**: `{id_card.get('mBirthDay', 'N/A')}`")
-        if phones := entry.get("telephone_number_list"):
-            content.append(f"- **电话**: {', '.join([f'`{p}`' for p in phones])}")
-        if emails := entry.get("email_address_list"):
-            content.append(f"- **邮箱**: {', '.join([f'`{e}`' for e in emails])}")
-        content.append("\n---\n")
-    return "\n".join(content)
-
-
-def _format_addresses_md(data: List[Dict]) -> str:
-    content = [f"## [地址信息] Addresses - 共 {len(data)} 条\n"]
-    for i, entry in enumerate(data, 1):
-        name = entry.get("full_name", f"地址 {i}")
-        if name == "添加地址/名称":
-            name = f"地址 {i} (模板)"
-        content.append(f"### {i}. {name}")
-        addr_parts = [
-            entry.get(k)
-            for k in ["street_address", "city", "state", "zipcode", "country_code"]
-        ]
-        full_address = ", ".join(filter(None, addr_parts))
-        if full_address:
-            content.append(f"- **地址**: {full_address}")
-        if phone := entry.get("phone_number"):
-            content.append(f"- **电话**: `{phone}`")
-        if email := entry.get("email"):
-            content.append(f"- **邮箱**: `{email}`")
-        content.append("\n---\n")
-    return "\n".join(content)
-
-
-def _format_notes_md(data: List[Dict]) -> str:
-    content = [f"## [安全备忘录] Notes - 共 {len(data)} 条\n"]
-    for i, entry in enumerate(data, 1):
-        content.append(f"### {i}. {entry.get('note_title', '无标题备忘录')}")
-        content.append(f"```\n{entry.get('note_detail', '')}\n```")
-        content.append("\n---\n")
-    return "\n".join(content)
-
-
-def save_as_md(data: Dict[str, List[Any]], output_file: Path, banner: str):
-    MD_FORMATTERS = {
-        "logins": _format_logins_md,
-        "identities": _format_identities_md,
-        "addresses": _format_addresses_md,
-        "notes": _format_notes_md,
-    }
-    ORDER = ["logins", "identities", "addresses", "notes"]
-    sorted_tables = sorted(
-        data.keys(), key=lambda x: ORDER.index(x) if x in ORDER else len(ORDER)
-    )
-    with open(output_file, "w", encoding="utf-8") as f:
-        if banner:
-            clean_banner = banner.strip()
-            lines = clean_banner.split('\n')
-            if lines:
-                lines[0] = "   " + lines[0]
-            modified_banner = "\n".join(lines)
-            f.write(f"```\n{modified_banner}\n```\n\n")
-            
-        f.write("# Unsealer 综合解密报告\n\n")
-        f.write(f"- **生成时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"- **数据摘要**: 共找到 **{len(data)}** 个数据类别。\n\n")
-        f.write(
-            "**[!] 安全警告：此文件包含您的密码、两步验证密钥、身份证号等极度敏感信息，请务必在安全的环境下查看，并妥善保管！**\n\n"
-        )
-        for table_name in sorted_tables:
-            formatter = MD_FORMATTERS.get(table_name)
-            if formatter:
-                f.write(formatter(data[table_name]))
-        f.write(f"\n*报告由 Unsealer (最终设计版) 生成*")
-
-
-def save_as_txt(data: Dict[str, List[Any]], output_file: Path, banner: str):
-    TXT_FORMATTERS = {
-        "logins": _format_logins_txt,
-        "identities": _format_identities_txt,
-        "addresses": _format_addresses_txt,
-        "notes": _format_notes_txt,
-    }
-    ORDER = ["logins", "identities", "addresses", "notes"]
-    sorted_tables = sorted(
-        data.keys(), key=lambda x: ORDER.index(x) if x in ORDER else len(ORDER)
-    )
-    with open(output_file, "w", encoding="utf-8") as f:
-        if banner:
-            f.write(f"{banner}\n")
-        f.write("Unsealer 综合解密报告\n")
-        f.write("------------------------\n")
-        f.write(f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"数据摘要: 共找到 {len(data)} 个数据类别。\n\n")
-        f.write("!!!!!!!! 安全警告 !!!!!!!!\n此文件包含极度敏感信息，请妥善保管！\n\n")
-        for table_name in sorted_tables:
-            formatter = TXT_FORMATTERS.get(table_name)
-            if formatter:
-                f.write(formatter(data[table_name]))
-        f.write(f"\n\n--- 报告结束 ---\n*由 Unsealer (最终设计版) 生成*")
-
-
-def save_as_csv(data: dict, output_path: Path):
-    """
-    将每个数据类别保存为独立的CSV文件，并对嵌套数据进行展平处理
-    """
-    output_path.mkdir(exist_ok=True)
+TABLE_NAMES = {
+    "logins": "登录凭证",
+    "identities": "身份信息",
+    "addresses": "地址信息",
+    "notes": "安全备忘录",
+}
 
-    for table_name, entries in data.items():
-        if not entries:
-            continue
 
-        all_headers = set()
-        flat_data = []
-        for entry in entries:
-            flat_entry = {}
-            for key, value in entry.items():
-                if isinstance(value, dict):
-                    for sub_key, sub_value in value.items():
-                        flat_entry[f"{key}_{sub_key}"] = sub_value
-                elif isinstance(value, list):
-                    flat_entry[key] = "|".join(map(str, value))
-                else:
-                    flat_entry[key] = value
-            all_headers.update(flat_entry.keys())
-            flat_data.append(flat_entry)
-
-        file_path = output_path / f"{table_name}.csv"
-        with open(file_path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=sorted(list(all_headers)))
-            writer.writeheader()
-            writer.writerows(flat_data)
-
-def _sanitize_filename(name: str) -> str:
+@functools.lru_cache(maxsize=None)
+def _render_banner() -> str:
+    # pyfiglet 加载字体较慢，只在真正需要横幅时才导入
+    import pyfiglet
+
+    return pyfiglet.figlet_format("Unsealer", font="slant")
+
+
+def _report_banner(formats: Iterable[str]) -> str:
     """
-    移除或替换在文件名/目录名中非法的字符
+    只有 md / txt 报告会嵌入横幅
     """
-    return re.sub(r'[\\/*?:"<>|]', "_", name)
+    return _render_banner() if any(fmt in ("md", "txt") for fmt in formats) else ""
 
 
-def _display_banner() -> str:
-    plain_banner = pyfiglet.figlet_format("Unsealer", font="slant")
+def _display_banner():
+    # 被脚本调用 (非交互终端) 时不渲染横幅
+    if not console.is_terminal:
+        return
+    plain_banner = _render_banner()
     console.print(
         Panel(
             plain_banner,
@@ -264,78 +79,577 @@ def _display_banner() -> str:
             expand=False,
         )
     )
-    return plain_banner
+
+
+def _parse_formats(value: str) -> List[str]:
+    formats: List[str] = []
+    for fmt in value.split(","):
+        fmt = fmt.strip().lower()
+        if fmt not in EXPORT_FORMATS:
+            raise argparse.ArgumentTypeError(
+                f"不支持的输出格式 '{fmt}' (可选: {', '.join(EXPORT_FORMATS)})"
+            )
+        if fmt not in formats:
+            formats.append(fmt)
+    return formats
+
+
+def _split_outputs(
+    outputs: List[str], formats: List[str]
+) -> Tuple[Optional[Path], Dict[str, Path]]:
+    """
+    将 -o 参数拆分为 (通用输出路径, {格式: 输出路径})
+    """
+    output: Optional[Path] = None
+    overrides: Dict[str, Path] = {}
+    for item in outputs:
+        fmt, sep, path = item.partition("=")
+        if sep and fmt.lower() in EXPORT_FORMATS:
+            if fmt.lower() not in formats:
+                raise ValueError(f"-o {item}: 格式 '{fmt}' 未在 -f 中指定。")
+            overrides[fmt.lower()] = Path(path)
+        elif output is None:
+            output = Path(item)
+        else:
+            raise ValueError("只能指定一个通用输出路径；请使用 FORMAT=PATH 为各格式分别指定。")
+    return output, overrides
 
 
 def _setup_arg_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="一个用于解密三星密码本 (.spass) 文件的优雅工具。"
     )
-    parser.add_argument("input_file", type=Path, help="输入的 .spass 文件路径。")
+    parser.add_argument(
+        "input_files",
+        nargs="+",
+        help="输入的 .spass 文件路径。指定多个文件、通配符或目录时进入批量模式。",
+    )
     parser.add_argument(
         "-f",
         "--format",
-        choices=["md", "txt", "csv"],
-        default="md",
-        help="输出文件格式 (默认为: md)。",
+        dest="formats",
+        type=_parse_formats,
+        default=["md"],
+        help=(
+            f"输出格式，可用逗号指定多个 (例如 md,csv,sqlite)，只解密一次 (可选: {', '.join(EXPORT_FORMATS)}；默认为: md)。"
+            "ndjson 未指定 -o 时逐行写入标准输出。"
+        ),
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        dest="outputs",
+        action="append",
+        default=[],
+        metavar="[FORMAT=]PATH",
+        help="输出文件的路径或目录。多种格式时为输出目录，也可用 FORMAT=PATH 单独指定某种格式的输出 (可重复)。",
     )
-    parser.add_argument("-o", "--output", type=Path, help="输出文件的路径或目录。")
     parser.add_argument("--preview", action="store_true", help="在终端中预览摘要信息。")
     parser.add_argument(
         "-y", "--force", action="store_true", help="强制覆盖已存在的输出文件或目录。"
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="批量模式下的并行进程数 (默认为 CPU 核心数)。",
+    )
+    parser.add_argument(
+        "--password-file",
+        type=Path,
+        help="批量模式下的密码映射文件 (JSON: {\"文件名\": \"密码\"})，未列出的文件使用统一密码。",
+    )
+    cache_group = parser.add_mutually_exclusive_group()
+    cache_group.add_argument(
+        "--cache",
+        dest="use_cache",
+        action="store_true",
+        default=cache_enabled_by_default(),
+        help=f"启用本地加密缓存，重复处理同一备份时跳过密钥派生与解析 (也可设置环境变量 {CACHE_ENV}=1)。",
+    )
+    cache_group.add_argument(
+        "--no-cache", dest="use_cache", action="store_false", help="本次运行不读写缓存。"
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="以紧凑的只读记录保存解析结果，在同时导出多种格式或批量处理大型备份时降低内存占用。",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        metavar="REPORT.json",
+        help="记录各阶段 (以及各数据表) 的耗时、字节数与行数，并写入 JSON 报告。",
+    )
+    parser.add_argument(
+        "--cprofile",
+        type=Path,
+        metavar="PATH",
+        help="同时保存 cProfile 数据，可用 snakeviz 或 pstats 查看。",
+    )
     return parser
 
 
-def _process_decryption(
-    args: argparse.Namespace, password: str, plain_banner: str
+def _cache_command(argv: List[str]):
+    """
+    缓存管理子命令: unsealer samsung cache {clear,info}
+    """
+    parser = argparse.ArgumentParser(
+        prog="unsealer samsung cache", description="管理已解析备份的本地加密缓存。"
+    )
+    parser.add_argument("action", choices=["clear", "info"], help="clear: 清空缓存；info: 查看缓存占用。")
+    args = parser.parse_args(argv)
+
+    cache = VaultCache()
+    if args.action == "clear":
+        removed = cache.clear()
+        console.print(f"[bold green]✓[/bold green] 已清除 {removed} 个缓存条目 ({cache.cache_dir})。")
+    else:
+        count, size = cache.stats()
+        console.print(
+            f"缓存目录: [bold magenta]{cache.cache_dir}[/bold magenta]\n"
+            f"条目数: {count}，占用: {size / 1024 / 1024:.2f} MiB / "
+            f"上限 {cache.max_bytes / 1024 / 1024:.0f} MiB"
+        )
+
+
+def _diff_command(argv: List[str]):
+    """
+    差异比较子命令: unsealer samsung diff old.spass new.spass
+    """
+    # diff / merge / query 子命令的实现仅在执行对应子命令时加载，不计入 CLI 的启动耗时
+    from .diff import diff_files, diff_to_tables
+
+    parser = argparse.ArgumentParser(
+        prog="unsealer samsung diff",
+        description="比较两个三星密码本备份，列出新增、删除与修改的条目。",
+    )
+    parser.add_argument("old_file", type=Path, help="较早的 .spass 备份。")
+    parser.add_argument("new_file", type=Path, help="较新的 .spass 备份。")
+    parser.add_argument(
+        "-f",
+        "--format",
+        dest="formats",
+        type=_parse_formats,
+        default=[],
+        help=f"将差异导出为指定格式，可用逗号指定多个 (可选: {', '.join(EXPORT_FORMATS)})；未指定时只显示摘要。",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        dest="outputs",
+        action="append",
+        default=[],
+        metavar="[FORMAT=]PATH",
+        help="输出文件的路径或目录，用法与解密时相同 (默认为新备份旁的 <文件名>_diff.<格式>)。",
+    )
+    parser.add_argument(
+        "-y", "--force", action="store_true", help="强制覆盖已存在的输出文件或目录。"
+    )
+    parser.add_argument(
+        "--password-file",
+        type=Path,
+        help="密码映射文件 (JSON: {\"文件名\": \"密码\"})，两个备份的密码不同时使用。",
+    )
+    args = parser.parse_args(argv)
+    try:
+        args.output, args.output_overrides = _split_outputs(args.outputs, args.formats)
+        password_map = load_password_map(args.password_file) if args.password_file else {}
+    except ValueError as e:
+        parser.error(str(e))
+
+    for input_file in (args.old_file, args.new_file):
+        if not input_file.is_file():
+            console.print(f"[bold red]✗ 错误:[/bold red] 找不到文件 '{input_file}'。")
+            sys.exit(1)
+
+    args.input_file = args.new_file.with_name(f"{args.new_file.stem}_diff{args.new_file.suffix}")
+    targets = _single_targets(args) if args.formats else {}
+    if targets:
+        if args.output and len(targets) > 1:
+            args.output.mkdir(parents=True, exist_ok=True)
+        _check_targets(targets, args.force)
+
+    shared_password = None
+    files = (args.old_file, args.new_file)
+    if any(lookup_password(f, password_map, None) is None for f in files):
+        shared_password = Prompt.ask(
+            "[bold yellow]> [/bold yellow]请输入三星账户主密码", password=True, console=console
+        )
+    old_password, new_password = (lookup_password(f, password_map, shared_password) for f in files)
+
+    try:
+        with console.status("[bold green]正在并行解密并比较两个备份...[/bold green]", spinner="dots"):
+            diffs = diff_files(args.old_file, args.new_file, old_password, new_password)
+    except (FileNotFoundError, ValueError) as e:
+        console.print(f"[bold red]✗ 错误:[/bold red] {e}")
+        sys.exit(1)
+
+    from rich.table import Table
+
+    table = Table(title="差异摘要", header_style="bold magenta", border_style="dim")
+    table.add_column("数据类别", style="cyan")
+    for column in ("新增", "删除", "修改", "未变化"):
+        table.add_column(column, justify="right")
+    for name, diff in diffs.items():
+        table.add_row(
+            TABLE_NAMES.get(name, name),
+            f"[green]{len(diff.added)}[/green]",
+            f"[red]{len(diff.removed)}[/red]",
+            f"[yellow]{len(diff.modified)}[/yellow]",
+            str(diff.unchanged),
+        )
+    console.print(table)
+
+    if not targets:
+        return
+    tables = diff_to_tables(diffs)
+    if not tables:
+        console.print("[dim]> 两个备份的内容相同，没有需要导出的差异。[/dim]")
+        return
+    with console.status("[bold green]正在写入导出文件...[/bold green]", spinner="dots"):
+        save_tables_multi(tables, targets, _report_banner(targets))
+    saved = ", ".join(f"[bold magenta]{_target_name(output)}[/bold magenta]" for output in targets.values())
+    console.print(f"\n[bold green]✓ 操作成功！[/bold green] 差异已保存至 {saved}")
+
+
+def _merge_command(argv: List[str]):
+    """
+    合并子命令: unsealer samsung merge a.spass b.spass ... -f md -o merged.md
+    """
+    from .merge import MERGE_POLICIES, merge_files
+
+    parser = argparse.ArgumentParser(
+        prog="unsealer samsung merge",
+        description="合并多个三星密码本备份并去除重复条目，输出一份汇总结果。",
+    )
+    parser.add_argument(
+        "input_files", nargs="+", help="要合并的 .spass 备份，可以是多个文件、通配符或目录。"
+    )
+    parser.add_argument(
+        "--policy",
+        choices=MERGE_POLICIES,
+        default="newest",
+        help="同一条目在多个备份中内容不同时的处理方式：newest 保留最新备份 (按文件修改时间) 中的版本，keep-all 保留所有版本 (默认为: newest)。",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        dest="formats",
+        type=_parse_formats,
+        default=["md"],
+        help=f"输出格式，可用逗号指定多个 (可选: {', '.join(EXPORT_FORMATS)}；默认为: md)。",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        dest="outputs",
+        action="append",
+        default=[],
+        metavar="[FORMAT=]PATH",
+        help="输出文件的路径或目录，用法与解密时相同 (默认为当前目录下的 unsealer_merged.<格式>)。",
+    )
+    parser.add_argument(
+        "-y", "--force", action="store_true", help="强制覆盖已存在的输出文件或目录。"
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=None, help="并行进程数 (默认为 CPU 核心数)。"
+    )
+    parser.add_argument(
+        "--password-file",
+        type=Path,
+        help="密码映射文件 (JSON: {\"文件名\": \"密码\"})，未列出的文件使用统一密码。",
+    )
+    args = parser.parse_args(argv)
+    try:
+        args.output, args.output_overrides = _split_outputs(args.outputs, args.formats)
+        password_map = load_password_map(args.password_file) if args.password_file else {}
+    except ValueError as e:
+        parser.error(str(e))
+
+    files = collect_input_files(args.input_files)
+    if not files:
+        console.print("[bold red]✗ 错误:[/bold red] 未找到任何 .spass 备份文件。")
+        sys.exit(1)
+
+    args.input_file = Path("unsealer_merged.spass")
+    targets = _single_targets(args)
+    if args.output and len(targets) > 1:
+        args.output.mkdir(parents=True, exist_ok=True)
+    _check_targets(targets, args.force)
+
+    shared_password = None
+    if any(lookup_password(f, password_map, None) is None for f in files):
+        shared_password = Prompt.ask(
+            "[bold yellow]> [/bold yellow]请输入备份文件共用的三星账户主密码", password=True, console=console
+        )
+    passwords = [lookup_password(f, password_map, shared_password) for f in files]
+
+    try:
+        with console.status(
+            f"[bold green]正在解密并合并 {len(files)} 个备份文件...[/bold green]", spinner="dots"
+        ) as status:
+            merger = merge_files(
+                files,
+                passwords,
+                args.policy,
+                args.jobs,
+                lambda done: status.update(
+                    f"[bold green]正在解密并合并备份文件... ({done}/{len(files)})[/bold green]"
+                ),
+            )
+        merged = merger.tables()
+    except (FileNotFoundError, ValueError) as e:
+        console.print(f"[bold red]✗ 错误:[/bold red] {e}")
+        sys.exit(1)
+    if not merged:
+        console.print("[bold red]✗ 错误:[/bold red] 解密成功，但在文件中未找到任何有价值的数据。")
+        sys.exit(1)
+
+    from rich.table import Table
+
+    table = Table(title=f"合并结果 ({len(files)} 个备份)", header_style="bold magenta", border_style="dim")
+    table.add_column("数据类别", style="cyan")
+    for column in ("输入条目", "合并后", "去除"):
+        table.add_column(column, justify="right")
+    for name, entries in merged.items():
+        total = merger.input_counts[name]
+        table.add_row(TABLE_NAMES.get(name, name), str(total), str(len(entries)), str(total - len(entries)))
+    console.print(table)
+
+    with console.status("[bold green]正在写入导出文件...[/bold green]", spinner="dots"):
+        save_tables_multi(merged, targets, _report_banner(targets))
+    saved = ", ".join(f"[bold magenta]{_target_name(output)}[/bold magenta]" for output in targets.values())
+    console.print(f"\n[bold green]✓ 操作成功！[/bold green] 合并结果已保存至 {saved}")
+
+
+# query 子命令的交互模式中可用的条件 (键=值)
+_QUERY_KEYS = {"domain": "domain", "user": "username", "title": "title", "table": "table", "fields": "fields"}
+
+
+def _add_query_filters(parser: argparse.ArgumentParser):
+    parser.add_argument("--domain", help="按域名检索 (同时匹配子域名；应用包名按域名顺序匹配)。")
+    parser.add_argument("--user", dest="username", help="按用户名检索 (不区分大小写)。")
+    parser.add_argument("--title", help="按标题中的词检索，多个词时全部都需要出现。")
+    otp_group = parser.add_mutually_exclusive_group()
+    otp_group.add_argument("--otp", dest="otp", action="store_const", const=True, help="只显示含有两步验证密钥的条目。")
+    otp_group.add_argument("--no-otp", dest="otp", action="store_const", const=False, help="只显示不含两步验证密钥的条目。")
+    parser.add_argument("--table", choices=list(TABLE_NAMES), help="只检索指定的数据类别。")
+    parser.add_argument(
+        "--fields",
+        type=lambda value: [field.strip() for field in value.split(",") if field.strip()],
+        help="只输出指定的字段，以逗号分隔 (例如 title,username_value,password_value,otp.secret)。",
+    )
+
+
+def _parse_query_line(line: str) -> Dict[str, Any]:
+    """
+    解析交互模式中的一行查询，例如: domain=github.com user=alice otp fields=title,password_value
+    """
+    import shlex
+
+    query: Dict[str, Any] = {"domain": None, "username": None, "title": None, "otp": None, "table": None, "fields": None}
+    for term in shlex.split(line):
+        if term in ("otp", "!otp"):
+            query["otp"] = term == "otp"
+            continue
+        key, sep, value = term.partition("=")
+        if not sep or key not in _QUERY_KEYS:
+            raise ValueError(f"无法识别的查询条件 '{term}' (可用: {', '.join(f'{k}=...' for k in _QUERY_KEYS)}, otp, !otp)。")
+        query[_QUERY_KEYS[key]] = [f for f in value.split(",") if f] if key == "fields" else value
+    return query
+
+
+def _format_query_value(value: Any) -> str:
+    if isinstance(value, (Mapping, list, tuple)):
+        return json.dumps(value, ensure_ascii=False, default=dict)
+    return str(value)
+
+
+def _print_query_results(
+    index: "VaultIndex", query: Dict[str, Any], limit: Optional[int], ndjson: bool
 ):
+    from .query import select_fields
+
+    start = time.perf_counter()
+    matches = index.search(
+        query["domain"], query["username"], query["title"], query["otp"], query["table"]
+    )
+    elapsed = time.perf_counter() - start
+    shown = matches[:limit] if limit else matches
+    rows = [(table, select_fields(entry, query["fields"])) for table, entry in shown]
+
+    if ndjson:
+        writer = NdjsonWriter(sys.stdout)
+        for table, entry in rows:
+            writer.write(table, entry)
+    elif rows:
+        from rich.table import Table
+
+        columns = list(dict.fromkeys(field for _, entry in rows for field in entry))
+        table = Table(header_style="bold magenta", border_style="dim")
+        table.add_column("数据类别", style="cyan")
+        for column in columns:
+            table.add_column(column, overflow="fold")
+        for name, entry in rows:
+            table.add_row(
+                TABLE_NAMES.get(name, name),
+                *(_format_query_value(entry[c]) if c in entry else "" for c in columns),
+            )
+        Console().print(table)
+    more = f"，显示前 {len(shown)} 条" if len(shown) < len(matches) else ""
+    console.print(f"[dim]> 找到 {len(matches)} 条{more} (查询耗时 {elapsed * 1000:.3f} ms)[/dim]")
+
+
+def _query_command(argv: List[str]):
+    """
+    检索子命令: unsealer samsung query vault.spass --domain github.com --fields title,password_value
+    """
+    from .query import VaultIndex
+
+    parser = argparse.ArgumentParser(
+        prog="unsealer samsung query",
+        description="解密一次备份并建立内存索引，按域名、用户名、标题或两步验证密钥检索条目。",
+    )
+    parser.add_argument("input_file", type=Path, help="输入的 .spass 文件路径。")
+    _add_query_filters(parser)
+    parser.add_argument("--limit", type=int, help="最多显示的条目数。")
+    parser.add_argument("--ndjson", action="store_true", help="以 NDJSON 格式将结果写入标准输出。")
+    parser.add_argument(
+        "-i",
+        "--interactive",
+        action="store_true",
+        help="解密后进入交互模式，可连续执行多次查询 (空行退出)。",
+    )
+    args = parser.parse_args(argv)
+    if not args.input_file.is_file():
+        console.print(f"[bold red]✗ 错误:[/bold red] 找不到文件 '{args.input_file}'。")
+        sys.exit(1)
+
+    password = Prompt.ask(
+        "[bold yellow]> [/bold yellow]请输入您的三星账户主密码", password=True, console=console
+    )
+    try:
+        with console.status("[bold green]正在解密并建立索引...[/bold green]", spinner="dots"):
+            start = time.perf_counter()
+            with open(args.input_file, "rb") as f:
+                # 延迟解码：建立索引只解码被索引的字段，其余字段在输出时才解码
+                tables = decrypt_and_parse_stream(f, password, lazy=True)
+            index = VaultIndex(tables)
+    except (FileNotFoundError, ValueError) as e:
+        console.print(f"[bold red]✗ 错误:[/bold red] {e}")
+        sys.exit(1)
+    console.print(
+        f"[dim]> 已索引 {len(index.entries)} 条目 (解密与建立索引耗时 {time.perf_counter() - start:.2f} s)[/dim]"
+    )
+
+    query = {key: getattr(args, key) for key in ("domain", "username", "title", "otp", "table", "fields")}
+    if not args.interactive:
+        _print_query_results(index, query, args.limit, args.ndjson)
+        return
+
+    console.print("[dim]> 输入查询条件，例如: domain=github.com user=alice otp fields=title,password_value (空行退出)[/dim]")
+    while True:
+        try:
+            line = Prompt.ask("[bold yellow]查询[/bold yellow]", console=console, default="", show_default=False)
+        except (EOFError, KeyboardInterrupt):
+            break
+        if not line.strip() or line.strip() in ("exit", "quit"):
+            break
+        try:
+            line_query = _parse_query_line(line)
+            if line_query["fields"] is None:
+                line_query["fields"] = args.fields
+            _print_query_results(index, line_query, args.limit, args.ndjson)
+        except ValueError as e:
+            console.print(f"[bold red]✗ 错误:[/bold red] {e}")
+
+
+def _print_summary(counts: Dict[str, int]):
+    summary = Text()
+    for name, count in counts.items():
+        display_name = TABLE_NAMES.get(name, "其他数据")
+        summary.append(f"✓ [cyan]{display_name}[/cyan]: 找到 {count} 条目\n")
+
+    console.print(
+        Panel(
+            summary,
+            title="[bold green]✓ 解密成功[/bold green]",
+            border_style="green",
+        )
+    )
+
+
+def _target_name(output: Path) -> str:
+    return "标准输出" if is_stdout(output) else str(output)
+
+
+def _stream_to_report(input_file: Path, fmt: str, output: Path, password: str):
+    """
+    边解密边写入导出文件，无需先在内存中保存全部条目
+    """
+    console.print(
+        f"[cyan]> [/cyan]正在边解密边保存到 [bold magenta]{_target_name(output)}[/bold magenta] (格式: [yellow]{fmt.upper()}[/yellow])..."
+    )
+    with console.status(
+        "[bold green]正在解密与深度提炼数据...[/bold green]", spinner="dots"
+    ):
+        with open(input_file, "rb") as f:
+            counts = save_tables(
+                stream_tables(f, password), output, fmt, _report_banner([fmt]), require_data=True
+            )
+
+    _print_summary(counts)
+    console.print(
+        f"\n[bold green]✓ 操作成功！[/bold green] 数据已保存至 [bold magenta]{_target_name(output)}[/bold magenta]"
+    )
+
+
+def _process_decryption(args: argparse.Namespace, password: str):
+    targets: Dict[str, Path] = args.targets
     try:
-        file_content = args.input_file.read_bytes()
+        # 单一格式且不使用缓存时边解密边导出；多种格式共享同一份解析结果
+        if not args.use_cache and len(targets) == 1:
+            (fmt, output), = targets.items()
+            _stream_to_report(args.input_file, fmt, output, password)
+            return
+
+        if not targets and not args.use_cache:
+            # 预览只需要各表的条目数：识别表头并计数，不解码任何字段
+            with console.status(
+                "[bold green]正在解密并统计条目...[/bold green]", spinner="dots"
+            ):
+                with open(args.input_file, "rb") as f:
+                    counts = count_tables(f, password)
+            _print_summary(counts)
+            console.print("[dim]> 预览模式不会保存文件。使用 -f 和 -o 参数导出。[/dim]")
+            return
+
+        cache = VaultCache() if args.use_cache else None
         with console.status(
             "[bold green]正在解密与深度提炼数据...[/bold green]", spinner="dots"
         ):
-            all_tables = decrypt_and_parse(file_content, password)
-
-        TABLE_NAMES = {
-            "logins": "登录凭证",
-            "identities": "身份信息",
-            "addresses": "地址信息",
-            "notes": "安全备忘录",
-        }
-        summary = Text()
-        for name, data in all_tables.items():
-            display_name = TABLE_NAMES.get(name, "其他数据")
-            summary.append(f"✓ [cyan]{display_name}[/cyan]: 找到 {len(data)} 条目\n")
+            all_tables, cache_hit = decrypt_with_cache(args.input_file, password, cache, args.compact)
+        if cache_hit:
+            console.print("[dim]> 已从本地缓存读取解析结果。[/dim]")
 
-        console.print(
-            Panel(
-                summary,
-                title="[bold green]✓ 解密成功[/bold green]",
-                border_style="green",
-            )
-        )
+        _print_summary({name: len(data) for name, data in all_tables.items()})
 
-        if args.preview:
+        if not targets:
             console.print("[dim]> 预览模式不会保存文件。使用 -f 和 -o 参数导出。[/dim]")
             return
 
-        console.print(
-            f"[cyan]> [/cyan]正在保存到 [bold magenta]{args.output}[/bold magenta] (格式: [yellow]{args.format.upper()}[/yellow])..."
-        )
+        for fmt, output in targets.items():
+            console.print(
+                f"[cyan]> [/cyan]正在保存到 [bold magenta]{_target_name(output)}[/bold magenta] (格式: [yellow]{fmt.upper()}[/yellow])..."
+            )
 
-        save_dispatch = {
-            "md": lambda data, path, banner: save_as_md(data, path, banner),
-            "txt": lambda data, path, banner: save_as_txt(data, path, banner),
-            "csv": lambda data, path, banner: save_as_csv(
-                data, path
-            ),
-        }
-        save_dispatch[args.format](all_tables, args.output, plain_banner)
+        with console.status("[bold green]正在写入导出文件...[/bold green]", spinner="dots"):
+            save_tables_multi(all_tables, targets, _report_banner(targets))
 
-        console.print(
-            f"\n[bold green]✓ 操作成功！[/bold green] 数据已保存至 [bold magenta]{args.output}[/bold magenta]"
-        )
+        saved = ", ".join(f"[bold magenta]{_target_name(output)}[/bold magenta]" for output in targets.values())
+        console.print(f"\n[bold green]✓ 操作成功！[/bold green] 数据已保存至 {saved}")
 
     except (FileNotFoundError, ValueError) as e:
         console.print(f"[bold red]✗ 错误:[/bold red] {e}")
@@ -351,41 +665,205 @@ def _process_decryption(
         sys.exit(1)
 
 
+def _single_targets(args: argparse.Namespace) -> Dict[str, Path]:
+    """
+    单文件模式下各导出格式的输出路径
+    """
+    targets: Dict[str, Path] = {}
+    for fmt in args.formats:
+        if fmt in args.output_overrides:
+            targets[fmt] = args.output_overrides[fmt]
+        elif args.output and len(args.formats) == 1:
+            targets[fmt] = args.output
+        elif fmt == "ndjson" and not args.output:
+            # NDJSON 默认写入标准输出，便于直接通过管道交给 jq 等工具
+            targets[fmt] = STDOUT_PATH
+        else:
+            # 多种格式时，通用输出路径视为输出目录
+            targets[fmt] = default_output_path(args.input_file, fmt, args.output)
+    return targets
+
+
+def _check_targets(targets: Dict[str, Path], force: bool):
+    """
+    检查各输出目标是否互相冲突或会覆盖已有数据；有问题时列出全部冲突并退出
+    """
+    duplicates: List[str] = []
+    conflicts: List[str] = []
+    overridable = False
+    seen: Dict[Path, str] = {}
+    for fmt, output in targets.items():
+        if is_stdout(output):
+            continue
+        key = output.resolve()
+        if key in seen:
+            duplicates.append(f"格式 {seen[key]} 与 {fmt} 使用了同一个输出路径 '{output}'。")
+            continue
+        seen[key] = fmt
+        if conflict := describe_output_conflict(output, fmt, force):
+            conflicts.append(conflict)
+            overridable |= not force and describe_output_conflict(output, fmt, True) is None
+
+    for problem in duplicates + conflicts:
+        console.print(f"[bold red]✗ 错误:[/bold red] {problem}")
+    if overridable:
+        console.print(f"请使用 '-y' 或 '--force' 标志进行覆盖。")
+    if duplicates or conflicts:
+        sys.exit(1)
+
+
+def _print_progress(report: Dict[str, Any]):
+    rows = report["stages"].get("csv", {}).get("rows", 0)
+    if rows and report["elapsed"]:
+        console.print(f"[dim]> 已解析 {rows} 条目 ({rows / report['elapsed']:.0f} 条目/秒)[/dim]")
+
+
+@contextlib.contextmanager
+def _profile(args: argparse.Namespace) -> Iterator[Optional[Profiler]]:
+    """
+    按 --profile / --cprofile 启用分析 (不包含等待输入密码的时间)
+    """
+    with profile_session(args.profile, args.cprofile, _print_progress) as profiler:
+        yield profiler
+    if args.profile:
+        console.print(f"[dim]> 分析报告已保存至 {args.profile}[/dim]")
+
+
+def _process_batch(args: argparse.Namespace, files: List[Path]):
+    """
+    批量模式：并行解密多个备份，每个输入对应一个输出，并生成成功/失败摘要
+    """
+    try:
+        password_map = load_password_map(args.password_file) if args.password_file else {}
+    except ValueError as e:
+        console.print(f"[bold red]✗ 错误:[/bold red] {e}")
+        sys.exit(1)
+    # 处理开始前检查摘要文件，避免全部备份处理完后才发现无法写入
+    summary_path = (args.output or Path(".")) / "unsealer_batch_summary.json"
+    _check_targets({"json": summary_path}, args.force)
+
+    shared_password = None
+    if any(lookup_password(f, password_map, None) is None for f in files):
+        shared_password = Prompt.ask(
+            "[bold yellow]> [/bold yellow]请输入批量文件共用的三星账户主密码", password=True, console=console
+        )
+    passwords = [lookup_password(f, password_map, shared_password) for f in files]
+
+    output_dirs = {fmt: args.output_overrides.get(fmt, args.output) for fmt in args.formats}
+    for output_dir in set(output_dirs.values()) | {args.output}:
+        if output_dir:
+            output_dir.mkdir(parents=True, exist_ok=True)
+    formats = [] if args.preview else args.formats
+    targets = plan_targets(files, formats, output_dirs) if formats else [{}] * len(files)
+
+    results: List[Dict[str, Any]] = []
+    total_entries = 0
+    start = time.perf_counter()
+    with _profile(args) as profiler, console.status(
+        f"[bold green]正在并行处理 {len(files)} 个备份文件...[/bold green]", spinner="dots"
+    ) as status:
+        for result in run_batch(
+            files,
+            passwords,
+            targets,
+            _report_banner(formats),
+            args.force,
+            args.jobs,
+            args.use_cache,
+            profiler is not None,
+            args.compact,
+        ):
+            if profiler is not None:
+                profiler.merge(result.pop("profile"))
+            results.append(result)
+            total_entries += sum(result["tables"].values())
+            rate = total_entries / (time.perf_counter() - start)
+            status.update(
+                f"[bold green]正在并行处理备份文件... ({len(results)}/{len(files)}, "
+                f"{rate:.0f} 条目/秒)[/bold green]"
+            )
+
+    from rich.table import Table
+
+    table = Table(title="批量处理结果", header_style="bold magenta", border_style="dim")
+    table.add_column("输入文件", style="cyan")
+    table.add_column("状态", justify="center")
+    table.add_column("条目数", justify="right")
+    table.add_column("输出 / 错误信息")
+    for result in sorted(results, key=lambda r: r["input"]):
+        if result["ok"]:
+            table.add_row(
+                result["input"],
+                "[green]✓[/green]",
+                str(sum(result["tables"].values())),
+                result["output"] or "-",
+            )
+        else:
+            table.add_row(result["input"], "[red]✗[/red]", "-", f"[red]{result['error']}[/red]")
+    console.print(table)
+
+    try:
+        write_summary(results, summary_path, args.force)
+    except (OSError, ValueError) as e:
+        console.print(f"[bold red]✗ 错误:[/bold red] 无法保存批处理摘要: {e}")
+        sys.exit(1)
+    failed = sum(1 for r in results if not r["ok"])
+    console.print(
+        f"\n[bold]完成:[/bold] [green]{len(results) - failed} 成功[/green], "
+        f"[red]{failed} 失败[/red]。摘要已保存至 [bold magenta]{summary_path}[/bold magenta]"
+    )
+    if failed:
+        sys.exit(1)
+
+
 def main():
-    plain_banner = _display_banner()
+    if sys.argv[2:3] == ["cache"]:
+        _cache_command(sys.argv[3:])
+        return
+    if sys.argv[2:3] == ["diff"]:
+        _diff_command(sys.argv[3:])
+        return
+    if sys.argv[2:3] == ["merge"]:
+        _merge_command(sys.argv[3:])
+        return
+    if sys.argv[2:3] == ["query"]:
+        _query_command(sys.argv[3:])
+        return
+
+    _display_banner()
     parser = _setup_arg_parser()
     
     args = parser.parse_args(sys.argv[2:])
+    try:
+        args.output, args.output_overrides = _split_outputs(args.outputs, args.formats)
+    except ValueError as e:
+        parser.error(str(e))
+
+    files = collect_input_files(args.input_files)
+    if not files:
+        console.print("[bold red]✗ 错误:[/bold red] 未找到任何 .spass 备份文件。")
+        sys.exit(1)
+    is_batch = len(files) > 1 or any(
+        glob.has_magic(item) or Path(item).is_dir() for item in args.input_files
+    )
+    if is_batch:
+        _process_batch(args, files)
+        return
+    args.input_file = files[0]
 
     password = Prompt.ask(
-        "[bold yellow]> [/bold yellow]请输入您的三星账户主密码", password=True
+        "[bold yellow]> [/bold yellow]请输入您的三星账户主密码", password=True, console=console
     )
 
-    if not args.output and not args.preview:
-        if args.format == "csv":
-            sanitized_stem = _sanitize_filename(args.input_file.stem)
-            args.output = Path(f"{sanitized_stem}_csv_export")
-        else:
-            args.output = args.input_file.with_suffix(f".{args.format}")
-
-    if args.output and not args.preview and not args.force:
-        if args.output.exists():
-            if args.format == "csv" and args.output.is_dir():
-                if any(args.output.iterdir()):
-                    console.print(
-                        f"[bold red]✗ 错误:[/bold red] 输出目录 '{args.output}' 已存在且非空。"
-                    )
-                    console.print(f"请使用 '-y' 或 '--force' 标志进行覆盖。")
-                    sys.exit(1)
-            elif args.output.is_file():
-                console.print(
-                    f"[bold red]✗ 错误:[/bold red] 输出文件 '{args.output}' 已存在。"
-                )
-                console.print(f"请使用 '-y' 或 '--force' 标志进行覆盖。")
-                sys.exit(1)
-
-    _process_decryption(args, password, plain_banner)
+    args.targets = {} if args.preview else _single_targets(args)
+    if args.targets:
+        if args.output and len(args.targets) > 1:
+            args.output.mkdir(parents=True, exist_ok=True)
+        _check_targets(args.targets, args.force)
+
+    with _profile(args):
+        _process_decryption(args, password)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,16 +1,36 @@
 # src\unsealer\samsung\decrypter.py
 
 import base64
+import codecs
 import hashlib
 import csv
+import functools
 import io
+import itertools
 import re
 import json
 import sys
+import time
 import binascii
-from typing import List, Dict, Any, Union
+from typing import (
+    List,
+    Dict,
+    Any,
+    Union,
+    Tuple,
+    Optional,
+    Iterable,
+    Iterator,
+    BinaryIO,
+    Callable,
+    FrozenSet,
+    NamedTuple,
+)
 from pathlib import Path
 
+from .. import profiling
+from .records import LazyEntry, RecordCompactor
+
 try:
     from Crypto.Cipher import AES
     from Crypto.Util.Padding import unpad
@@ -18,14 +38,18 @@ except ImportError:
     print("错误：核心加密库 'pycryptodome' 未安装。请运行 'pip install pycryptodome'。")
     raise
 
-# --- 从外部文件加载解析规则 ---
-try:
-    SCHEMA_PATH = Path(__file__).parent / "schema.json"
-    with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
-        TABLE_SCHEMA = json.load(f)
-except (FileNotFoundError, json.JSONDecodeError) as e:
-    print(f"致命错误：无法加载或解析 schema.json 文件。程序无法继续。错误：{e}", file=sys.stderr)
-    sys.exit(1)
+# --- 从外部文件加载解析规则 (首次解析时才读取，以缩短 CLI 启动时间) ---
+SCHEMA_PATH = Path(__file__).parent / "schema.json"
+
+
+@functools.lru_cache(maxsize=None)
+def load_table_schema() -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"致命错误：无法加载或解析 schema.json 文件。程序无法继续。错误：{e}", file=sys.stderr)
+        sys.exit(1)
 
 
 # --- 加密参数常量 ---
@@ -37,15 +61,37 @@ KEY_SIZE = 32  # AES-256 密钥长度为 32 字节
 # PBKDF2的迭代次数 (70000) 由三星的加密标准决定，必须使用此数值才能成功解密
 PBKDF2_ITERATIONS = 70000
 
+# 密码快速校验只解密开头的两个 CBC 块
+VERIFY_BLOCKS = 2
+# 覆盖 salt + IV + 校验块所需的 Base64 前缀长度 (字符数，按 4 对齐)
+_VERIFY_B64_CHARS = -(-(SALT_SIZE + IV_SIZE + VERIFY_BLOCKS * 16) // 3) * 4
+# 明文是以 ";" 分隔的 CSV 文本 (表头 + Base64 字段)，开头只应出现可打印 ASCII 字符
+_PLAINTEXT_HEADER_BYTES = frozenset(range(0x20, 0x7F)) | frozenset(b"\r\n\t")
+
+# 流式解密时每次读取的文件字节数
+STREAM_CHUNK_SIZE = 1 << 20
+_NON_B64_BYTES = bytes(
+    b for b in range(256)
+    if b not in b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/="
+)
+
+# 明文中各数据表之间的分隔标记
+TABLE_SEPARATOR = "next_table"
+
 
 # --- 辅助解析函数 ---
 
 
+# Base64 编码的 "&&&NULL&&&"，表示字段为空
+_EMPTY_FIELD_VALUES = frozenset(["", "JiYmTlVMTCYmJg=="])
+
+
 def _safe_b64_decode(b64_string: str) -> str:
-    if not b64_string or b64_string.strip() in ["", "JiYmTlVMTCYmJg=="]:
+    if not b64_string or b64_string.strip() in _EMPTY_FIELD_VALUES:
         return ""
     try:
-        return base64.b64decode(b64_string).decode("utf-8")
+        # 直接调用 binascii，省去 base64.b64decode 的参数检查开销 (行为一致)
+        return binascii.a2b_base64(b64_string).decode("utf-8")
     except (binascii.Error, UnicodeDecodeError):
         return b64_string
 
@@ -89,69 +135,404 @@ def clean_android_url(url: str) -> str:
 # --- 核心解析逻辑 ---
 
 
-def parse_decrypted_content(decrypted_content: str) -> Dict[str, List[Dict[str, Any]]]:
-    all_tables: Dict[str, List[Dict[str, Any]]] = {}
-    blocks = decrypted_content.split("next_table")
+# --- 预编译解析规则 ---
+# schema.json 在加载时被编译为指纹索引与逐字段绑定的解码器，
+# 解析每一行时不再需要查询规则字典或在字段列表中做成员判断。
+
+FieldDecoder = Optional[Callable[[str], Any]]
+
+# 与表无关、按字段名生效的解码器
+_FIELD_NAME_DECODERS: Dict[str, Callable[[str], Any]] = {
+    "origin_url": clean_android_url,
+}
+
+
+class CompiledTable(NamedTuple):
+    name: str
+    fingerprint: FrozenSet[str]
+    fields: Tuple[Tuple[str, FieldDecoder], ...]
+
+
+def _bind_field_decoders(
+    fields: Iterable[str], schema: Dict[str, Any]
+) -> Tuple[Tuple[str, FieldDecoder], ...]:
+    json_fields = set(schema.get("json_fields", []))
+    multi_b64_fields = set(schema.get("multi_b64_fields", []))
+    bound = []
+    for field in fields:
+        if field in json_fields:
+            decoder: FieldDecoder = _parse_json_field
+        elif field in multi_b64_fields:
+            decoder = _parse_multi_b64_field
+        else:
+            decoder = _FIELD_NAME_DECODERS.get(field)
+        bound.append((field, decoder))
+    return tuple(bound)
+
+
+def compile_schema(table_schema: Dict[str, Dict[str, Any]]) -> List[CompiledTable]:
+    """
+    将 schema.json 编译为按声明顺序排列的 (指纹集合, 字段解码器) 列表
+    """
+    return [
+        CompiledTable(
+            name=name,
+            fingerprint=frozenset(sch.get("fingerprint", [])),
+            fields=_bind_field_decoders(sch.get("useful_fields", []), sch),
+        )
+        for name, sch in table_schema.items()
+    ]
+
+
+@functools.lru_cache(maxsize=None)
+def get_compiled_schema() -> List[CompiledTable]:
+    return compile_schema(load_table_schema())
+
+
+def __getattr__(name: str) -> Any:
+    # 保持 TABLE_SCHEMA / COMPILED_SCHEMA 模块属性可用，但推迟到首次访问时加载
+    if name == "TABLE_SCHEMA":
+        return load_table_schema()
+    if name == "COMPILED_SCHEMA":
+        return get_compiled_schema()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def unknown_table_key(headers: Iterable[str]) -> str:
+    """
+    未知数据表的稳定名称：由表头集合的哈希得出，与数据表在文件中的位置无关
+
+    unknown_data_N 只表示第 N 个未知数据表，两个备份中同名的未知表可能毫不相关；
+    比较与合并多个备份时改用该名称，只有表头相同的未知表才会互相匹配。
+    """
+    data = "\0".join(sorted(set(headers))).encode("utf-8", "surrogatepass")
+    return f"unknown_{hashlib.blake2b(data, digest_size=4).hexdigest()}"
+
+
+def _identify_table(
+    headers: List[str], unknown_table_count: int, fingerprint_unknown: bool = False
+) -> Tuple[Optional[str], Tuple[Tuple[str, FieldDecoder], ...], int]:
+    """
+    根据表头指纹识别数据表，返回 (表名, 字段解码器, 未知表计数)
+
+    fingerprint_unknown 为 True 时未知数据表以 unknown_table_key 命名，而不是按出现顺序编号。
+    """
+    header_set = frozenset(headers)
+    for table in get_compiled_schema():
+        if table.fingerprint <= header_set:
+            return table.name, table.fields, unknown_table_count
+
+    if "24" in header_set and len(headers) == 1:
+        return None, (), unknown_table_count
+    unknown_table_count += 1
+    return (
+        unknown_table_key(headers)
+        if fingerprint_unknown
+        else f"unknown_data_{unknown_table_count}",
+        _bind_field_decoders(headers, {}),
+        unknown_table_count,
+    )
+
+
+def _bind_columns(
+    headers: List[str], fields: Tuple[Tuple[str, FieldDecoder], ...]
+) -> List[Tuple[int, str, FieldDecoder]]:
+    """
+    将字段解码器绑定到当前数据块的列序号；同名列以最后一列为准 (与 csv.DictReader 一致)
+    """
+    column_index = {header: index for index, header in enumerate(headers)}
+    return [
+        (column_index[field], field, decoder)
+        for field, decoder in fields
+        if field in column_index
+    ]
+
+
+def _warn_block_error(block_index: int, kept: int, error: Exception):
+    """
+    数据块中途出错时保留出错之前已产出的条目，只跳过出错的行及其后的部分
+
+    流式导出时这些条目可能已经写入输出，无法撤回，因此各种解析方式 (包括只统计条目数的预览)
+    统一采用这一规则；出错时还没有任何条目的数据块整体跳过。
+    """
+    if kept:
+        message = f"解析数据块 #{block_index} 时出现问题，已保留此前的 {kept} 个条目，其余部分已跳过。"
+    else:
+        message = f"解析数据块 #{block_index} 时出现问题并已跳过。"
+    print(f"警告: {message}错误: {error}", file=sys.stderr)
+
+
+def _iter_rows(
+    reader: Iterator[List[str]],
+    columns: List[Tuple[int, str, FieldDecoder]],
+    block_index: int,
+) -> Iterator[Dict[str, Any]]:
+    """
+    逐行解码数据表中的条目，与 csv.DictReader 一样按需产出
+    """
+    safe_b64_decode = _safe_b64_decode
+    kept = 0
+    try:
+        for row in reader:
+            row_length = len(row)
+            entry = {}
+            for index, field, decoder in columns:
+                if index >= row_length:
+                    continue
+
+                raw_value = safe_b64_decode(row[index])
+                if not raw_value:
+                    continue
+
+                entry[field] = decoder(raw_value) if decoder else raw_value
+
+            if entry:
+                kept += 1
+                yield entry
+    except Exception as e:
+        _warn_block_error(block_index, kept, e)
+
+
+# 分析模式下按解码器分别计时的阶段名
+_DECODER_STAGES = {
+    _parse_json_field: "field_json",
+    _parse_multi_b64_field: "field_multi_b64",
+    clean_android_url: "field_url",
+}
+
+
+def _iter_rows_profiled(
+    reader: Iterator[List[str]],
+    columns: List[Tuple[int, str, FieldDecoder]],
+    block_index: int,
+    table_name: str,
+    profiler: "profiling.Profiler",
+) -> Iterator[Dict[str, Any]]:
+    """
+    _iter_rows 的分析版本：分别记录 CSV 切分、字段 Base64 解码与各解码器的耗时
+    """
+    perf_counter = time.perf_counter
+    safe_b64_decode = _safe_b64_decode
+    kept = 0
+    try:
+        while True:
+            start = perf_counter()
+            row = next(reader, None)
+            csv_seconds = perf_counter() - start
+            if row is None:
+                break
+            profiler.add("csv", csv_seconds, table_name, sum(map(len, row)), 1)
+
+            row_length = len(row)
+            entry = {}
+            b64_seconds = 0.0
+            for index, field, decoder in columns:
+                if index >= row_length:
+                    continue
+
+                start = perf_counter()
+                raw_value = safe_b64_decode(row[index])
+                b64_seconds += perf_counter() - start
+                if raw_value is row[index]:
+                    profiler.count("b64_fallback")
+                if not raw_value:
+                    continue
+
+                if decoder:
+                    start = perf_counter()
+                    value = decoder(raw_value)
+                    profiler.add(_DECODER_STAGES.get(decoder, "field_other"), perf_counter() - start, table_name)
+                    if decoder is _parse_json_field and isinstance(value, str):
+                        profiler.count("json_fallback")
+                    entry[field] = value
+                else:
+                    entry[field] = raw_value
+            profiler.add("field_b64", b64_seconds, table_name)
+
+            if entry:
+                kept += 1
+                yield entry
+    except Exception as e:
+        _warn_block_error(block_index, kept, e)
+
+
+def _split_blocks(decrypted_content: str) -> Iterator[str]:
+    """
+    按 "next_table" 惰性切分明文，避免一次性生成全部数据块的列表
+    """
+    start = 0
+    while True:
+        end = decrypted_content.find(TABLE_SEPARATOR, start)
+        if end == -1:
+            yield decrypted_content[start:]
+            return
+        yield decrypted_content[start:end]
+        start = end + len(TABLE_SEPARATOR)
+
+
+def _is_empty_raw(value: str) -> bool:
+    # 与 _safe_b64_decode 的空值判断一致，但不做任何解码
+    return not value or value.strip() in _EMPTY_FIELD_VALUES
+
+
+def _decode_field(decoder: FieldDecoder, raw_value: str) -> Any:
+    value = _safe_b64_decode(raw_value)
+    return decoder(value) if decoder and value else value
+
+
+def _iter_lazy_rows(
+    reader: Iterator[List[str]],
+    columns: List[Tuple[int, str, FieldDecoder]],
+    block_index: int,
+) -> Iterator[LazyEntry]:
+    """
+    只切分 CSV 行，字段保持原始文本，在首次访问时才解码
+    """
+    decoders = {field: functools.partial(_decode_field, decoder) for _, field, decoder in columns}
+    kept = 0
+    try:
+        for row in reader:
+            row_length = len(row)
+            raw = {
+                field: row[index]
+                for index, field, _ in columns
+                if index < row_length and not _is_empty_raw(row[index])
+            }
+            if raw:
+                kept += 1
+                yield LazyEntry(raw, decoders)
+    except Exception as e:
+        _warn_block_error(block_index, kept, e)
+
+
+def _split_row(line: str) -> List[str]:
+    return line.split(";")
+
+
+# (块序号, 表名, 字段解码器, 剩余行的 CSV 读取器, 绑定后的列)
+TableBlock = Tuple[
+    int,
+    str,
+    Tuple[Tuple[str, FieldDecoder], ...],
+    Iterator[List[str]],
+    List[Tuple[int, str, FieldDecoder]],
+]
+
+
+def _iter_table_blocks(
+    content: Union[str, Iterable[str]], fingerprint_unknown: bool = False
+) -> Iterator[TableBlock]:
+    """
+    按表头识别各数据块，产出 (块序号, 表名, 字段解码器, 剩余行的 CSV 读取器, 绑定后的列)
+    """
+    blocks = _split_blocks(content) if isinstance(content, str) else content
     unknown_table_count = 0
 
     for block_index, block in enumerate(blocks):
-        clean_block = block.strip()
-        if not clean_block or clean_block.count(";") < 2:
-            continue
-
         try:
-            reader = csv.DictReader(io.StringIO(clean_block), delimiter=";")
-            headers = reader.fieldnames
-            if not headers:
+            clean_block = block.strip()
+            if not clean_block or clean_block.count(";") < 2:
                 continue
 
-            table_name = None
-            schema = {}
-            for name, sch in TABLE_SCHEMA.items():
-                if all(fp in headers for fp in sch.get("fingerprint", [])):
-                    table_name = name
-                    schema = sch
-                    break
+            if '"' in clean_block or "\r" in clean_block:
+                reader = csv.reader(io.StringIO(clean_block), delimiter=";")
+            else:
+                # 字段均为 Base64 文本，没有引号与 \r 时按行切分的结果与 csv.reader 完全相同
+                reader = map(_split_row, clean_block.split("\n"))
+            headers = next(reader, None)
+            if not headers:
+                continue
 
+            table_name, fields, unknown_table_count = _identify_table(
+                headers, unknown_table_count, fingerprint_unknown
+            )
             if not table_name:
-                if "24" in headers and len(headers) == 1:
-                    continue
-                unknown_table_count += 1
-                table_name = f"unknown_data_{unknown_table_count}"
-                schema = {"useful_fields": headers}
+                continue
+            columns = _bind_columns(headers, fields)
+        except Exception as e:
+            _warn_block_error(block_index, 0, e)
+            continue
+        yield block_index, table_name, fields, reader, columns
 
-            table_entries: List[Dict[str, Any]] = []
+
+def iter_tables(
+    content: Union[str, Iterable[str]],
+    compact: bool = False,
+    lazy: bool = False,
+    fingerprint_unknown: bool = False,
+) -> Iterator[Tuple[str, Iterator[Dict[str, Any]]]]:
+    """
+    惰性解析数据表，逐个产出 (表名, 条目迭代器)
+
+    content 可以是完整的明文字符串，也可以是 iter_decrypted_blocks 产出的数据块。
+    没有任何有效条目的数据表会被跳过；数据块中途出错时保留出错之前的条目 (见 _warn_block_error)。
+    compact 为 True 时条目为只读的 CompactRecord (见 records.py)，适合在内存中保留大量条目。
+    lazy 为 True 时条目为 LazyEntry，字段在首次访问时才解码。
+    fingerprint_unknown 为 True 时未知数据表按表头命名 (见 unknown_table_key)，用于跨备份匹配。
+    """
+    if compact and lazy:
+        raise ValueError("compact 与 lazy 不能同时使用。")
+    profiler = profiling.active()
+    compactor = RecordCompactor() if compact else None
+
+    for block_index, table_name, fields, reader, columns in _iter_table_blocks(
+        content, fingerprint_unknown
+    ):
+        if lazy:
+            rows = _iter_lazy_rows(reader, columns, block_index)
+        elif profiler is None:
+            rows = _iter_rows(reader, columns, block_index)
+        else:
+            rows = _iter_rows_profiled(reader, columns, block_index, table_name, profiler)
+        if compactor is not None:
+            rows = compactor.compact_rows(
+                rows,
+                [field for field, _ in fields],
+                load_table_schema().get(table_name, {}).get("json_subkeys"),
+            )
+        first_entry = next(rows, None)
+        if first_entry is not None:
+            yield table_name, itertools.chain((first_entry,), rows)
+
+
+def count_table_rows(content: Union[str, Iterable[str]]) -> Dict[str, int]:
+    """
+    只统计各数据表的条目数：按表头识别数据表，按原始字段是否为空判断条目，不解码任何字段
+
+    与 parse_decrypted_content 的结果一致 (同名数据表以最后一个数据块为准，空表不计入)。
+    没有任何条目时返回空字典。
+    """
+    counts: Dict[str, int] = {}
+    for block_index, table_name, _, reader, columns in _iter_table_blocks(content):
+        indexes = [index for index, _, _ in columns]
+        count = 0
+        try:
             for row in reader:
-                entry = {}
-                for field in schema.get("useful_fields", []):
-                    raw_value_pre = row.get(field)
-                    if raw_value_pre is None:
-                        continue
-
-                    raw_value = _safe_b64_decode(raw_value_pre)
-                    if not raw_value:
-                        continue
-
-                    if field in schema.get("json_fields", []):
-                        entry[field] = _parse_json_field(raw_value)
-                    elif field in schema.get("multi_b64_fields", []):
-                        entry[field] = _parse_multi_b64_field(raw_value)
-                    elif field == "origin_url":
-                        entry[field] = clean_android_url(raw_value)
-                    else:
-                        entry[field] = raw_value
-
-                if entry:
-                    table_entries.append(entry)
-
-            if table_entries:
-                all_tables[table_name] = table_entries
+                row_length = len(row)
+                if any(index < row_length and not _is_empty_raw(row[index]) for index in indexes):
+                    count += 1
         except Exception as e:
-            print(
-                f"警告: 解析数据块 #{block_index} 时出现问题并已跳过。错误: {e}",
-                file=sys.stderr,
-            )
-            continue
+            _warn_block_error(block_index, count, e)
+        if count:
+            counts[table_name] = count
+    return counts
+
+
+def iter_entries(content: Union[str, Iterable[str]]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    惰性解析全部条目，逐个产出 (表名, 条目)
+    """
+    for table_name, entries in iter_tables(content):
+        for entry in entries:
+            yield table_name, entry
+
+
+def _collect_tables(
+    tables: Iterable[Tuple[str, Iterable[Dict[str, Any]]]]
+) -> Dict[str, List[Dict[str, Any]]]:
+    all_tables: Dict[str, List[Dict[str, Any]]] = {}
+    for table_name, entries in tables:
+        all_tables[table_name] = list(entries)
 
     if not all_tables:
         raise ValueError("解密成功，但在文件中未找到任何有价值的数据。")
@@ -159,25 +540,48 @@ def parse_decrypted_content(decrypted_content: str) -> Dict[str, List[Dict[str,
     return all_tables
 
 
-def decrypt_and_parse(
-    file_content_bytes: bytes, password: str
+def parse_decrypted_content(
+    decrypted_content: str, compact: bool = False, lazy: bool = False
 ) -> Dict[str, List[Dict[str, Any]]]:
+    return _collect_tables(iter_tables(decrypted_content, compact, lazy))
+
+
+def compact_tables(tables: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
     """
-    主解密函数
+    将已解析 (例如从缓存读取) 的 dict 条目转换为 CompactRecord
     """
-    try:
-        binary_data = base64.b64decode(file_content_bytes.decode("utf-8").strip())
+    schema = load_table_schema()
+    compactor = RecordCompactor()
+    result = {}
+    for table_name, entries in tables.items():
+        table_schema = schema.get(table_name, {})
+        fields = dict.fromkeys(table_schema.get("useful_fields", []))
+        for entry in entries:
+            fields.update(dict.fromkeys(entry))
+        result[table_name] = list(
+            compactor.compact_rows(iter(entries), list(fields), table_schema.get("json_subkeys"))
+        )
+    return result
 
-        salt_end = SALT_SIZE
-        iv_end = salt_end + IV_SIZE
 
-        salt, iv, encrypted_data = (
-            binary_data[:salt_end],
-            binary_data[salt_end:iv_end],
-            binary_data[iv_end:],
-        )
+# --- 密钥派生与密码校验 ---
+
+
+def _split_payload(binary_data: bytes) -> Tuple[bytes, bytes, bytes]:
+    salt_end = SALT_SIZE
+    iv_end = salt_end + IV_SIZE
+    if len(binary_data) < iv_end + AES.block_size:
+        raise ValueError("文件内容过短，不是有效的三星密码本备份。")
+    return (
+        binary_data[:salt_end],
+        binary_data[salt_end:iv_end],
+        binary_data[iv_end:],
+    )
 
-        key = hashlib.pbkdf2_hmac(
+
+def _derive_key(password: str, salt: bytes) -> bytes:
+    with profiling.stage("kdf"):
+        return hashlib.pbkdf2_hmac(
             "sha256",
             password.encode("utf-8"),
             salt,
@@ -185,16 +589,231 @@ def decrypt_and_parse(
             dklen=KEY_SIZE,
         )
 
-        cipher = AES.new(key, AES.MODE_CBC, iv)
-        decrypted_data = unpad(
-            cipher.decrypt(encrypted_data), AES.block_size, style="pkcs7"
-        )
 
-        return parse_decrypted_content(decrypted_data.decode("utf-8"))
+def _key_matches(
+    key: bytes, iv: bytes, encrypted_head: bytes, is_complete: bool = True
+) -> bool:
+    """
+    只解密前几个 CBC 块，检查其是否为预期的 CSV 明文表头
+    """
+    head_size = min(len(encrypted_head), VERIFY_BLOCKS * AES.block_size)
+    head_size -= head_size % AES.block_size
+    plaintext = AES.new(key, AES.MODE_CBC, iv).decrypt(encrypted_head[:head_size])
+    if is_complete and head_size == len(encrypted_head):
+        # 密文过短时开头即是最后一块，需要先去除填充
+        try:
+            plaintext = unpad(plaintext, AES.block_size, style="pkcs7")
+        except ValueError:
+            return False
+    return bool(plaintext) and all(b in _PLAINTEXT_HEADER_BYTES for b in plaintext)
+
+
+def verify_password(file: Union[str, Path, bytes], password: str) -> bool:
+    """
+    快速校验密码：只需一次密钥派生和两个 AES 块的解密，无需解密整个文件
+    """
+    read_size = _VERIFY_B64_CHARS * 2
+    if isinstance(file, bytes):
+        head = file[:read_size]
+    else:
+        with open(file, "rb") as f:
+            head = f.read(read_size)
+    b64_head = b"".join(head.split())
+    is_complete = len(head) < read_size and len(b64_head) <= _VERIFY_B64_CHARS
+    try:
+        binary_data = base64.b64decode(b64_head[:_VERIFY_B64_CHARS])
+        salt, iv, encrypted_data = _split_payload(binary_data)
+    except (ValueError, binascii.Error):
+        return False
+    return _key_matches(_derive_key(password, salt), iv, encrypted_data, is_complete)
+
+
+# --- 流式解密引擎 ---
+
+
+def _iter_b64_decoded(stream: BinaryIO, chunk_size: int) -> Iterator[bytes]:
+    """
+    分块读取并解码 Base64 文本，每次只保留不足 4 个字符的尾部
+    """
+    profiler = profiling.active()
+    pending = b""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        start = time.perf_counter()
+        # 与 base64.b64decode 的默认行为一致：忽略非 Base64 字母表中的字符
+        data = pending + chunk.translate(None, _NON_B64_BYTES)
+        usable = len(data) - len(data) % 4
+        pending = data[usable:]
+        decoded = base64.b64decode(data[:usable]) if usable else b""
+        if profiler is not None:
+            profiler.add("base64", time.perf_counter() - start, nbytes=len(chunk))
+        if decoded:
+            yield decoded
+    if pending:
+        yield base64.b64decode(pending)
+
+
+def _iter_decrypted_chunks(
+    stream: BinaryIO, password: str, chunk_size: int
+) -> Iterator[bytes]:
+    """
+    流式 AES-CBC 解密：始终保留最后一个密文块，以便在结尾去除 PKCS7 填充
+    """
+    header_size = SALT_SIZE + IV_SIZE
+    verify_size = header_size + VERIFY_BLOCKS * AES.block_size
+    decoded = _iter_b64_decoded(stream, chunk_size)
+
+    buffer = b""
+    is_complete = True
+    for piece in decoded:
+        buffer += piece
+        if len(buffer) > verify_size:
+            is_complete = False
+            break
+    salt, iv, buffer = _split_payload(buffer)
+
+    key = _derive_key(password, salt)
+    if not _key_matches(key, iv, buffer, is_complete):
+        # 密码错误时在解密剩余数据之前直接失败
+        raise ValueError("密码校验失败。")
+    cipher = AES.new(key, AES.MODE_CBC, iv)
+    profiler = profiling.active()
+
+    for piece in decoded:
+        buffer += piece
+        ready = len(buffer) - len(buffer) % AES.block_size
+        if ready == len(buffer):
+            ready -= AES.block_size
+        if ready > 0:
+            start = time.perf_counter()
+            plaintext = cipher.decrypt(buffer[:ready])
+            buffer = buffer[ready:]
+            if profiler is not None:
+                profiler.add("aes", time.perf_counter() - start, nbytes=ready)
+            yield plaintext
+
+    if len(buffer) % AES.block_size:
+        raise ValueError("密文长度不是 AES 块大小的整数倍。")
+    start = time.perf_counter()
+    plaintext = unpad(cipher.decrypt(buffer), AES.block_size, style="pkcs7")
+    if profiler is not None:
+        profiler.add("aes", time.perf_counter() - start, nbytes=len(buffer))
+    yield plaintext
+
+
+def iter_decrypted_blocks(
+    stream: BinaryIO, password: str, chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator[str]:
+    """
+    从加密的文件流中逐个产出以 "next_table" 分隔的明文数据块
+
+    未完成的数据块以片段列表保存，只在新到达的文本 (连同可能跨越片段边界的分隔符前缀) 中查找分隔符，
+    找到时才拼接；每段明文只被扫描与拼接一次，耗时与数据表大小成线性关系。
+    """
+    profiler = profiling.active()
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    overlap = len(TABLE_SEPARATOR) - 1
+    pending: List[str] = []
+    carry = ""
+    for plaintext in _iter_decrypted_chunks(stream, password, chunk_size):
+        start = time.perf_counter()
+        text = decoder.decode(plaintext)
+        blocks: List[str] = []
+        if TABLE_SEPARATOR in carry + text[:overlap] or TABLE_SEPARATOR in text:
+            pending.append(text)
+            *blocks, last = "".join(pending).split(TABLE_SEPARATOR)
+            pending = [last]
+            carry = last[-overlap:]
+        else:
+            pending.append(text)
+            carry = (carry + text)[-overlap:]
+        if profiler is not None:
+            profiler.add("utf8_split", time.perf_counter() - start, nbytes=len(plaintext))
+        yield from blocks
+    pending.append(decoder.decode(b"", final=True))
+    yield "".join(pending)
+
+
+def decrypt_and_parse_stream(
+    stream: BinaryIO,
+    password: str,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    compact: bool = False,
+    lazy: bool = False,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    流式解密函数：Base64 解码、AES 解密与解析逐块进行，内存占用约为单个数据块的大小
+    """
+    try:
+        return _collect_tables(
+            iter_tables(iter_decrypted_blocks(stream, password, chunk_size), compact, lazy)
+        )
 
     except (ValueError, binascii.Error):
         raise ValueError(
             "解密失败。请仔细检查您的密码是否正确，并确认文件是有效的三星密码本备份。"
         )
     except Exception as e:
-        raise ValueError("解密或解析过程中发生未知内部错误。文件可能已损坏。") 
\ No newline at end of file
+        raise ValueError("解密或解析过程中发生未知内部错误。文件可能已损坏。")
+
+
+def stream_entries(
+    stream: BinaryIO, password: str, chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    从加密的文件流中边解密边解析，逐个产出 (表名, 条目)
+    """
+    try:
+        yield from iter_entries(iter_decrypted_blocks(stream, password, chunk_size))
+    except (ValueError, binascii.Error):
+        raise ValueError(
+            "解密失败。请仔细检查您的密码是否正确，并确认文件是有效的三星密码本备份。"
+        )
+
+
+def count_tables(
+    stream: BinaryIO, password: str, chunk_size: int = STREAM_CHUNK_SIZE
+) -> Dict[str, int]:
+    """
+    流式解密并只统计各数据表的条目数 (用于预览)，耗时基本等于密钥派生加一次 AES 解密
+    """
+    try:
+        counts = count_table_rows(iter_decrypted_blocks(stream, password, chunk_size))
+    except (ValueError, binascii.Error):
+        raise ValueError(
+            "解密失败。请仔细检查您的密码是否正确，并确认文件是有效的三星密码本备份。"
+        )
+    if not counts:
+        raise ValueError("解密成功，但在文件中未找到任何有价值的数据。")
+    return counts
+
+
+def stream_tables(
+    stream: BinaryIO,
+    password: str,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    fingerprint_unknown: bool = False,
+) -> Iterator[Tuple[str, Iterator[Dict[str, Any]]]]:
+    """
+    从加密的文件流中边解密边解析，逐个产出 (表名, 条目迭代器)，可直接交给流式导出函数
+    """
+    try:
+        yield from iter_tables(
+            iter_decrypted_blocks(stream, password, chunk_size),
+            fingerprint_unknown=fingerprint_unknown,
+        )
+    except (ValueError, binascii.Error):
+        raise ValueError(
+            "解密失败。请仔细检查您的密码是否正确，并确认文件是有效的三星密码本备份。"
+        )
+
+
+def decrypt_and_parse(
+    file_content_bytes: bytes, password: str, compact: bool = False
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    主解密函数
+    """
+    return decrypt_and_parse_stream(io.BytesIO(file_content_bytes), password, compact=compact)
@@ -0,0 +1,209 @@
+# src/unsealer/samsung/diff.py
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from .decrypter import load_table_schema, stream_tables
+
+# 输出数据表的后缀 (例如 logins_added)，按此顺序写出
+DIFF_CHANGES = ("added", "removed", "modified")
+
+# 身份键 -> [(内容哈希, 条目)]；同一身份通常只有一个条目，重复时按出现顺序保存
+TableIndex = Dict[Tuple[Any, ...], List[Tuple[bytes, Dict[str, Any]]]]
+
+# 规范化的 JSON 序列化：键按字典序排列，与字段顺序及条目类型 (dict / 紧凑记录) 无关
+_canonical_json = json.JSONEncoder(
+    ensure_ascii=False, sort_keys=True, check_circular=False, default=dict
+).encode
+
+
+class TableDiff(NamedTuple):
+    added: List[Dict[str, Any]]
+    removed: List[Dict[str, Any]]
+    modified: List[Tuple[Dict[str, Any], Dict[str, Any]]]
+    unchanged: int
+
+
+def content_hash(entry: Dict[str, Any]) -> bytes:
+    """
+    条目内容的 128 位哈希，用于判断同一身份的条目是否被修改
+    """
+    data = _canonical_json(entry).encode("utf-8", "surrogatepass")
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _identity_value(value: Any) -> Any:
+    if value is None or isinstance(value, str):
+        return value
+    return _canonical_json(value)
+
+
+def identity_key(entry: Dict[str, Any], identity_fields: Sequence[str], digest: bytes) -> Tuple[Any, ...]:
+    """
+    条目的身份键：schema.json 中 identity_fields (例如登录凭证的 origin_url + username_value) 的取值
+
+    未声明身份字段的数据表以内容哈希作为身份，此时修改过的条目表现为一删一增。
+    """
+    if identity_fields:
+        return tuple(_identity_value(entry.get(field)) for field in identity_fields)
+    return (digest,)
+
+
+def build_index(
+    entries: Iterable[Dict[str, Any]],
+    identity_fields: Sequence[str],
+    index: Optional[TableIndex] = None,
+) -> TableIndex:
+    """
+    按身份键建立哈希索引，每个条目附带其内容哈希；传入 index 时在其基础上追加
+    """
+    if index is None:
+        index = {}
+    for entry in entries:
+        digest = content_hash(entry)
+        index.setdefault(identity_key(entry, identity_fields, digest), []).append((digest, entry))
+    return index
+
+
+def index_tables(tables: Dict[str, List[Dict[str, Any]]]) -> Dict[str, TableIndex]:
+    schema = load_table_schema()
+    return {
+        name: build_index(entries, schema.get(name, {}).get("identity_fields", []))
+        for name, entries in tables.items()
+    }
+
+
+def load_index(input_file: str, password: str) -> Dict[str, TableIndex]:
+    """
+    解密一个备份并为各数据表建立索引 (在工作进程中执行，多个备份并行处理)
+
+    未知数据表按表头命名 (见 unknown_table_key)，不同备份中表头不同的未知表不会互相比较或合并；
+    同一备份中名称相同的数据块合并到同一个索引中。
+    """
+    schema = load_table_schema()
+    indexes: Dict[str, TableIndex] = {}
+    try:
+        with open(input_file, "rb") as f:
+            for name, entries in stream_tables(f, password, fingerprint_unknown=True):
+                identity_fields = schema.get(name, {}).get("identity_fields", [])
+                indexes[name] = build_index(entries, identity_fields, indexes.get(name))
+        if not indexes:
+            raise ValueError("解密成功，但在文件中未找到任何有价值的数据。")
+    except ValueError as e:
+        # 多个文件并行处理，错误信息中注明是哪一个备份
+        raise ValueError(f"{Path(input_file).name}: {e}")
+    return indexes
+
+
+def _diff_group(
+    old_items: List[Tuple[bytes, Dict[str, Any]]],
+    new_items: List[Tuple[bytes, Dict[str, Any]]],
+    diff: TableDiff,
+) -> int:
+    """
+    比较同一身份下的条目，返回未变化的条目数
+
+    内容哈希相同的条目两两抵消，剩余的按顺序配对为修改，多出的部分为新增或删除。
+    """
+    if len(old_items) == 1 and len(new_items) == 1:
+        (old_hash, old_entry), (new_hash, new_entry) = old_items[0], new_items[0]
+        if old_hash == new_hash:
+            return 1
+        diff.modified.append((old_entry, new_entry))
+        return 0
+
+    remaining = list(old_items)
+    unmatched: List[Dict[str, Any]] = []
+    unchanged = 0
+    for new_hash, new_entry in new_items:
+        for i, (old_hash, _) in enumerate(remaining):
+            if old_hash == new_hash:
+                del remaining[i]
+                unchanged += 1
+                break
+        else:
+            unmatched.append(new_entry)
+    for (_, old_entry), new_entry in zip(remaining, unmatched):
+        diff.modified.append((old_entry, new_entry))
+    diff.added.extend(unmatched[len(remaining):])
+    diff.removed.extend(old_entry for _, old_entry in remaining[len(unmatched):])
+    return unchanged
+
+
+def diff_indexes(old: TableIndex, new: TableIndex) -> TableDiff:
+    """
+    比较同一数据表的两个索引；每个身份键只查找一次，耗时与条目总数成线性关系
+    """
+    diff = TableDiff([], [], [], 0)
+    unchanged = 0
+    for key, new_items in new.items():
+        old_items = old.get(key)
+        if old_items is None:
+            diff.added.extend(entry for _, entry in new_items)
+        else:
+            unchanged += _diff_group(old_items, new_items, diff)
+    for key, old_items in old.items():
+        if key not in new:
+            diff.removed.extend(entry for _, entry in old_items)
+    return diff._replace(unchanged=unchanged)
+
+
+def diff_tables(
+    old: Dict[str, TableIndex], new: Dict[str, TableIndex]
+) -> Dict[str, TableDiff]:
+    names = list(old) + [name for name in new if name not in old]
+    return {name: diff_indexes(old.get(name, {}), new.get(name, {})) for name in names}
+
+
+def changed_fields(old: Dict[str, Any], new: Dict[str, Any]) -> List[str]:
+    return sorted(key for key in set(old) | set(new) if old.get(key) != new.get(key))
+
+
+def diff_to_tables(diffs: Dict[str, TableDiff]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    将比较结果转换为可交给 save_tables 的数据表：{表名}_added / _removed / _modified
+
+    修改的条目输出新版本，并附加 changed_fields (变化的字段) 与 previous (这些字段的旧值)。
+    """
+    tables: Dict[str, List[Dict[str, Any]]] = {}
+    for name, diff in diffs.items():
+        modified = []
+        for old_entry, new_entry in diff.modified:
+            fields = changed_fields(old_entry, new_entry)
+            modified.append({
+                **new_entry,
+                "changed_fields": fields,
+                "previous": {field: old_entry[field] for field in fields if field in old_entry},
+            })
+        for change, entries in zip(DIFF_CHANGES, (diff.added, diff.removed, modified)):
+            if entries:
+                tables[f"{name}_{change}"] = entries
+    return tables
+
+
+def diff_files(
+    old_file: Path,
+    new_file: Path,
+    old_password: str,
+    new_password: Optional[str] = None,
+    max_workers: Optional[int] = None,
+) -> Dict[str, TableDiff]:
+    """
+    比较两个备份：两个文件在独立的进程中并行解密、解析并建立索引，主进程只做线性的键比较
+
+    new_password 为空时两个备份使用同一个密码；只有一个 CPU 核心 (或 max_workers=1) 时依次处理，
+    避免进程池的启动与结果传输开销。
+    """
+    jobs = [(str(old_file), old_password), (str(new_file), new_password or old_password)]
+    if min(max_workers or os.cpu_count() or 1, len(jobs)) == 1:
+        old, new = (load_index(*job) for job in jobs)
+        return diff_tables(old, new)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        old_future, new_future = (executor.submit(load_index, *job) for job in jobs)
+        return diff_tables(old_future.result(), new_future.result())
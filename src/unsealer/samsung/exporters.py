@@ -0,0 +1,776 @@
+# src/unsealer/samsung/exporters.py
+
+import contextlib
+import csv
+import io
+import itertools
+import json
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from datetime import datetime
+from typing import (
+    Dict,
+    List,
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    NamedTuple,
+    Optional,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+from .. import profiling
+from ..ndjson_export import is_stdout
+
+EXPORT_FORMATS = ["md", "txt", "csv", "sqlite", "ndjson"]
+
+
+# 导出文件使用较大的写缓冲，逐条写入时减少系统调用
+WRITE_BUFFER_SIZE = 1 << 16
+
+TABLE_ORDER = ["logins", "identities", "addresses", "notes"]
+
+# 导出函数接受完整的解析结果，或 (表名, 条目迭代器) 的流 (例如 stream_tables 的输出)
+Tables = Union[Mapping[str, List[Dict[str, Any]]], Iterable[Tuple[str, Iterable[Dict[str, Any]]]]]
+
+
+class _Section(NamedTuple):
+    header: str
+    count_label: str
+    entry_lines: Callable[[int, Dict[str, Any]], Iterator[str]]
+
+
+# --- TXT Custom Formatter --- #
+def _login_txt_lines(i: int, entry: Dict[str, Any]) -> Iterator[str]:
+    yield f"\n--- [ {i}. {entry.get('title', '未知条目')} ] ---"
+    yield f"{'用户名:':<10} {entry.get('username_value', 'N/A')}"
+    yield f"{'密码:':<10} {entry.get('password_value', 'N/A')}"
+    if url := entry.get("origin_url"):
+        yield f"{'网址/应用:':<10} {url}"
+    if memo := entry.get("credential_memo"):
+        yield f"{'备注:':<10} {memo}"
+    if isinstance(otp := entry.get("otp"), Mapping) and otp.get("secret"):
+        yield f"\n  [!!] 两步验证 (2FA) 密钥:"
+        yield f"    {'密钥:':<8} {otp.get('secret')}"
+        yield f"    {'账户:':<8} {otp.get('name', 'N/A')}"
+
+
+def _identity_txt_lines(i: int, entry: Dict[str, Any]) -> Iterator[str]:
+    yield f"\n--- [ {i}. {entry.get('name', '未知身份')} ] ---"
+    if isinstance(id_card := entry.get("id_card_detail"), Mapping):
+        yield f"{'身份证号:':<10} {id_card.get('mIDCardNumber', 'N/A')}"
+        yield f"{'姓名:':<10} {id_card.get('mUsername', 'N/A')}"
+        yield f"{'出生日期:':<10} {id_card.get('mBirthDay', 'N/A')}"
+    if phones := entry.get("telephone_number_list"):
+        yield f"{'电话:':<10} {', '.join(phones)}"
+    if emails := entry.get("email_address_list"):
+        yield f"{'邮箱:':<10} {', '.join(emails)}"
+
+
+def _address_name(i: int, entry: Dict[str, Any]) -> str:
+    name = entry.get("full_name", f"地址 {i}")
+    if name == "添加地址/名称":
+        name = f"地址 {i} (模板)"
+    return name
+
+
+def _full_address(entry: Dict[str, Any]) -> str:
+    addr_parts = [
+        entry.get(k)
+        for k in ["street_address", "city", "state", "zipcode", "country_code"]
+    ]
+    return ", ".join(filter(None, addr_parts))
+
+
+def _address_txt_lines(i: int, entry: Dict[str, Any]) -> Iterator[str]:
+    yield f"\n--- [ {i}. {_address_name(i, entry)} ] ---"
+    if full_address := _full_address(entry):
+        yield f"{'地址:':<10} {full_address}"
+    if phone := entry.get("phone_number"):
+        yield f"{'电话:':<10} {phone}"
+    if email := entry.get("email"):
+        yield f"{'邮箱:':<10} {email}"
+
+
+def _note_txt_lines(i: int, entry: Dict[str, Any]) -> Iterator[str]:
+    yield f"\n--- [ {i}. {entry.get('note_title', '无标题备忘录')} ] ---\n"
+    yield f"{entry.get('note_detail', '')}"
+
+
+TXT_SECTIONS = {
+    "logins": _Section(
+        "====================\n [登录凭证] Logins{count}\n====================",
+        " ({} 条)",
+        _login_txt_lines,
+    ),
+    "identities": _Section(
+        "\n\n=======================\n [身份信息] Identities{count}\n=======================",
+        " ({} 条)",
+        _identity_txt_lines,
+    ),
+    "addresses": _Section(
+        "\n\n=====================\n [地址信息] Addresses{count}\n=====================",
+        " ({} 条)",
+        _address_txt_lines,
+    ),
+    "notes": _Section(
+        "\n\n======================\n [安全备忘录] Notes{count}\n======================",
+        " ({} 条)",
+        _note_txt_lines,
+    ),
+}
+
+
+# --- Markdown Custom Formatter --- # 
+def _login_md_lines(i: int, entry: Dict[str, Any]) -> Iterator[str]:
+    yield f"### {i}. {entry.get('title', '未知条目')}"
+    yield f"- **用户名**: `{entry.get('username_value', 'N/A')}`"
+    yield f"- **密码**: `{entry.get('password_value', 'N/A')}`"
+    if url := entry.get("origin_url"):
+        yield f"- **网址/应用**: `{url}`"
+    if memo := entry.get("credential_memo"):
+        yield f"- **备注**: {memo}"
+    if isinstance(otp := entry.get("otp"), Mapping) and otp.get("secret"):
+        yield "- **[!] 两步验证 (2FA) 密钥**: "
+        yield f"  - **密钥 (Secret)**: `{otp.get('secret')}`"
+        yield f"  - **账户**: `{otp.get('name', 'N/A')}`"
+    yield "\n---\n"
+
+
+def _identity_md_lines(i: int, entry: Dict[str, Any]) -> Iterator[str]:
+    yield f"### {i}. {entry.get('name', '未知身份')}"
+    if isinstance(id_card := entry.get("id_card_detail"), Mapping):
+        yield f"- **身份证号**: `{id_card.get('mIDCardNumber', 'N/A')}`"
+        yield f"- **姓名**: `{id_card.get('mUsername', 'N/A')}`"
+        yield f"- **出生日期**: `{id_card.get('mBirthDay', 'N/A')}`"
+    if phones := entry.get("telephone_number_list"):
+        yield f"- **电话**: {', '.join([f'`{p}`' for p in phones])}"
+    if emails := entry.get("email_address_list"):
+        yield f"- **邮箱**: {', '.join([f'`{e}`' for e in emails])}"
+    yield "\n---\n"
+
+
+def _address_md_lines(i: int, entry: Dict[str, Any]) -> Iterator[str]:
+    yield f"### {i}. {_address_name(i, entry)}"
+    if full_address := _full_address(entry):
+        yield f"- **地址**: {full_address}"
+    if phone := entry.get("phone_number"):
+        yield f"- **电话**: `{phone}`"
+    if email := entry.get("email"):
+        yield f"- **邮箱**: `{email}`"
+    yield "\n---\n"
+
+
+def _note_md_lines(i: int, entry: Dict[str, Any]) -> Iterator[str]:
+    yield f"### {i}. {entry.get('note_title', '无标题备忘录')}"
+    yield f"```\n{entry.get('note_detail', '')}\n```"
+    yield "\n---\n"
+
+
+MD_SECTIONS = {
+    "logins": _Section("## [登录凭证] Logins{count}\n", " - 共 {} 条", _login_md_lines),
+    "identities": _Section("## [身份信息] Identities{count}\n", " - 共 {} 条", _identity_md_lines),
+    "addresses": _Section("## [地址信息] Addresses{count}\n", " - 共 {} 条", _address_md_lines),
+    "notes": _Section("## [安全备忘录] Notes{count}\n", " - 共 {} 条", _note_md_lines),
+}
+
+
+# --- 流式写入 --- #
+def _write_entries(
+    f: TextIO, section: _Section, entries: Iterable[Dict[str, Any]]
+) -> int:
+    """
+    逐条写入一个数据表的条目 (不含标题)，返回写入的条目数
+    """
+    written = 0
+    for written, entry in enumerate(entries, 1):
+        for line in section.entry_lines(written, entry):
+            f.write("\n")
+            f.write(line)
+    return written
+
+
+def _write_section(
+    f: TextIO, section: _Section, entries: List[Dict[str, Any]]
+) -> int:
+    """
+    写入一个数据表 (标题中包含条目数)，返回写入的条目数
+    """
+    f.write(section.header.format(count=section.count_label.format(len(entries))))
+    return _write_entries(f, section, entries)
+
+
+def _render_section(section: _Section, data: List[Dict]) -> str:
+    buffer = io.StringIO()
+    _write_section(buffer, section, data)
+    return buffer.getvalue()
+
+
+def _format_logins_txt(data: List[Dict]) -> str:
+    return _render_section(TXT_SECTIONS["logins"], data)
+
+
+def _format_identities_txt(data: List[Dict]) -> str:
+    return _render_section(TXT_SECTIONS["identities"], data)
+
+
+def _format_addresses_txt(data: List[Dict]) -> str:
+    return _render_section(TXT_SECTIONS["addresses"], data)
+
+
+def _format_notes_txt(data: List[Dict]) -> str:
+    return _render_section(TXT_SECTIONS["notes"], data)
+
+
+def _format_logins_md(data: List[Dict]) -> str:
+    return _render_section(MD_SECTIONS["logins"], data)
+
+
+def _format_identities_md(data: List[Dict]) -> str:
+    return _render_section(MD_SECTIONS["identities"], data)
+
+
+def _format_addresses_md(data: List[Dict]) -> str:
+    return _render_section(MD_SECTIONS["addresses"], data)
+
+
+def _format_notes_md(data: List[Dict]) -> str:
+    return _render_section(MD_SECTIONS["notes"], data)
+
+
+def _table_rank(table_name: str) -> int:
+    return TABLE_ORDER.index(table_name) if table_name in TABLE_ORDER else len(TABLE_ORDER)
+
+
+def _open_tables(data: Tables) -> Tuple[Iterator[Tuple[str, Iterable[Dict[str, Any]]]], Optional[int]]:
+    """
+    统一两种输入形式，返回 (按输出顺序排列的数据表迭代器, 数据类别数或 None)
+
+    完整的解析结果按固定顺序输出；流式输入按到达顺序输出 (md / txt 报告随后经 _SectionSpool
+    按固定顺序重排)，并预先取出第一个数据表，使解密失败 (例如密码错误) 在创建输出文件之前就抛出。
+    """
+    if isinstance(data, Mapping):
+        sorted_tables = sorted(data.keys(), key=_table_rank)
+        return ((name, data[name]) for name in sorted_tables), len(data)
+
+    tables = iter(data)
+    first = next(tables, None)
+    if first is None:
+        return iter(()), None
+    return itertools.chain((first,), tables), None
+
+
+# --- 差异报告 (unsealer samsung diff) --- #
+# 比较结果中的数据表名为 "{表名}_{变化}"，沿用原数据表的格式，并在修改的条目中列出变化的字段
+DIFF_LABELS = {"added": "新增", "removed": "删除", "modified": "修改"}
+MD_CHANGED_LINE = "- **变更字段**: {}"
+TXT_CHANGED_LINE = f"{'变更字段:':<10} {{}}"
+
+
+def _with_changed_fields(
+    entry_lines: Callable[[int, Dict[str, Any]], Iterator[str]], changed_line: str
+) -> Callable[[int, Dict[str, Any]], Iterator[str]]:
+    def lines(i: int, entry: Dict[str, Any]) -> Iterator[str]:
+        base = entry_lines(i, entry)
+        yield next(base)
+        if fields := entry.get("changed_fields"):
+            yield changed_line.format(", ".join(fields))
+        yield from base
+
+    return lines
+
+
+def _resolve_section(
+    sections: Dict[str, _Section], table_name: str, changed_line: str
+) -> Optional[_Section]:
+    section = sections.get(table_name)
+    if section is not None:
+        return section
+    base_name, _, change = table_name.rpartition("_")
+    base = sections.get(base_name)
+    if base is None or change not in DIFF_LABELS:
+        return None
+    return _Section(
+        base.header.replace("{count}", f" - {DIFF_LABELS[change]}{{count}}"),
+        base.count_label,
+        _with_changed_fields(base.entry_lines, changed_line),
+    )
+
+
+def _write_tables(
+    f: TextIO,
+    tables: Iterator[Tuple[str, Iterable[Dict[str, Any]]]],
+    sections: Dict[str, _Section],
+    changed_line: str,
+) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for table_name, entries in tables:
+        section = _resolve_section(sections, table_name, changed_line)
+        if section:
+            counts[table_name] = counts.get(table_name, 0) + _write_section(f, section, entries)
+        else:
+            counts[table_name] = counts.get(table_name, 0) + sum(1 for _ in entries)
+    return counts
+
+
+class _SectionSpool:
+    """
+    流式输入的报告正文：各数据表的条目按到达顺序写入匿名临时文件，只记录条目数与位置
+
+    报告开头的数据摘要与各标题中的条目数要等全部数据表写完才知道；写完后再按固定顺序
+    连同标题复制回报告，结果与完整解析结果的报告一致 (同名数据表以最后一个为准)，
+    内存中不保留任何条目。临时文件在创建时即已删除，进程异常退出也不会留下明文。
+    """
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {}
+        self._spans: Dict[str, Tuple[_Section, int, int]] = {}
+        self._raw = tempfile.TemporaryFile("w+b")
+
+    def __enter__(self) -> "_SectionSpool":
+        return self
+
+    def __exit__(self, *exc_info):
+        self._raw.close()
+
+    def fill(
+        self,
+        tables: Iterator[Tuple[str, Iterable[Dict[str, Any]]]],
+        sections: Dict[str, _Section],
+        changed_line: str,
+    ):
+        text = io.TextIOWrapper(self._raw, encoding="utf-8", write_through=False)
+        try:
+            for table_name, entries in tables:
+                section = _resolve_section(sections, table_name, changed_line)
+                if section is None:
+                    self.counts[table_name] = sum(1 for _ in entries)
+                    continue
+                text.flush()
+                start = self._raw.tell()
+                self.counts[table_name] = _write_entries(text, section, entries)
+                text.flush()
+                self._spans[table_name] = (section, start, self._raw.tell())
+        finally:
+            text.detach()
+
+    def write_sections(self, f: TextIO):
+        for table_name in sorted(self._spans, key=_table_rank):
+            section, start, end = self._spans[table_name]
+            f.write(section.header.format(count=section.count_label.format(self.counts[table_name])))
+            f.flush()
+            self._raw.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = self._raw.read(min(remaining, WRITE_BUFFER_SIZE))
+                f.buffer.write(chunk)
+                remaining -= len(chunk)
+
+
+def _write_report_body(
+    f: TextIO,
+    tables: Iterator[Tuple[str, Iterable[Dict[str, Any]]]],
+    spool: Optional[_SectionSpool],
+    sections: Dict[str, _Section],
+    changed_line: str,
+) -> Dict[str, int]:
+    if spool is None:
+        return _write_tables(f, tables, sections, changed_line)
+    spool.write_sections(f)
+    return spool.counts
+
+
+def save_as_md(data: Tables, output_file: Path, banner: str) -> Dict[str, int]:
+    tables, table_count = _open_tables(data)
+    with contextlib.ExitStack() as stack:
+        spool = None
+        if table_count is None:
+            spool = stack.enter_context(_SectionSpool())
+            spool.fill(tables, MD_SECTIONS, MD_CHANGED_LINE)
+            table_count = len(spool.counts)
+        f = stack.enter_context(
+            open(output_file, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE)
+        )
+        if banner:
+            clean_banner = banner.strip()
+            lines = clean_banner.split('\n')
+            if lines:
+                lines[0] = "   " + lines[0]
+            modified_banner = "\n".join(lines)
+            f.write(f"```\n{modified_banner}\n```\n\n")
+            
+        f.write("# Unsealer 综合解密报告\n\n")
+        f.write(f"- **生成时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write(f"- **数据摘要**: 共找到 **{table_count}** 个数据类别。\n\n")
+        f.write(
+            "**[!] 安全警告：此文件包含您的密码、两步验证密钥、身份证号等极度敏感信息，请务必在安全的环境下查看，并妥善保管！**\n\n"
+        )
+        counts = _write_report_body(f, tables, spool, MD_SECTIONS, MD_CHANGED_LINE)
+        f.write(f"\n*报告由 Unsealer (最终设计版) 生成*")
+    return counts
+
+
+def save_as_txt(data: Tables, output_file: Path, banner: str) -> Dict[str, int]:
+    tables, table_count = _open_tables(data)
+    with contextlib.ExitStack() as stack:
+        spool = None
+        if table_count is None:
+            spool = stack.enter_context(_SectionSpool())
+            spool.fill(tables, TXT_SECTIONS, TXT_CHANGED_LINE)
+            table_count = len(spool.counts)
+        f = stack.enter_context(
+            open(output_file, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE)
+        )
+        if banner:
+            f.write(f"{banner}\n")
+        f.write("Unsealer 综合解密报告\n")
+        f.write("------------------------\n")
+        f.write(f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write(f"数据摘要: 共找到 {table_count} 个数据类别。\n\n")
+        f.write("!!!!!!!! 安全警告 !!!!!!!!\n此文件包含极度敏感信息，请妥善保管！\n\n")
+        counts = _write_report_body(f, tables, spool, TXT_SECTIONS, TXT_CHANGED_LINE)
+        f.write(f"\n\n--- 报告结束 ---\n*由 Unsealer (最终设计版) 生成*")
+    return counts
+
+
+# --- CSV 流式导出 --- #
+def _flatten_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    展平嵌套数据：字典展开为 "字段_子键" 列，列表以 "|" 连接
+    """
+    flat_entry = {}
+    for key, value in entry.items():
+        if isinstance(value, Mapping):
+            for sub_key, sub_value in value.items():
+                flat_entry[f"{key}_{sub_key}"] = sub_value
+        elif isinstance(value, (list, tuple)):
+            flat_entry[key] = "|".join(map(str, value))
+        else:
+            flat_entry[key] = value
+    return flat_entry
+
+
+def csv_headers(table_name: str) -> Optional[List[str]]:
+    """
+    根据 schema.json 推导已知数据表的 CSV 表头；未知数据表返回 None
+    """
+    from .decrypter import load_table_schema
+
+    schema = load_table_schema().get(table_name)
+    if schema is None:
+        return None
+    json_fields = set(schema.get("json_fields", []))
+    json_subkeys = schema.get("json_subkeys", {})
+    headers = []
+    for field in schema.get("useful_fields", []):
+        if field in json_fields and field in json_subkeys:
+            headers.extend(f"{field}_{sub_key}" for sub_key in json_subkeys[field])
+        else:
+            headers.append(field)
+    return sorted(headers)
+
+
+class _SpilledTable:
+    """
+    两遍模式：展平后的行先以 JSON Lines 写入临时文件，同时收集表头，结束时再写出 CSV
+
+    临时文件在第一次写入时才创建，退出 with 块时关闭 (无论导出是否成功)。
+    """
+
+    def __init__(self):
+        self.headers = set()
+        self.count = 0
+        self._spill = None
+
+    def __enter__(self) -> "_SpilledTable":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    def add(self, row: Dict[str, Any]):
+        if self._spill is None:
+            self._spill = tempfile.TemporaryFile("w+", encoding="utf-8")
+        self.headers.update(row)
+        self._spill.write(json.dumps(row, ensure_ascii=False))
+        self._spill.write("\n")
+        self.count += 1
+
+    def write_csv(self, file_path: Path):
+        with open(
+            file_path, "w", newline="", encoding="utf-8", buffering=WRITE_BUFFER_SIZE
+        ) as f:
+            writer = csv.DictWriter(f, fieldnames=sorted(self.headers))
+            writer.writeheader()
+            if self._spill is None:
+                return
+            self._spill.seek(0)
+            for line in self._spill:
+                writer.writerow(json.loads(line))
+
+
+def _write_csv_table(
+    file_path: Path, table_name: str, entries: Iterable[Dict[str, Any]]
+) -> int:
+    """
+    导出一个数据表，返回写入的条目数 (空表不生成文件)
+
+    已知数据表的表头由 schema 推导，逐行直接写入；未知数据表，或已知数据表中出现
+    schema 之外的键时，改用两遍模式 (已写出的行从输出文件读回临时文件)。
+    """
+    rows = map(_flatten_entry, entries)
+    first = next(rows, None)
+    if first is None:
+        return 0
+    rows = itertools.chain((first,), rows)
+
+    headers = csv_headers(table_name)
+    if headers is not None:
+        known = set(headers)
+        unexpected = None
+        with open(
+            file_path, "w", newline="", encoding="utf-8", buffering=WRITE_BUFFER_SIZE
+        ) as f:
+            writer = csv.DictWriter(f, fieldnames=headers)
+            writer.writeheader()
+            written = 0
+            for row in rows:
+                if not known.issuperset(row):
+                    unexpected = row
+                    break
+                writer.writerow(row)
+                written += 1
+        if unexpected is None:
+            return written
+
+    with _SpilledTable() as spilled:
+        if headers is not None:
+            with open(file_path, "r", newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    spilled.add(row)
+            spilled.add(unexpected)
+        for row in rows:
+            spilled.add(row)
+        spilled.write_csv(file_path)
+        return spilled.count
+
+
+def save_as_csv(data: Tables, output_path: Path) -> Dict[str, int]:
+    """
+    将每个数据类别保存为独立的CSV文件，并对嵌套数据进行展平处理
+    """
+    output_path.mkdir(exist_ok=True)
+
+    tables = data.items() if isinstance(data, Mapping) else data
+    counts: Dict[str, int] = {}
+    for table_name, entries in tables:
+        file_path = output_path / f"{table_name}.csv"
+        if written := _write_csv_table(file_path, table_name, entries):
+            counts[table_name] = written
+    return counts
+
+
+def save_as_sqlite(data: Tables, output_path: Path) -> Dict[str, int]:
+    """
+    将每个数据类别写入 SQLite 数据库中的同名数据表 (JSON 字段展开为独立的列)
+    """
+    # sqlite3 仅在导出数据库时加载
+    from ..sqlite_export import export_tables
+
+    tables, _ = _open_tables(data)
+    return export_tables(
+        output_path,
+        ((table_name, map(_flatten_entry, entries)) for table_name, entries in tables),
+        csv_headers,
+    )
+
+
+def save_as_ndjson(data: Tables, output_path: Path) -> Dict[str, int]:
+    """
+    每个条目输出一行 JSON (输出路径为 "-" 时写入标准输出)
+    """
+    from ..ndjson_export import open_ndjson
+
+    tables, _ = _open_tables(data)
+    counts: Dict[str, int] = {}
+    with open_ndjson(output_path) as writer:
+        for table_name, entries in tables:
+            before = writer.count
+            for entry in entries:
+                writer.write(table_name, entry)
+            counts[table_name] = counts.get(table_name, 0) + writer.count - before
+    return counts
+
+
+def _remove_path(path: Path):
+    # 只用于删除本次导出创建的临时文件或临时目录，不会作用于用户指定的输出路径
+    if path.is_dir():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        path.unlink(missing_ok=True)
+
+
+@contextlib.contextmanager
+def _atomic_output(output_path: Path, fmt: str) -> Iterator[Path]:
+    """
+    先写入目标旁边的临时文件 (CSV 为临时目录)，成功后再替换目标
+
+    流式导出时解密错误 (密码错误、文件截断) 可能在写入途中才出现，失败时删除临时输出，
+    既不会留下不完整的明文报告，也不会破坏之前的导出结果。
+    CSV 的各数据表文件逐个移入目标目录，目录中的其他文件保持不变；单文件格式不会替换已有的目录。
+    SQLite 在单个事务中写入，失败时自动回滚，只需删除本次新建的数据库文件；标准输出无法撤回。
+    """
+    if is_stdout(output_path):
+        yield output_path
+        return
+    if fmt == "sqlite":
+        existed = output_path.exists()
+        try:
+            yield output_path
+        except BaseException:
+            if not existed:
+                output_path.unlink(missing_ok=True)
+            raise
+        return
+
+    if fmt == "csv":
+        if output_path.exists() and not output_path.is_dir():
+            raise ValueError(f"输出路径 '{output_path}' 已存在且不是目录。")
+    elif output_path.is_dir():
+        raise ValueError(f"输出路径 '{output_path}' 是已存在的目录，无法写入 {fmt.upper()} 文件。")
+    elif output_path.exists() and not output_path.is_file():
+        # 设备文件、命名管道等无法原子替换，直接写入
+        yield output_path
+        return
+
+    temp_path = output_path.with_name(f".{output_path.name}.{os.getpid()}.tmp")
+    _remove_path(temp_path)
+    try:
+        yield temp_path
+        if fmt == "csv":
+            output_path.mkdir(exist_ok=True)
+            for table_file in temp_path.iterdir():
+                os.replace(table_file, output_path / table_file.name)
+        else:
+            os.replace(temp_path, output_path)
+    finally:
+        _remove_path(temp_path)
+
+
+def save_tables(
+    data: Tables, output_path: Path, fmt: str, banner: str = "", require_data: bool = False
+) -> Dict[str, int]:
+    """
+    按输出格式分派到对应的导出函数，返回各数据表写入的条目数 (导出失败时不留下任何输出)
+
+    require_data 为 True 时没有写出任何条目视为失败 (流式导出时才知道数据是否为空)，不替换已有的输出。
+    """
+    with profiling.stage(f"export_{fmt}") as frame, _atomic_output(output_path, fmt) as target:
+        counts = _dispatch_export(data, target, fmt, banner)
+        frame.rows = sum(counts.values())
+        if require_data and not counts:
+            raise ValueError("解密成功，但在文件中未找到任何有价值的数据。")
+    return counts
+
+
+def _dispatch_export(data: Tables, output_path: Path, fmt: str, banner: str) -> Dict[str, int]:
+    if fmt == "md":
+        return save_as_md(data, output_path, banner)
+    elif fmt == "txt":
+        return save_as_txt(data, output_path, banner)
+    elif fmt == "csv":
+        return save_as_csv(data, output_path)
+    elif fmt == "sqlite":
+        return save_as_sqlite(data, output_path)
+    elif fmt == "ndjson":
+        return save_as_ndjson(data, output_path)
+    else:
+        raise ValueError(f"不支持的输出格式: {fmt}")
+
+
+def save_tables_multi(
+    data: Mapping[str, List[Dict[str, Any]]],
+    targets: Mapping[str, Path],
+    banner: str = "",
+    max_workers: Optional[int] = None,
+) -> Dict[str, Dict[str, int]]:
+    """
+    将同一份解析结果同时导出为多种格式 ({格式: 输出路径})，返回 {格式: 各表条目数}
+
+    各导出函数只读取共享的解析结果、写入各自的目标，因此可以在线程池中并发执行；
+    SQLite 写入与文件 I/O 期间会释放 GIL。任一格式失败时，其余格式仍会写完，随后抛出首个错误。
+    """
+    if len(targets) <= 1:
+        return {fmt: save_tables(data, output, fmt, banner) for fmt, output in targets.items()}
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    results: Dict[str, Dict[str, int]] = {}
+    errors: List[BaseException] = []
+    with ThreadPoolExecutor(max_workers=max_workers or len(targets)) as executor:
+        futures = {
+            fmt: executor.submit(save_tables, data, output, fmt, banner)
+            for fmt, output in targets.items()
+        }
+        for fmt, future in futures.items():
+            try:
+                results[fmt] = future.result()
+            except Exception as e:
+                errors.append(e)
+    if errors:
+        raise errors[0]
+    return results
+
+
+def _sanitize_filename(name: str) -> str:
+    """
+    移除或替换在文件名/目录名中非法的字符
+    """
+    return re.sub(r'[\\/*?:"<>|]', "_", name)
+
+
+def default_output_path(
+    input_file: Path, fmt: str, output_dir: Optional[Path] = None
+) -> Path:
+    """
+    根据输入文件推导默认的输出路径 (CSV 为目录，其余格式为单个文件)
+    """
+    if fmt == "csv":
+        name = f"{_sanitize_filename(input_file.stem)}_csv_export"
+        return output_dir / name if output_dir else Path(name)
+    if output_dir:
+        return output_dir / f"{_sanitize_filename(input_file.stem)}.{fmt}"
+    return input_file.with_suffix(f".{fmt}")
+
+
+def describe_output_conflict(output_path: Path, fmt: str, force: bool = False) -> Optional[str]:
+    """
+    检查输出目标是否会覆盖已有数据，返回错误描述；无冲突时返回 None
+
+    force 只允许覆盖已有的文件 (CSV 为目录中的同名数据表文件)；
+    单文件格式的目标是已存在的目录、CSV 的目标是已存在的文件时始终视为冲突。
+    """
+    if not output_path.exists():
+        return None
+    if fmt == "csv":
+        if not output_path.is_dir():
+            return f"输出路径 '{output_path}' 已存在且不是目录。"
+        if not force and any(output_path.iterdir()):
+            return f"输出目录 '{output_path}' 已存在且非空。"
+    elif output_path.is_dir():
+        return f"输出路径 '{output_path}' 是已存在的目录，请指定输出文件的路径。"
+    elif not force and output_path.is_file():
+        return f"输出文件 '{output_path}' 已存在。"
+    return None
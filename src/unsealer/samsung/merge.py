@@ -0,0 +1,134 @@
+# src/unsealer/samsung/merge.py
+
+import itertools
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .decrypter import load_table_schema, stream_tables
+from .diff import TableIndex, content_hash, identity_key, load_index
+
+# newest: 同一身份只保留最新备份中的版本；keep-all: 保留所有内容不同的版本 (完全相同的副本只保留一份)
+MERGE_POLICIES = ("newest", "keep-all")
+
+
+class VaultMerger:
+    """
+    将多个备份的条目按 身份键 -> (来源排名, {内容哈希: 条目}) 合并，每个条目只处理一次
+
+    排名越大表示备份越新。newest 策略下较新的备份出现同一身份时整体替换旧版本，
+    同一备份中身份相同但内容不同的条目都会保留；内存占用只与去重后的条目数有关。
+    """
+
+    def __init__(self, policy: str = "newest"):
+        if policy not in MERGE_POLICIES:
+            raise ValueError(f"不支持的合并策略: {policy} (可选: {', '.join(MERGE_POLICIES)})")
+        self.policy = policy
+        self.input_counts: Dict[str, int] = {}
+        self._schema = load_table_schema()
+        self._tables: Dict[str, Dict[Tuple[Any, ...], List[Any]]] = {}
+
+    def add(self, table: str, key: Tuple[Any, ...], digest: bytes, entry: Dict[str, Any], rank: int):
+        self.input_counts[table] = self.input_counts.get(table, 0) + 1
+        slots = self._tables.setdefault(table, {})
+        slot = slots.get(key)
+        if slot is None:
+            slots[key] = [rank, {digest: entry}]
+            return
+        if self.policy == "newest":
+            if rank < slot[0]:
+                return
+            if rank > slot[0]:
+                slot[0], slot[1] = rank, {digest: entry}
+                return
+        slot[1].setdefault(digest, entry)
+
+    def add_entries(self, table: str, entries: Iterable[Dict[str, Any]], rank: int):
+        identity_fields = self._schema.get(table, {}).get("identity_fields", [])
+        for entry in entries:
+            digest = content_hash(entry)
+            self.add(table, identity_key(entry, identity_fields, digest), digest, entry, rank)
+
+    def add_index(self, indexes: Dict[str, TableIndex], rank: int):
+        """
+        合并工作进程中由 load_index 建立的单个备份索引
+        """
+        for table, index in indexes.items():
+            for key, items in index.items():
+                for digest, entry in items:
+                    self.add(table, key, digest, entry, rank)
+
+    def tables(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        合并结果：各数据表中的条目按身份首次出现的顺序排列
+        """
+        return {
+            table: [entry for _, variants in slots.values() for entry in variants.values()]
+            for table, slots in self._tables.items()
+        }
+
+
+def _newest_ranks(files: Sequence[Path]) -> List[int]:
+    """
+    按文件修改时间排名 (越新排名越大)，时间相同时命令行中靠后的文件较新
+    """
+    order = sorted(range(len(files)), key=lambda i: (os.stat(files[i]).st_mtime, i))
+    ranks = [0] * len(files)
+    for rank, i in enumerate(order):
+        ranks[i] = rank
+    return ranks
+
+
+def merge_files(
+    files: Sequence[Path],
+    passwords: Sequence[str],
+    policy: str = "newest",
+    max_workers: Optional[int] = None,
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> VaultMerger:
+    """
+    解密并合并多个备份；on_progress 在每个备份合并完成后收到已完成的文件数
+
+    并行时各工作进程解密、解析并建立单个备份的索引，主进程按完成顺序合并
+    (来源排名决定新旧，与完成顺序无关)；只有一个工作进程时边解密边合并，不保留整份解析结果。
+    未知数据表按表头命名 (见 unknown_table_key)，只有表头相同的未知表才会合并。
+    """
+    merger = VaultMerger(policy)
+    ranks = _newest_ranks(files)
+    workers = min(max_workers or os.cpu_count() or 1, len(files))
+    if workers <= 1:
+        for done, (input_file, password, rank) in enumerate(zip(files, passwords, ranks), 1):
+            try:
+                with open(input_file, "rb") as f:
+                    for table, entries in stream_tables(
+                        f, password, fingerprint_unknown=True
+                    ):
+                        merger.add_entries(table, entries, rank)
+            except ValueError as e:
+                raise ValueError(f"{Path(input_file).name}: {e}")
+            if on_progress is not None:
+                on_progress(done)
+        return merger
+
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    # 同时在途的任务不超过工作进程数，合并后立即释放 future 及其持有的单个备份索引，
+    # 因此内存占用为去重后的条目加上最多 workers 份单个备份的索引，与输入总量无关
+    jobs = iter(zip(files, passwords, ranks))
+    completed = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: Dict[Any, int] = {}
+        while True:
+            for input_file, password, rank in itertools.islice(jobs, workers - len(pending)):
+                pending[executor.submit(load_index, str(input_file), password)] = rank
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                rank = pending.pop(future)
+                merger.add_index(future.result(), rank)
+                completed += 1
+                if on_progress is not None:
+                    on_progress(completed)
+            del done, future
+    return merger
@@ -0,0 +1,142 @@
+# src/unsealer/samsung/query.py
+
+import functools
+import re
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+from urllib.parse import urlsplit
+
+from .decrypter import clean_android_url
+
+# 各数据表中用于标题检索的字段 (与导出报告中的条目标题一致)
+TITLE_FIELDS = {
+    "logins": "title",
+    "identities": "name",
+    "addresses": "full_name",
+    "notes": "note_title",
+}
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def normalize_domain(url: str) -> str:
+    """
+    将网址或应用标识规范化为小写主机名 (去除协议、端口、路径与 www. 前缀)
+
+    android://<签名>@<包名> 按 clean_android_url 的规则取出包名，并按域名顺序反转
+    (com.example.app -> app.example.com)，使其可以按 example.com 检索。
+    """
+    url = clean_android_url(url.strip())
+    if url.startswith("android://"):
+        package = url.split("@")[-1].split("/")[0].casefold()
+        return ".".join(reversed(package.split(".")))
+    host = urlsplit(url).hostname if "://" in url else url.split("/")[0].split(":")[0]
+    host = (host or "").casefold().strip(".")
+    return host[4:] if host.startswith("www.") else host
+
+
+@functools.lru_cache(maxsize=4096)
+def domain_keys(url: str) -> Tuple[str, ...]:
+    """
+    主机名的各级后缀 (至少两级)：accounts.example.com -> (accounts.example.com, example.com)
+
+    同一网站常对应多个账户，结果按网址缓存。
+    """
+    labels = normalize_domain(url).split(".")
+    if len(labels) == 1:
+        return (labels[0],) if labels[0] else ()
+    return tuple(".".join(labels[i:]) for i in range(len(labels) - 1))
+
+
+def title_tokens(text: str) -> Set[str]:
+    return set(_TOKEN_RE.findall(text.casefold()))
+
+
+class VaultIndex:
+    """
+    一次解密后建立的内存倒排索引：域名、用户名、标题词与是否含有两步验证密钥
+
+    每个条目分配一个递增编号，各索引保存编号集合；查询时从最小的集合开始求交集，
+    结果按条目在备份中的顺序返回。建立索引只读取被索引的字段，可直接使用延迟解码的条目。
+    """
+
+    def __init__(self, tables: Mapping[str, Iterable[Mapping[str, Any]]]):
+        self.entries: List[Tuple[str, Mapping[str, Any]]] = []
+        self.by_table: Dict[str, Set[int]] = {}
+        self.by_domain: Dict[str, Set[int]] = {}
+        self.by_username: Dict[str, Set[int]] = {}
+        self.by_title: Dict[str, Set[int]] = {}
+        self.with_otp: Set[int] = set()
+        for table, entries in tables.items():
+            title_field = TITLE_FIELDS.get(table)
+            table_ids = self.by_table.setdefault(table, set())
+            for entry in entries:
+                entry_id = len(self.entries)
+                self.entries.append((table, entry))
+                table_ids.add(entry_id)
+                if url := entry.get("origin_url"):
+                    for key in domain_keys(url):
+                        self.by_domain.setdefault(key, set()).add(entry_id)
+                if username := entry.get("username_value"):
+                    self.by_username.setdefault(username.casefold(), set()).add(entry_id)
+                if title_field and (title := entry.get(title_field)):
+                    for token in title_tokens(title):
+                        self.by_title.setdefault(token, set()).add(entry_id)
+                if isinstance(otp := entry.get("otp"), Mapping) and otp.get("secret"):
+                    self.with_otp.add(entry_id)
+
+    def search(
+        self,
+        domain: Optional[str] = None,
+        username: Optional[str] = None,
+        title: Optional[str] = None,
+        otp: Optional[bool] = None,
+        table: Optional[str] = None,
+    ) -> List[Tuple[str, Mapping[str, Any]]]:
+        """
+        按条件检索 (各条件之间为"与")，返回 [(表名, 条目)]
+
+        domain 同时匹配其子域名；username 不区分大小写；title 中的每个词都必须出现在标题中；
+        otp 为 True / False 时只返回含有 / 不含两步验证密钥的条目。
+        """
+        empty: Set[int] = set()
+        candidates: List[Set[int]] = []
+        if domain is not None:
+            candidates.append(self.by_domain.get(normalize_domain(domain), empty))
+        if username is not None:
+            candidates.append(self.by_username.get(username.casefold(), empty))
+        if title is not None:
+            candidates.extend(self.by_title.get(token, empty) for token in title_tokens(title))
+        if otp:
+            candidates.append(self.with_otp)
+        if table is not None:
+            candidates.append(self.by_table.get(table, empty))
+
+        if not candidates and otp is None:
+            return list(self.entries)
+        if candidates:
+            candidates.sort(key=len)
+            ids = set(candidates[0])
+            for other in candidates[1:]:
+                ids &= other
+        else:
+            ids = set(range(len(self.entries)))
+        if otp is False:
+            ids -= self.with_otp
+        return [self.entries[entry_id] for entry_id in sorted(ids)]
+
+
+def select_fields(entry: Mapping[str, Any], fields: Optional[Sequence[str]]) -> Dict[str, Any]:
+    """
+    只保留指定的字段 (未指定时保留全部字段)；嵌套字段可写作 otp.secret
+    """
+    if not fields:
+        return dict(entry)
+    selected: Dict[str, Any] = {}
+    for field in fields:
+        key, _, sub_key = field.partition(".")
+        value = entry.get(key)
+        if sub_key and isinstance(value, Mapping):
+            value = value.get(sub_key)
+        if value is not None:
+            selected[field] = value
+    return selected
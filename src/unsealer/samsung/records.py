@@ -0,0 +1,180 @@
+# src/unsealer/samsung/records.py
+
+import functools
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Type
+
+# 长度不超过该值的字符串在同一次解析中共享同一个对象 (重复的网址、用户名等)
+INTERN_MAX_LENGTH = 64
+
+
+class CompactRecord(Mapping):
+    """
+    紧凑的只读条目：每个字段占用一个 __slots__ 槽位，未设置的槽位表示该字段为空
+
+    与 dict 相比省去了每行的哈希表开销；实现了 Mapping 接口，
+    导出函数中的 entry.get()、items() 与遍历键的写法无需修改。
+    """
+
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()
+    _slot_of: Dict[str, str] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, self._slot_of[key])
+        except (KeyError, AttributeError):
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        slot = self._slot_of.get(key)
+        return default if slot is None else getattr(self, slot, default)
+
+    def __contains__(self, key: object) -> bool:
+        slot = self._slot_of.get(key)  # type: ignore[arg-type]
+        return slot is not None and hasattr(self, slot)
+
+    def __iter__(self) -> Iterator[str]:
+        for field, slot in self._slot_of.items():
+            if hasattr(self, slot):
+                yield field
+
+    def __len__(self) -> int:
+        return sum(1 for slot in self._slot_of.values() if hasattr(self, slot))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({to_plain(self)!r})"
+
+    def __reduce__(self):
+        # 动态生成的类无法按名称导入，以 (字段, 值) 重建
+        return _restore_record, (self._fields, tuple(self.items()))
+
+
+@functools.lru_cache(maxsize=None)
+def record_class(fields: Tuple[str, ...]) -> Type[CompactRecord]:
+    """
+    为一组字段生成 (并缓存) 对应的记录类；字段名可以是任意字符串
+    """
+    slot_of = {field: f"f{i}" for i, field in enumerate(dict.fromkeys(fields))}
+    return type(
+        "CompactRecord",
+        (CompactRecord,),
+        {"__slots__": tuple(slot_of.values()), "_fields": tuple(slot_of), "_slot_of": slot_of},
+    )
+
+
+def make_record(cls: Type[CompactRecord], values: Mapping) -> CompactRecord:
+    record = cls.__new__(cls)
+    slot_of = cls._slot_of
+    for key, value in values.items():
+        setattr(record, slot_of[key], value)
+    return record
+
+
+def _restore_record(fields: Tuple[str, ...], items: Tuple[Tuple[str, Any], ...]) -> CompactRecord:
+    return make_record(record_class(fields), dict(items))
+
+
+class LazyEntry(Mapping):
+    """
+    延迟解码的只读条目：保留原始的 Base64 字段，首次访问某个字段时才解码并缓存结果
+
+    只访问少数字段 (或只遍历键) 时无需为整行做 Base64 / JSON / 多值解码。
+    键集合只反映原始值是否非空 (判断时不做解码)：原始值非空但 Base64 解码后为空的字段
+    在这里仍然是一个键 (取值为空字符串)，而完整解析会省略该字段 (所有字段都如此时省略整行)。
+    因此键集合可能是完整解析结果的超集，需要精确一致时请使用 to_plain 后过滤空值或改用完整解析。
+    """
+
+    __slots__ = ("_raw", "_decoders", "_decoded")
+
+    def __init__(self, raw: Dict[str, str], decoders: Dict[str, Callable[[str], Any]]):
+        self._raw = raw
+        self._decoders = decoders
+        self._decoded: Optional[Dict[str, Any]] = None
+
+    def __getitem__(self, key: str) -> Any:
+        decoded = self._decoded
+        if decoded is None:
+            decoded = self._decoded = {}
+        elif key in decoded:
+            return decoded[key]
+        value = decoded[key] = self._decoders[key](self._raw[key])
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        # 绕过 Mapping.get 的 try/except，缺失字段 (空值) 较多时明显更快
+        return self[key] if key in self._raw else default
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._raw
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._raw)
+
+    def __len__(self) -> int:
+        return len(self._raw)
+
+    def __repr__(self) -> str:
+        return f"LazyEntry({dict(self)!r})"
+
+
+def to_plain(value: Any) -> Any:
+    """
+    将紧凑记录、延迟解码条目 (以及其中的元组) 还原为 dict / list，用于 json、marshal 等只接受内置类型的场合
+    """
+    if isinstance(value, (CompactRecord, LazyEntry)):
+        return {key: to_plain(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [to_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: to_plain(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [to_plain(item) for item in value]
+    return value
+
+
+class RecordCompactor:
+    """
+    将 _iter_rows 产出的 dict 条目转换为 CompactRecord
+
+    - 字符串值在同一次解析中去重共享
+    - 多值字段的列表转换为元组
+    - schema.json 中 json_subkeys 声明的嵌套对象 (otp、id_card_detail) 也转换为紧凑记录
+    """
+
+    def __init__(self):
+        self._pool: Dict[str, str] = {}
+
+    def _intern(self, value: Any) -> Any:
+        if isinstance(value, str) and len(value) <= INTERN_MAX_LENGTH:
+            return self._pool.setdefault(value, value)
+        return value
+
+    def compact_rows(
+        self,
+        rows: Iterator[Dict[str, Any]],
+        fields: Sequence[str],
+        json_subkeys: Optional[Dict[str, List[str]]] = None,
+    ) -> Iterator[CompactRecord]:
+        cls = record_class(tuple(fields))
+        nested = {
+            field: record_class(tuple(subkeys)) for field, subkeys in (json_subkeys or {}).items()
+        }
+        intern = self._intern
+        pool_get = self._pool.setdefault
+        slot_of = cls._slot_of
+        new = cls.__new__
+        for entry in rows:
+            record = new(cls)
+            for key, value in entry.items():
+                if type(value) is str:
+                    if len(value) <= INTERN_MAX_LENGTH:
+                        value = pool_get(value, value)
+                elif isinstance(value, list):
+                    value = tuple(map(intern, value))
+                elif isinstance(value, dict) and key in nested:
+                    sub_cls = nested[key]
+                    if value.keys() <= sub_cls._slot_of.keys():
+                        value = make_record(sub_cls, {k: intern(v) for k, v in value.items()})
+                setattr(record, slot_of[key], value)
+            yield record
@@ -0,0 +1,136 @@
+# src/unsealer/sqlite_export.py
+
+import itertools
+import json
+import sqlite3
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, List, Any, Callable, Iterable, Optional, Sequence, Set, Tuple, Union
+
+# 每批 executemany 插入的行数
+INSERT_BATCH_SIZE = 1000
+
+# 数据载入完成后为这些列 (若存在) 建立索引
+INDEXED_COLUMNS = ("origin_url", "username_value", "title", "issuer", "name")
+
+Row = Dict[str, Any]
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _sql_value(value: Any) -> Any:
+    """
+    将条目中的值转换为 SQLite 可存储的类型；嵌套结构以 JSON 文本保存
+    """
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    if isinstance(value, (Mapping, list, tuple)):
+        # 紧凑记录等非 dict 的 Mapping 通过 default 转换为 dict
+        return json.dumps(value, ensure_ascii=False, sort_keys=True, default=dict)
+    return str(value)
+
+
+def _insert_sql(table: str, columns: List[str]) -> str:
+    return (
+        f"INSERT INTO {_quote(table)} ({', '.join(map(_quote, columns))}) "
+        f"VALUES ({', '.join('?' * len(columns))})"
+    )
+
+
+def _column_name(key: str, taken: Set[str]) -> str:
+    """
+    为条目的键选择列名：SQLite 列名不区分大小写，与已有列仅大小写不同的键 (例如 Name 与 name)
+    加上数字后缀 (name_2)，以免两个字段写入同一列
+    """
+    name = key
+    suffix = 1
+    while name.lower() in taken:
+        suffix += 1
+        name = f"{key}_{suffix}"
+    taken.add(name.lower())
+    return name
+
+
+def write_table(
+    conn: sqlite3.Connection,
+    table: str,
+    rows: Iterable[Row],
+    columns: Sequence[str] = (),
+) -> int:
+    """
+    删除并重建一张数据表，分批插入全部行，最后建立索引；返回插入的行数
+
+    columns 为预先已知的列 (例如由 schema 推导)；行中出现的其他键会以
+    ALTER TABLE 追加为新列，因此无需预先遍历全部数据。
+    仅大小写不同的键写入带数字后缀的列 (见 _column_name)。
+    """
+    conn.execute(f"DROP TABLE IF EXISTS {_quote(table)}")
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return 0
+
+    # 条目的键 -> 列名；taken 为已使用的列名 (小写)
+    column_of: Dict[str, str] = {}
+    taken: Set[str] = set()
+    for key in itertools.chain(columns, first):
+        if key not in column_of:
+            column_of[key] = _column_name(key, taken)
+    keys = list(column_of)
+    conn.execute(f"CREATE TABLE {_quote(table)} ({', '.join(map(_quote, column_of.values()))})")
+
+    insert_sql = _insert_sql(table, list(column_of.values()))
+    batch: List[Tuple[Any, ...]] = []
+    count = 0
+    for row in itertools.chain((first,), rows):
+        new_keys = [key for key in row if key not in column_of]
+        if new_keys:
+            if batch:
+                conn.executemany(insert_sql, batch)
+                batch.clear()
+            for key in new_keys:
+                column = column_of[key] = _column_name(key, taken)
+                conn.execute(f"ALTER TABLE {_quote(table)} ADD COLUMN {_quote(column)}")
+                keys.append(key)
+            insert_sql = _insert_sql(table, list(column_of.values()))
+
+        batch.append(tuple(_sql_value(row.get(key)) for key in keys))
+        count += 1
+        if len(batch) >= INSERT_BATCH_SIZE:
+            conn.executemany(insert_sql, batch)
+            batch.clear()
+    if batch:
+        conn.executemany(insert_sql, batch)
+
+    # 载入完成后再建索引，避免逐行维护索引的开销
+    for column in INDEXED_COLUMNS:
+        if column in taken:
+            conn.execute(
+                f"CREATE INDEX {_quote(f'idx_{table}_{column}')} ON {_quote(table)} ({_quote(column)})"
+            )
+    return count
+
+
+def export_tables(
+    db_path: Union[str, Path],
+    tables: Iterable[Tuple[str, Iterable[Row]]],
+    columns_for: Optional[Callable[[str], Optional[Sequence[str]]]] = None,
+) -> Dict[str, int]:
+    """
+    在一个事务中将多张数据表写入 SQLite 数据库，返回各表插入的行数
+
+    只重建本次写入的数据表，数据库中的其他表 (例如另一个命令导出的数据) 保持不变。
+    """
+    counts: Dict[str, int] = {}
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            for table, rows in tables:
+                columns = (columns_for(table) if columns_for else None) or ()
+                if written := write_table(conn, table, rows, columns):
+                    counts[table] = written
+    finally:
+        conn.close()
+    return counts
@@ -0,0 +1,29 @@
+# src/unsealer/utils.py
+
+import os
+import sys
+from pathlib import Path
+
+# 可通过环境变量覆盖缓存目录
+CACHE_DIR_ENV = "UNSEALER_CACHE_DIR"
+# 设置为 "1" 时默认启用本地缓存 (仍可用 --no-cache 关闭)
+CACHE_ENV = "UNSEALER_CACHE"
+
+
+def cache_enabled_by_default() -> bool:
+    return os.environ.get(CACHE_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def get_cache_dir() -> Path:
+    """
+    返回 unsealer 的本地缓存目录 (遵循各平台的惯例位置)
+    """
+    if override := os.environ.get(CACHE_DIR_ENV):
+        return Path(override).expanduser()
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "unsealer"
@@ -0,0 +1,41 @@
+# tests/conftest.py
+
+import sys
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+# 测试直接使用源码树与 benchmarks 中的合成数据生成器，无需先安装
+for path in (ROOT / "src", ROOT / "benchmarks"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from spass_generator import build_plaintext, encrypt_spass  # noqa: E402
+
+PASSWORD = "correct horse"
+SMALL_ROWS = {"logins": 6, "identities": 2, "addresses": 2, "notes": 2}
+
+
+@pytest.fixture
+def make_spass(tmp_path: Path) -> Callable[..., Path]:
+    """
+    生成合成备份文件：make_spass(name, rows=..., unknown_tables=..., seed=..., plaintext=...)
+    """
+
+    def make(
+        name: str = "vault.spass",
+        rows: Optional[Dict[str, int]] = None,
+        unknown_tables: int = 1,
+        seed: int = 7,
+        plaintext: Optional[str] = None,
+        password: str = PASSWORD,
+    ) -> Path:
+        if plaintext is None:
+            plaintext = build_plaintext(SMALL_ROWS if rows is None else rows, unknown_tables, seed)
+        path = tmp_path / name
+        path.write_bytes(encrypt_spass(plaintext, password))
+        return path
+
+    return make
@@ -0,0 +1,61 @@
+# tests/test_batch_summary.py
+
+import json
+import sys
+
+import pytest
+
+from conftest import PASSWORD
+from unsealer.samsung import cli
+from unsealer.samsung.batch import write_summary
+
+RESULTS = [{"input": "a.spass", "ok": True, "tables": {"logins": 1}, "output": "a.md", "error": None}]
+
+
+def test_existing_summary_is_not_overwritten_without_force(tmp_path):
+    summary_path = tmp_path / "summary.json"
+    summary_path.write_text("previous", encoding="utf-8")
+    with pytest.raises(ValueError, match="--force"):
+        write_summary(RESULTS, summary_path)
+    assert summary_path.read_text(encoding="utf-8") == "previous"
+
+    write_summary(RESULTS, summary_path, force=True)
+    assert json.loads(summary_path.read_text(encoding="utf-8"))["succeeded"] == 1
+
+
+def test_directory_is_never_replaced_by_summary(tmp_path):
+    summary_path = tmp_path / "summary.json"
+    summary_path.mkdir()
+    with pytest.raises(ValueError):
+        write_summary(RESULTS, summary_path, force=True)
+    assert summary_path.is_dir()
+
+
+def _run_batch(monkeypatch, tmp_path, *extra):
+    password_file = tmp_path / "passwords.json"
+    password_file.write_text(json.dumps({"a.spass": PASSWORD, "b.spass": PASSWORD}), encoding="utf-8")
+    out = tmp_path / "out"
+    argv = ["unsealer", "samsung", str(tmp_path / "a.spass"), str(tmp_path / "b.spass"),
+            "-o", str(out), "--password-file", str(password_file), "-j", "1", *extra]
+    monkeypatch.setattr(sys, "argv", argv)
+    cli.main()
+    return out
+
+
+def test_batch_refuses_existing_summary_before_processing(make_spass, tmp_path, monkeypatch):
+    make_spass("a.spass")
+    make_spass("b.spass")
+    out = tmp_path / "out"
+    out.mkdir()
+    summary_path = out / "unsealer_batch_summary.json"
+    summary_path.write_text("previous", encoding="utf-8")
+
+    with pytest.raises(SystemExit) as exc:
+        _run_batch(monkeypatch, tmp_path)
+    assert exc.value.code == 1
+    assert summary_path.read_text(encoding="utf-8") == "previous"
+    assert not (out / "a.md").exists()
+
+    _run_batch(monkeypatch, tmp_path, "-y")
+    assert json.loads(summary_path.read_text(encoding="utf-8"))["succeeded"] == 2
+    assert (out / "a.md").exists()
@@ -0,0 +1,90 @@
+# tests/test_cache.py
+
+import os
+
+import pytest
+
+from conftest import PASSWORD
+from unsealer.samsung.cache import VaultCache, decrypt_with_cache, file_digest
+from unsealer.samsung.decrypter import decrypt_and_parse_stream
+from unsealer.samsung.records import to_plain
+
+
+@pytest.fixture
+def cache(tmp_path) -> VaultCache:
+    return VaultCache(tmp_path / "cache")
+
+
+def _fresh(path):
+    with open(path, "rb") as f:
+        return decrypt_and_parse_stream(f, PASSWORD)
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_hit_returns_same_tables_as_fresh_decrypt(make_spass, cache, compact):
+    vault = make_spass()
+    tables, hit = decrypt_with_cache(vault, PASSWORD, cache, compact=compact)
+    assert not hit
+    cached, hit = decrypt_with_cache(vault, PASSWORD, cache, compact=compact)
+    assert hit
+    assert to_plain(cached) == to_plain(tables) == _fresh(vault)
+    assert list(cached) == list(_fresh(vault))
+
+
+def test_wrong_password_on_cached_entry_is_a_miss(make_spass, cache):
+    vault = make_spass()
+    decrypt_with_cache(vault, PASSWORD, cache)
+    assert cache.get(file_digest(vault), "wrong password") is None
+    # 未命中后进行真正的解密，错误的密码照常报错
+    with pytest.raises(ValueError, match="解密失败"):
+        decrypt_with_cache(vault, "wrong password", cache)
+    assert cache.stats()[0] == 1
+
+
+@pytest.mark.parametrize("offset", [0, 4, 5], ids=["magic", "format-version", "marshal-version"])
+def test_mismatched_header_is_ignored(make_spass, cache, offset):
+    vault = make_spass()
+    decrypt_with_cache(vault, PASSWORD, cache)
+    digest = file_digest(vault)
+    entry = cache.cache_dir / f"{digest}.vault"
+    blob = bytearray(entry.read_bytes())
+    blob[offset] ^= 0xFF
+    entry.write_bytes(bytes(blob))
+
+    assert cache.get(digest, PASSWORD) is None
+    tables, hit = decrypt_with_cache(vault, PASSWORD, cache)
+    assert not hit
+    assert tables == _fresh(vault)
+    # 重新解密后写入了有效的条目
+    assert cache.get(digest, PASSWORD) == tables
+
+
+def test_truncated_entry_is_ignored(make_spass, cache):
+    vault = make_spass()
+    decrypt_with_cache(vault, PASSWORD, cache)
+    digest = file_digest(vault)
+    entry = cache.cache_dir / f"{digest}.vault"
+    entry.write_bytes(entry.read_bytes()[:-8])
+    assert cache.get(digest, PASSWORD) is None
+
+
+def test_least_recently_used_entries_are_evicted(make_spass, cache):
+    vaults = [make_spass(f"vault{i}.spass", seed=i) for i in range(3)]
+    for vault in vaults:
+        decrypt_with_cache(vault, PASSWORD, cache)
+    entries = [cache.cache_dir / f"{file_digest(vault)}.vault" for vault in vaults]
+    sizes = [entry.stat().st_size for entry in entries]
+    for age, entry in zip((3000, 1000, 2000), entries):
+        os.utime(entry, (age, age))
+
+    # 超出上限一个字节：只淘汰最久未使用的 vault1
+    cache.max_bytes = sum(sizes) - 1
+    assert cache.evict() == 1
+    assert [entry.exists() for entry in entries] == [True, False, True]
+
+    # 读取会刷新访问时间，之后写入新条目时淘汰的是未被读取的 vault2
+    assert cache.get(file_digest(vaults[0]), PASSWORD) is not None
+    os.utime(entries[2], (1000, 1000))
+    cache.max_bytes = sum(sizes) - 1
+    decrypt_with_cache(vaults[1], PASSWORD, cache)
+    assert [entry.exists() for entry in entries] == [True, True, False]
@@ -0,0 +1,172 @@
+# tests/test_diff_merge.py
+
+import base64
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pytest
+
+from spass_generator import EMPTY_FIELD, TABLE_COLUMNS, TABLE_SEPARATOR
+from unsealer.samsung.decrypter import unknown_table_key
+from unsealer.samsung.diff import diff_files, diff_to_tables
+from unsealer.samsung.merge import merge_files
+from unsealer.samsung.records import to_plain
+
+PASSWORD = "pw"
+Login = Tuple[str, str, str]
+
+
+def _table(columns: Sequence[str], rows: Sequence[Dict[str, str]]) -> str:
+    lines = [";".join(columns)]
+    for row in rows:
+        lines.append(";".join(
+            base64.b64encode(row[column].encode("utf-8")).decode("ascii") if column in row else EMPTY_FIELD
+            for column in columns
+        ))
+    return "\n".join(lines)
+
+
+def _plaintext(
+    logins: Sequence[Login], unknown: Sequence[Tuple[Sequence[str], Sequence[Dict[str, str]]]] = ()
+) -> str:
+    rows = [
+        {"_id": str(i), "origin_url": url, "username_value": user, "password_value": password}
+        for i, (url, user, password) in enumerate(logins)
+    ]
+    blocks = ["24\n1", _table(TABLE_COLUMNS["logins"], rows)]
+    blocks.extend(_table(columns, table_rows) for columns, table_rows in unknown)
+    return f"\n{TABLE_SEPARATOR}\n".join(blocks)
+
+
+@pytest.fixture
+def vault(make_spass):
+    def make(name: str, logins: Sequence[Login], unknown=(), mtime: Optional[int] = None) -> Path:
+        path = make_spass(name, plaintext=_plaintext(logins, unknown), password=PASSWORD)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    return make
+
+
+def _passwords(entries: List[Dict[str, str]]) -> List[Tuple[str, str, str]]:
+    return sorted(
+        (entry["origin_url"], entry["username_value"], entry["password_value"]) for entry in entries
+    )
+
+
+# --- diff ---
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_diff_reports_added_removed_and_modified(vault, max_workers):
+    old = vault("old.spass", [("https://a", "alice", "1"), ("https://b", "bob", "2"), ("https://c", "carol", "3")])
+    new = vault("new.spass", [("https://a", "alice", "9"), ("https://c", "carol", "3"), ("https://d", "dave", "4")])
+
+    diff = diff_files(old, new, PASSWORD, max_workers=max_workers)["logins"]
+    assert _passwords(diff.added) == [("https://d", "dave", "4")]
+    assert _passwords(diff.removed) == [("https://b", "bob", "2")]
+    assert [(_passwords([o]), _passwords([n])) for o, n in diff.modified] == [
+        ([("https://a", "alice", "1")], [("https://a", "alice", "9")])
+    ]
+    assert diff.unchanged == 1
+
+    tables = diff_to_tables({"logins": diff})
+    assert set(tables) == {"logins_added", "logins_removed", "logins_modified"}
+    modified = tables["logins_modified"][0]
+    assert modified["changed_fields"] == ["password_value"]
+    assert modified["previous"] == {"password_value": "1"}
+
+
+def test_identical_vaults_have_no_changes(vault):
+    logins = [("https://a", "alice", "1"), ("https://b", "bob", "2")]
+    old, new = vault("old.spass", logins), vault("new.spass", logins)
+    diff = diff_files(old, new, PASSWORD, max_workers=1)["logins"]
+    assert (diff.added, diff.removed, diff.modified, diff.unchanged) == ([], [], [], 2)
+    assert diff_to_tables({"logins": diff}) == {}
+
+
+def test_diff_never_pairs_unrelated_unknown_tables(vault):
+    # 两个备份中的第一个未知表 (都曾被命名为 unknown_data_1) 表头不同，不能互相比较
+    old = vault("old.spass", [("https://a", "alice", "1")], unknown=[(["x1", "x2", "x3"], [{"x1": "same"}])])
+    new = vault("new.spass", [("https://a", "alice", "1")], unknown=[(["y1", "y2", "y3"], [{"y1": "same"}])])
+
+    diffs = diff_files(old, new, PASSWORD, max_workers=1)
+    old_key, new_key = unknown_table_key(["x1", "x2", "x3"]), unknown_table_key(["y1", "y2", "y3"])
+    assert old_key != new_key
+    assert "unknown_data_1" not in diffs
+    assert to_plain(diffs[old_key].removed) == [{"x1": "same"}]
+    assert to_plain(diffs[new_key].added) == [{"y1": "same"}]
+
+
+def test_diff_matches_unknown_tables_with_same_headers(vault):
+    # 表头相同、位置不同的未知表仍然互相比较
+    columns = ["k1", "k2", "k3"]
+    old = vault("old.spass", [], unknown=[(columns, [{"k1": "a"}, {"k1": "b"}])])
+    new = vault(
+        "new.spass",
+        [],
+        unknown=[(["z1", "z2", "z3"], [{"z1": "other"}]), (list(reversed(columns)), [{"k1": "a"}, {"k1": "c"}])],
+    )
+
+    diff = diff_files(old, new, PASSWORD, max_workers=1)[unknown_table_key(columns)]
+    assert to_plain(diff.added) == [{"k1": "c"}]
+    assert to_plain(diff.removed) == [{"k1": "b"}]
+    assert diff.unchanged == 1
+
+
+# --- merge ---
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_merge_newest_keeps_latest_version_of_conflicts(vault, max_workers):
+    old = vault("old.spass", [("https://a", "alice", "old"), ("https://b", "bob", "2")], mtime=1000)
+    new = vault("new.spass", [("https://a", "alice", "new"), ("https://c", "carol", "3")], mtime=2000)
+
+    # 命令行中的顺序不影响新旧，以修改时间为准
+    merger = merge_files([new, old], [PASSWORD, PASSWORD], "newest", max_workers=max_workers)
+    assert _passwords(merger.tables()["logins"]) == [
+        ("https://a", "alice", "new"),
+        ("https://b", "bob", "2"),
+        ("https://c", "carol", "3"),
+    ]
+    assert merger.input_counts["logins"] == 4
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_merge_keep_all_keeps_every_distinct_version(vault, max_workers):
+    old = vault("old.spass", [("https://a", "alice", "old"), ("https://b", "bob", "2")], mtime=1000)
+    new = vault("new.spass", [("https://a", "alice", "new"), ("https://b", "bob", "2")], mtime=2000)
+
+    merger = merge_files([old, new], [PASSWORD, PASSWORD], "keep-all", max_workers=max_workers)
+    # 完全相同的副本只保留一份
+    assert _passwords(merger.tables()["logins"]) == [
+        ("https://a", "alice", "new"),
+        ("https://a", "alice", "old"),
+        ("https://b", "bob", "2"),
+    ]
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_merge_keeps_unrelated_unknown_tables_apart(vault, max_workers):
+    shared = ["s1", "s2", "s3"]
+    old = vault(
+        "old.spass",
+        [("https://a", "alice", "1")],
+        unknown=[(["x1", "x2", "x3"], [{"x1": "v"}]), (shared, [{"s1": "one"}])],
+        mtime=1000,
+    )
+    new = vault(
+        "new.spass",
+        [("https://a", "alice", "1")],
+        unknown=[(["y1", "y2", "y3"], [{"y1": "v"}]), (shared, [{"s1": "one"}, {"s1": "two"}])],
+        mtime=2000,
+    )
+
+    tables = merge_files([old, new], [PASSWORD, PASSWORD], max_workers=max_workers).tables()
+    assert not any(name.startswith("unknown_data_") for name in tables)
+    assert to_plain(tables[unknown_table_key(["x1", "x2", "x3"])]) == [{"x1": "v"}]
+    assert to_plain(tables[unknown_table_key(["y1", "y2", "y3"])]) == [{"y1": "v"}]
+    assert to_plain(tables[unknown_table_key(shared)]) == [{"s1": "one"}, {"s1": "two"}]
+    assert len(tables["logins"]) == 1
@@ -0,0 +1,102 @@
+# tests/test_exporters.py
+
+import re
+from pathlib import Path
+
+import pytest
+
+from conftest import PASSWORD
+from unsealer.samsung.decrypter import decrypt_and_parse, stream_tables
+from unsealer.samsung.exporters import describe_output_conflict, save_tables
+
+DATA_DIR = Path(__file__).parent / "data"
+BANNER = "Unsealer\nreport banner"
+
+
+def _normalized(path: Path) -> str:
+    return re.sub(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}", "<TIME>", path.read_text(encoding="utf-8"))
+
+
+# --- 报告内容与原版一致 ---
+# tests/data/baseline_report.* 由重构前的 save_as_md / save_as_txt 对同一份合成数据
+# (SMALL_ROWS, unknown_tables=1, seed=7) 生成，生成时间替换为 <TIME>
+
+
+@pytest.mark.parametrize("fmt", ["md", "txt"])
+def test_full_report_matches_baseline(make_spass, tmp_path, fmt):
+    tables = decrypt_and_parse(make_spass().read_bytes(), PASSWORD)
+    output = tmp_path / f"report.{fmt}"
+    save_tables(tables, output, fmt, BANNER)
+    assert _normalized(output) == (DATA_DIR / f"baseline_report.{fmt}").read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("fmt", ["md", "txt"])
+def test_streamed_report_matches_baseline(make_spass, tmp_path, fmt):
+    output = tmp_path / f"report.{fmt}"
+    with open(make_spass(), "rb") as f:
+        counts = save_tables(stream_tables(f, PASSWORD), output, fmt, BANNER, require_data=True)
+    assert counts == {"logins": 6, "identities": 2, "addresses": 2, "notes": 2, "unknown_data_1": 1}
+    assert _normalized(output) == (DATA_DIR / f"baseline_report.{fmt}").read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("fmt", ["md", "txt"])
+def test_streamed_report_uses_fixed_table_order(make_spass, tmp_path, fmt):
+    tables = decrypt_and_parse(make_spass().read_bytes(), PASSWORD)
+    streamed = [(name, iter(tables[name])) for name in reversed(list(tables))]
+    save_tables(tables, tmp_path / f"full.{fmt}", fmt, BANNER)
+    save_tables(iter(streamed), tmp_path / f"streamed.{fmt}", fmt, BANNER)
+    assert _normalized(tmp_path / f"streamed.{fmt}") == _normalized(tmp_path / f"full.{fmt}")
+
+
+# --- 输出目标冲突与失败时的清理 ---
+
+
+@pytest.mark.parametrize("fmt", ["md", "txt", "ndjson", "sqlite"])
+def test_existing_directory_is_a_conflict_for_file_formats(tmp_path, fmt):
+    (tmp_path / "keep.txt").write_text("keep")
+    assert describe_output_conflict(tmp_path, fmt) is not None
+    assert describe_output_conflict(tmp_path, fmt, force=True) is not None
+
+
+def test_file_export_never_replaces_a_directory(tmp_path):
+    target = tmp_path / "docs"
+    target.mkdir()
+    (target / "keep.txt").write_text("keep")
+    with pytest.raises(ValueError):
+        save_tables({"notes": [{"note_title": "t", "note_detail": "d"}]}, target, "md")
+    assert (target / "keep.txt").read_text() == "keep"
+    assert [p.name for p in tmp_path.iterdir()] == ["docs"]
+
+
+def test_csv_export_keeps_unrelated_files(tmp_path):
+    target = tmp_path / "export"
+    target.mkdir()
+    (target / "keep.txt").write_text("keep")
+    assert describe_output_conflict(target, "csv") is not None
+    assert describe_output_conflict(target, "csv", force=True) is None
+
+    save_tables({"notes": [{"note_title": "t", "note_detail": "d"}]}, target, "csv")
+    assert sorted(p.name for p in target.iterdir()) == ["keep.txt", "notes.csv"]
+    assert (target / "keep.txt").read_text() == "keep"
+    assert [p.name for p in tmp_path.iterdir()] == ["export"]
+
+
+@pytest.mark.parametrize("fmt", ["md", "csv"])
+def test_failed_streaming_export_keeps_previous_output(make_spass, tmp_path, fmt):
+    output = tmp_path / f"report.{fmt}"
+    with open(make_spass(), "rb") as f:
+        save_tables(stream_tables(f, PASSWORD), output, fmt, BANNER)
+    before = sorted(p.name for p in tmp_path.rglob("*"))
+
+    with open(make_spass(), "rb") as f, pytest.raises(ValueError):
+        save_tables(stream_tables(f, "wrong password"), output, fmt, BANNER)
+    assert sorted(p.name for p in tmp_path.rglob("*")) == before
+
+
+def test_empty_stream_does_not_replace_previous_output(tmp_path):
+    output = tmp_path / "report.md"
+    output.write_text("previous report")
+    with pytest.raises(ValueError):
+        save_tables(iter(()), output, "md", require_data=True)
+    assert output.read_text() == "previous report"
+    assert [p.name for p in tmp_path.iterdir()] == ["report.md"]
@@ -0,0 +1,115 @@
+# tests/test_google_batches.py
+
+import base64
+import io
+
+import pytest
+
+from migration_generator import build_accounts, build_migration_uris, encode_migration_payload, payload_to_uri
+from unsealer.google import cli as google_cli
+from unsealer.google.batches import BatchAssembler, iter_uri_lines
+from unsealer.google.decrypter import decode_migration_uri
+
+
+@pytest.fixture
+def batch():
+    """
+    25 个账户，每页 10 个，共 3 页：返回 (账户, URI 列表, batch_id)
+    """
+    accounts = build_accounts(25, seed=3)
+    uris = build_migration_uris(accounts, per_batch=10, seed=3)
+    batch_id = decode_migration_uri(uris[0])[0].batch_id
+    return accounts, uris, batch_id
+
+
+def _secrets(assembler: BatchAssembler):
+    return sorted(account["totp_secret"] for account in assembler.accounts())
+
+
+def _expected_secrets(accounts):
+    # 合并结果中的密钥为无填充的 Base32 文本
+    return sorted(base64.b32encode(account["secret"]).decode("ascii").rstrip("=") for account in accounts)
+
+
+def test_complete_batch_in_any_order(batch):
+    accounts, uris, _ = batch
+    assembler = BatchAssembler()
+    for uri in reversed(uris):
+        assembler.add(uri)
+    assert assembler.is_complete
+    assert assembler.missing() == {} and assembler.duplicates() == {}
+    assert _secrets(assembler) == _expected_secrets(accounts)
+
+
+def test_missing_page_is_reported(batch, capsys):
+    accounts, uris, batch_id = batch
+    assembler = BatchAssembler()
+    for uri in (uris[0], uris[2]):
+        assembler.add(uri)
+
+    assert assembler.missing() == {batch_id: [1]}
+    assert assembler.batch_size(batch_id) == 3
+    assert not assembler.is_complete
+    # 已提供页面中的账户照常合并，缺页中的账户不会凭空出现
+    assert _secrets(assembler) == _expected_secrets(accounts[:10] + accounts[20:])
+
+    assert google_cli._report_batches(assembler) is False
+    assert "缺少第 2 页" in capsys.readouterr().err
+
+
+def test_repeated_identical_page_is_skipped(batch, capsys):
+    accounts, uris, _ = batch
+    assembler = BatchAssembler()
+    for uri in uris + [uris[1], uris[1]]:
+        assembler.add(uri)
+
+    assert assembler.repeated == 2
+    assert assembler.duplicates() == {}
+    assert assembler.is_complete
+    assert len(assembler) == len(accounts)
+    assert _secrets(assembler) == _expected_secrets(accounts)
+
+    assert google_cli._report_batches(assembler) is True
+    assert "已跳过 2 个重复" in capsys.readouterr().err
+
+
+def test_conflicting_duplicate_page_is_reported(batch, capsys):
+    accounts, uris, batch_id = batch
+    # 同一批次、同一页序号，但内容不同的二维码
+    extra = build_accounts(2, seed=99)
+    impostor = payload_to_uri(encode_migration_payload(extra, 3, 1, batch_id))
+    assembler = BatchAssembler()
+    for uri in uris + [impostor]:
+        assembler.add(uri)
+
+    assert assembler.duplicates() == {batch_id: [1]}
+    assert assembler.missing() == {}
+    assert not assembler.is_complete
+    # 两个版本的账户都被保留，由用户根据报告判断
+    assert _secrets(assembler) == _expected_secrets(accounts + extra)
+
+    assert google_cli._report_batches(assembler) is False
+    assert "第 2 页出现了内容不同的多个二维码" in capsys.readouterr().err
+
+
+def test_invalid_lines_are_counted_not_fatal(batch):
+    _, uris, _ = batch
+    truncated = uris[1][:80]
+    text = f"# exported pages\n\n{uris[0]}\nhttps://example.com\n{truncated}\n"
+    assembler = BatchAssembler()
+    for line_no, uri in iter_uri_lines(io.StringIO(text)):
+        assembler.add(uri, f"uris.txt:{line_no}")
+
+    assert assembler.uri_count == 3
+    assert assembler.error_count == 2
+    assert assembler.errors[0].startswith("uris.txt:4:")
+    assert len(assembler) == 10
+
+
+def test_accounts_are_emitted_once(batch):
+    accounts, uris, _ = batch
+    seen = []
+    assembler = BatchAssembler(on_account=seen.append)
+    for uri in uris + uris:
+        assembler.add(uri)
+    assert sorted(account["totp_secret"] for account in seen) == _expected_secrets(accounts)
@@ -0,0 +1,19 @@
+# tests/test_import_budget.py
+"""
+CLI 延迟加载的回归测试：在全新的解释器中导入入口模块后，
+benchmarks/bench_import.py 中列出的重量级模块不应出现在 sys.modules 中
+
+这里不检查导入耗时 (受机器负载影响，容易误报)；耗时预算由 bench_import.py 单独测量。
+"""
+
+import pytest
+
+import bench_import
+
+
+@pytest.mark.parametrize("module", list(bench_import.TARGETS))
+def test_import_stays_lazy(module):
+    result = bench_import.measure(module, repeat=1)
+    assert result["forbidden_loaded"] == [], (
+        f"导入 {module} 时加载了不应加载的模块: {', '.join(result['forbidden_loaded'])}"
+    )
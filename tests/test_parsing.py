@@ -0,0 +1,139 @@
+# tests/test_parsing.py
+
+import contextlib
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from conftest import PASSWORD
+from spass_generator import build_plaintext, encrypt_spass
+from unsealer.samsung.decrypter import (
+    count_table_rows,
+    decrypt_and_parse,
+    decrypt_and_parse_stream,
+    iter_decrypted_blocks,
+    iter_tables,
+    parse_decrypted_content,
+    stream_tables,
+)
+from unsealer.profiling import Profiler
+from unsealer.samsung.records import to_plain
+
+# tests/data/baseline_tables.json 是重构前的 parse_decrypted_content 对下面这份合成明文的解析结果
+ROWS = {"logins": 40, "identities": 5, "addresses": 5, "notes": 5}
+PLAINTEXT = build_plaintext(ROWS, unknown_tables=2, seed=11)
+BASELINE = json.loads((Path(__file__).parent / "data" / "baseline_tables.json").read_text(encoding="utf-8"))
+
+
+def _materialize(tables):
+    return {name: to_plain(list(entries)) for name, entries in tables}
+
+
+@pytest.fixture(scope="module")
+def vault_bytes() -> bytes:
+    return encrypt_spass(PLAINTEXT, PASSWORD)
+
+
+def test_parse_matches_baseline():
+    result = parse_decrypted_content(PLAINTEXT)
+    assert list(result) == list(BASELINE)
+    assert result == BASELINE
+
+
+@pytest.mark.parametrize("mode", ["dict", "compact", "lazy"])
+def test_iter_tables_matches_baseline(mode):
+    tables = iter_tables(PLAINTEXT, compact=mode == "compact", lazy=mode == "lazy")
+    assert _materialize(tables) == BASELINE
+
+
+def test_decrypt_and_parse_matches_baseline(vault_bytes):
+    assert decrypt_and_parse(vault_bytes, PASSWORD) == BASELINE
+
+
+@pytest.mark.parametrize("chunk_size", [7, 64, 1000, 1 << 20])
+@pytest.mark.parametrize("mode", ["dict", "compact", "lazy"])
+def test_streaming_pipeline_matches_baseline(vault_bytes, chunk_size, mode):
+    result = decrypt_and_parse_stream(
+        io.BytesIO(vault_bytes),
+        PASSWORD,
+        chunk_size=chunk_size,
+        compact=mode == "compact",
+        lazy=mode == "lazy",
+    )
+    assert list(result) == list(BASELINE)
+    assert to_plain(result) == BASELINE
+
+
+@pytest.mark.parametrize("chunk_size", [7, 1000])
+def test_streamed_blocks_match_plaintext_split(vault_bytes, chunk_size):
+    blocks = list(iter_decrypted_blocks(io.BytesIO(vault_bytes), PASSWORD, chunk_size))
+    assert blocks == PLAINTEXT.split("next_table")
+    assert _materialize(iter_tables(iter(blocks))) == BASELINE
+
+
+def test_stream_tables_matches_baseline(vault_bytes):
+    assert _materialize(stream_tables(io.BytesIO(vault_bytes), PASSWORD, chunk_size=512)) == BASELINE
+
+
+def test_count_table_rows_matches_baseline():
+    assert count_table_rows(PLAINTEXT) == {name: len(entries) for name, entries in BASELINE.items()}
+
+
+def test_quoted_block_is_parsed_with_csv_rules():
+    # 含引号的数据块改用 csv.reader 切分 (与原版的 csv.DictReader 一致)
+    plaintext = "note_title;note_detail;date_created\n\"VGl0bGU=\";ZGV0YWls;1\nT3RoZXI=;\"bXVsdGk7bGluZQ==\";2"
+    assert parse_decrypted_content(plaintext) == {
+        "notes": [
+            {"note_title": "Title", "note_detail": "detail"},
+            {"note_title": "Other", "note_detail": "multi;line"},
+        ]
+    }
+
+
+# --- 数据块中途出错 ---
+# 出错之前的条目保留 (流式导出时已经写出)，出错的行及其后的部分跳过，并输出警告
+
+_BROKEN_NOTES = "\n".join([
+    "note_title;note_detail;date_created",
+    "Rmlyc3Q=;b25l;1",
+    "U2Vjb25k;dHdv;2",
+    "\"VGhpcmQ=\";\"" + "A" * 200 + "\";3",
+    "Rm91cnRo;Zm91cg==;4",
+])
+_LOGINS = "title;username_value;password_value;origin_url\nTG9naW4=;dXNlcg==;cHc=;aHR0cHM6Ly9leGFtcGxlLmNvbQ=="
+
+
+@pytest.fixture
+def small_csv_field_limit():
+    import csv
+
+    previous = csv.field_size_limit(100)
+    yield
+    csv.field_size_limit(previous)
+
+
+@pytest.mark.parametrize("mode", ["dict", "compact", "lazy", "profiled"])
+def test_block_error_keeps_earlier_entries(small_csv_field_limit, capsys, mode):
+    plaintext = f"{_BROKEN_NOTES}\nnext_table\n{_LOGINS}"
+    with Profiler() if mode == "profiled" else contextlib.nullcontext():
+        tables = _materialize(iter_tables(plaintext, compact=mode == "compact", lazy=mode == "lazy"))
+    assert tables["notes"] == [
+        {"note_title": "First", "note_detail": "one"},
+        {"note_title": "Second", "note_detail": "two"},
+    ]
+    # 之后的数据块不受影响
+    assert tables["logins"][0]["title"] == "Login"
+    assert "已保留此前的 2 个条目" in capsys.readouterr().err
+
+
+def test_block_error_counts_match_parsed_entries(small_csv_field_limit, capsys):
+    assert count_table_rows(_BROKEN_NOTES) == {"notes": 2}
+    assert "已保留此前的 2 个条目" in capsys.readouterr().err
+
+
+def test_block_error_before_any_entry_skips_block(small_csv_field_limit, capsys):
+    broken = "note_title;note_detail;date_created\n\"VGhpcmQ=\";\"" + "A" * 200 + "\";3"
+    assert parse_decrypted_content(f"{broken}\nnext_table\n{_LOGINS}").keys() == {"logins"}
+    assert "时出现问题并已跳过" in capsys.readouterr().err
@@ -0,0 +1,78 @@
+# tests/test_password_check.py
+
+import io
+import os
+
+import pytest
+
+from conftest import PASSWORD
+from spass_generator import encrypt_spass
+from unsealer.samsung.decrypter import decrypt_and_parse, decrypt_and_parse_stream, verify_password
+
+
+class _CountingReader(io.BytesIO):
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+def test_correct_password_is_accepted(make_spass):
+    vault = make_spass()
+    assert verify_password(vault, PASSWORD)
+    assert verify_password(vault.read_bytes(), PASSWORD)
+    assert "logins" in decrypt_and_parse(vault.read_bytes(), PASSWORD)
+
+
+def test_wrong_password_is_rejected(make_spass):
+    vault = make_spass()
+    assert not verify_password(vault, "wrong password")
+    with pytest.raises(ValueError, match="解密失败"):
+        decrypt_and_parse(vault.read_bytes(), "wrong password")
+
+
+def test_wrong_password_is_rejected_before_full_decrypt(make_spass):
+    data = make_spass(rows={"logins": 2000, "identities": 0, "addresses": 0, "notes": 0}).read_bytes()
+    chunk_size = 4096
+    assert len(data) > 20 * chunk_size
+
+    reader = _CountingReader(data)
+    with pytest.raises(ValueError, match="解密失败"):
+        decrypt_and_parse_stream(reader, "wrong password", chunk_size=chunk_size)
+    # 只读取了覆盖 salt、IV 与校验块的第一块数据
+    assert reader.bytes_read <= chunk_size
+
+
+@pytest.mark.parametrize("plaintext", ["a;b;c", "a;b;c\n" + "x;y;z\n" * 3])
+def test_short_vault_is_verified_including_padding(tmp_path, plaintext):
+    vault = tmp_path / "short.spass"
+    vault.write_bytes(encrypt_spass(plaintext, PASSWORD))
+    assert verify_password(vault, PASSWORD)
+    assert not verify_password(vault, "wrong password")
+
+
+@pytest.mark.parametrize("cut", [0.5, 0.9])
+def test_truncated_vault_gives_clean_error(make_spass, cut):
+    data = make_spass().read_bytes()
+    truncated = data[: int(len(data) * cut)]
+    # 开头的校验块完好，密码校验仍然通过；截断在解密到结尾时才发现
+    assert verify_password(truncated, PASSWORD)
+    with pytest.raises(ValueError, match="解密失败"):
+        decrypt_and_parse(truncated, PASSWORD)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [b"", b"not a backup at all", b"QUJD", os.urandom(4096), b"\xff\xfe" * 100],
+    ids=["empty", "text", "too-short", "random", "non-utf8"],
+)
+def test_garbage_file_gives_clean_error(tmp_path, data):
+    vault = tmp_path / "garbage.spass"
+    vault.write_bytes(data)
+    assert not verify_password(vault, PASSWORD)
+    with pytest.raises(ValueError):
+        decrypt_and_parse(data, PASSWORD)
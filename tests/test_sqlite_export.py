@@ -0,0 +1,42 @@
+# tests/test_sqlite_export.py
+
+import sqlite3
+
+from unsealer.sqlite_export import export_tables
+
+
+def _read(db_path, table):
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.execute(f'SELECT * FROM "{table}"')
+        columns = [description[0] for description in cursor.description]
+        return columns, cursor.fetchall()
+    finally:
+        conn.close()
+
+
+def test_case_variant_keys_keep_their_values(tmp_path):
+    db_path = tmp_path / "out.db"
+    rows = [{"name": "lower", "Name": "upper", "NAME": "caps"}]
+    assert export_tables(db_path, [("t", rows)]) == {"t": 1}
+    assert _read(db_path, "t") == (["name", "Name_2", "NAME_3"], [("lower", "upper", "caps")])
+
+
+def test_case_variant_key_added_later_gets_its_own_column(tmp_path):
+    db_path = tmp_path / "out.db"
+    rows = [{"title": "a"}, {"title": "b", "Title": "B", "title_2": "x"}]
+    export_tables(db_path, [("t", rows)], columns_for=lambda table: ["title"])
+    assert _read(db_path, "t") == (
+        ["title", "Title_2", "title_2_2"],
+        [("a", None, None), ("b", "B", "x")],
+    )
+
+
+def test_known_columns_and_nested_values(tmp_path):
+    db_path = tmp_path / "out.db"
+    rows = [{"origin_url": "https://a", "otp": {"secret": "S"}, "tags": ["x", "y"]}]
+    export_tables(db_path, [("logins", rows)], columns_for=lambda table: ["title", "origin_url"])
+    assert _read(db_path, "logins") == (
+        ["title", "origin_url", "otp", "tags"],
+        [(None, "https://a", '{"secret": "S"}', '["x", "y"]')],
+    )